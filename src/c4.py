@@ -1,5 +1,6 @@
 import numpy as np
-from mcts import State
+from mcts import State, ActionsBuffer
+import mctsnj_game_mechanics
 from numba import jit
 from numba import int8
 
@@ -22,6 +23,10 @@ class C4(State):
     M = 6 
     N = 7 
     SYMBOLS = ["\u25CB", ".", "\u25CF"] # or: ["O", ".", "X"]    
+    ZOBRIST_KEYS = State._make_zobrist_keys(M * N)
+    __slots__ = ("board", "column_fills")
+    PLAYOUT_ACTIONS = ActionsBuffer(N)
+    BOARD_FIELDS = ("board", "column_fills")
     
     def __init__(self, parent=None):
         """
@@ -87,7 +92,9 @@ class C4(State):
         i = C4.M - 1 - self.column_fills[j] 
         self.board[i, j] = self.turn
         self.column_fills[j] += 1
+        self._zobrist_toggle(i * C4.N + j, self.turn)
         self.turn *= -1
+        self._zobrist_toggle_turn()
         return True
     
     def compute_outcome_job(self):
@@ -217,18 +224,80 @@ class C4(State):
             return last_token        
         return 0
                         
-    def take_random_action_playout(self):
+    def take_random_action_playout(self, rng=None):
         """        
         Picks a uniformly random action from actions available in this state and returns the result of calling ``take_action`` with the action index as argument.
         
+        Args:
+            rng (np.random.Generator):
+                generator of random numbers or ``None`` for the global one of ``np.random``, defaults to ``None``.
+
         Returns:
             child (State): 
                 result of ``take_action`` call for the random action.          
         """        
-        j_indexes = np.where(self.column_fills < C4.M)[0]
-        j = np.random.choice(j_indexes) 
-        child = self.take_action(j)
+        child = self.take_action(self.random_playout_action(rng))
         return child
+
+    def legal_actions_mask(self):
+        """
+        Returns a boolean mask over all action indexes indicating legal actions - columns that are not full yet (computed in one vectorized pass).
+
+        Returns:
+            mask (ndarray[np.bool_, ndim=1]):
+                boolean mask of legal actions.
+        """
+        return self.column_fills < C4.M
+
+    def random_playout_action(self, rng=None):
+        """
+        Picks and returns the index of a uniformly random column that is not full yet (columns are listed into a preallocated buffer, without allocating arrays).
+
+        Args:
+            rng (np.random.Generator):
+                generator of random numbers or ``None`` for the global one of ``np.random``, defaults to ``None``.
+
+        Returns:
+            action_index (int):
+                index of the random column.
+        """
+        actions = C4.PLAYOUT_ACTIONS.actions
+        count = mctsnj_game_mechanics.legal_actions_c4(self.board, self.column_fills, self.turn, actions)
+        return actions[np.random.randint(count) if rng is None else rng.integers(count)]
+
+    def make_move(self, action_index):
+        """
+        Drops a disc into column indicated by the (legal) action_index in place, on this state object.
+
+        Args:
+            action_index (int):
+                index of column where to drop a disc.
+        """
+        j = action_index
+        self.board[C4.M - 1 - self.column_fills[j], j] = self.turn
+        self.column_fills[j] += 1
+        super().make_move(action_index)
+
+    def unmake_move(self):
+        """
+        Removes the disc dropped most recently by ``make_move``.
+        """
+        j = self.last_action_index
+        super().unmake_move()
+        self.column_fills[j] -= 1
+        self.board[C4.M - 1 - self.column_fills[j], j] = 0
+
+    def copy_from(self, state):
+        """
+        Overwrites this (scratch) state with the contents of the given ``C4`` state, copying its board and column fills into existing arrays.
+
+        Args:
+            state (C4):
+                state to be copied.
+        """
+        super().copy_from(state)
+        np.copyto(self.board, state.board)
+        np.copyto(self.column_fills, state.column_fills)
     
     def get_board(self):
         """                
@@ -1,5 +1,5 @@
 import numpy as np
-from mctsnc import MCTSNC
+from mcts import MCTS
 
 __version__ = "1.0.1"
 __author__ = "Przemysław Klęsk"
@@ -22,6 +22,8 @@ class GameRunner:
             total of games in a match (for informative purposes).
         experiment_info_old (dict):
             dictionary allowing to reproduce a former experiment (allows to force the limit of steps rather than time on an AI instance) or ``None`` for a new experiment, , defaults to ``None``.
+        ponder (bool):
+            flag indicating whether AIs (instances of ``MCTS`` with ``vanilla=False``) ponder, i.e. keep searching in a background thread while the other side is thinking (see ``ponder_start`` in ``MCTS``), defaults to ``False``.
             
     Attributes:
         OUTCOME_MESSAGES (list):
@@ -30,7 +32,7 @@ class GameRunner:
     
     OUTCOME_MESSAGES = ["WHITE WINS", "DRAW", "BLACK WINS"]
     
-    def __init__(self, game_class, black_ai, white_ai, game_index, n_games, experiment_info_old=None):
+    def __init__(self, game_class, black_ai, white_ai, game_index, n_games, experiment_info_old=None, ponder=False):
         """
         Constructor ``GameRunner`` instances.
          
@@ -47,6 +49,9 @@ class GameRunner:
                 total of games in a match (for informative purposes).
             experiment_info_old (dict):
                 dictionary allowing to reproduce a former experiment (allows to force the limit of steps rather than time on an AI instance) or ``None`` for a new experiment, , defaults to ``None``.
+            ponder (bool):
+                flag indicating whether AIs (instances of ``MCTS`` with ``vanilla=False``) ponder while the other side is thinking, defaults to ``False``. 
+                With two AIs, pondering takes processor time from the opponent's search; steps of pondering are reported separately (section ``"pondering"`` of performance info).
         """        
         self.game_class = game_class
         self.black_ai = black_ai
@@ -54,6 +59,7 @@ class GameRunner:
         self.game_index = game_index
         self.n_games = n_games
         self.experiment_info_old = experiment_info_old
+        self.ponder = ponder
         
     def run(self):
         """Carries out a game."""
@@ -62,37 +68,26 @@ class GameRunner:
         outcome = 0
         game_info = {"black": str(self.black_ai), "white": str(self.white_ai), "initial_state": str(game), "moves_rounds": {}, "outcome": None, "outcome_message": None}                
         move_count = 0                       
+        pondering = {"black": False, "white": False} # flags of AIs pondering at the moment
         while True:
             print(f"\nMOVES ROUND: {move_count + 1} [game: {self.game_index}/{self.n_games}]")
             forced_search_steps_limit = np.inf
             moves_round_info = {}                     
             if not self.black_ai:
-                move_valid = False
-                escaped = False
-                while not (move_valid or escaped):
-                    try:
-                        move_name = input("BLACK PLAYER, PICK YOUR MOVE: ")
-                        move_index = self.game_class.action_name_to_index(move_name)
-                        game_moved = game.take_action(move_index)
-                        if game_moved is not None:
-                            game = game_moved
-                            move_valid = True                                                        
-                    except:
-                        print("INVALID MOVE. GAME STOPPED.")
-                        escaped = True
-                        break
-                if escaped:
+                move_index = self._read_move(game, "black")
+                if move_index is None:
                     break
+                game = self._play_move(game, move_index, "black", pondering)
             else:
                 if self.experiment_info_old is not None:
                     forced_search_steps_limit = self.experiment_info_old["games_infos"][str(self.game_index)]["moves_rounds"][str(move_count + 1)]["black_performance_info"]["steps"] 
-                if isinstance(self.black_ai, MCTSNC):
-                    move_index = self.black_ai.run(game.get_board(), game.get_extra_info(), game.get_turn(), forced_search_steps_limit)
-                else:
+                if isinstance(self.black_ai, MCTS):
                     move_index = self.black_ai.run(game, forced_search_steps_limit)
+                else: # MCTSNC
+                    move_index = self.black_ai.run(game.get_board(), game.get_extra_info(), game.get_turn(), forced_search_steps_limit)
                 move_name = self.game_class.action_index_to_name(move_index)
                 print(f"MOVE PLAYED: {move_name}")
-                game = game.take_action(move_index)
+                game = self._play_move(game, move_index, "black", pondering)
                 moves_round_info["black_best_action_info"] = self.black_ai.actions_info["best"]
                 moves_round_info["black_performance_info"] = self.black_ai.performance_info                
             print(str(game), flush=True)                                                
@@ -105,32 +100,20 @@ class GameRunner:
                 game_info["outcome_message"] = outcome_message
                 break                
             if not self.white_ai:
-                move_valid = False
-                escaped = False
-                while not (move_valid or escaped):
-                    try:
-                        move_name = input("WHITE PLAYER, PICK YOUR MOVE: ")
-                        move_index = self.game_class.action_name_to_index(move_name)
-                        game_moved = game.take_action(move_index)
-                        if game_moved is not None:
-                            game = game_moved
-                            move_valid = True                            
-                    except:
-                        print("INVALID MOVE. GAME STOPPED.")
-                        escaped = True
-                        break
-                if escaped:
-                    break                
+                move_index = self._read_move(game, "white")
+                if move_index is None:
+                    break
+                game = self._play_move(game, move_index, "white", pondering)
             else:
                 if self.experiment_info_old is not None:
                     forced_search_steps_limit = self.experiment_info_old["games_infos"][str(self.game_index)]["moves_rounds"][str(move_count + 1)]["white_performance_info"]["steps"]                
-                if isinstance(self.white_ai, MCTSNC):
-                    move_index = self.white_ai.run(game.get_board(), game.get_extra_info(), game.get_turn(), forced_search_steps_limit)
-                else:
+                if isinstance(self.white_ai, MCTS):
                     move_index = self.white_ai.run(game, forced_search_steps_limit)
+                else: # MCTSNC
+                    move_index = self.white_ai.run(game.get_board(), game.get_extra_info(), game.get_turn(), forced_search_steps_limit)
                 move_name = self.game_class.action_index_to_name(move_index)
                 print(f"MOVE PLAYED: {move_name}")
-                game = game.take_action(move_index)
+                game = self._play_move(game, move_index, "white", pondering)
                 moves_round_info["white_best_action_info"] = self.white_ai.actions_info["best"]            
                 moves_round_info["white_performance_info"] = self.white_ai.performance_info                
             print(str(game), flush=True)                                        
@@ -144,4 +127,43 @@ class GameRunner:
                 game_info["outcome_message"] = outcome_message                                
                 break
             move_count += 1
-        return outcome, game_info
\ No newline at end of file
+        for color, ai in [("black", self.black_ai), ("white", self.white_ai)]:
+            if pondering[color]: # game stopped
+                ai.ponder_stop()
+        return outcome, game_info
+
+    def _read_move(self, game, color):
+        """Reads moves of the human player of the given side (``"black"`` or ``"white"``) until a legal one is picked and returns its index, or ``None`` if the input is not a name of an action (game stopped)."""
+        while True:
+            try:
+                move_name = input(f"{color.upper()} PLAYER, PICK YOUR MOVE: ")
+                move_index = self.game_class.action_name_to_index(move_name)
+                legal_actions_mask = game.legal_actions_mask()
+                if 0 <= move_index < legal_actions_mask.size and legal_actions_mask[move_index]:
+                    return move_index
+            except (ValueError, IndexError):
+                print("INVALID MOVE. GAME STOPPED.")
+                return None
+
+    def _play_move(self, game, move_index, color, pondering):
+        """
+        Plays the move (given by its index) of the given side (``"black"`` or ``"white"``) and returns the next game state. If the other side's AI is pondering, its pondering is stopped and its new root
+        (with statistics gathered by pondering) becomes the next state. If the side's AI ponders, it starts pondering on its own tree and the next state handed to the other side is a copy of its new root
+        (unless the other side's root is taken). Flags in ``pondering`` dictionary are updated.
+        """
+        ai, other_ai = (self.black_ai, self.white_ai) if color == "black" else (self.white_ai, self.black_ai)
+        other_color = "white" if color == "black" else "black"
+        if pondering[other_color]:
+            pondering[other_color] = False
+            next_game = other_ai.ponder_stop(move_index)
+            other_root_taken = True
+        else:
+            next_game = game.take_action(move_index)
+            other_root_taken = False
+        if self.ponder and isinstance(ai, MCTS):
+            state = ai.ponder_start(move_index)
+            if state is not None:
+                pondering[color] = True
+                if not other_root_taken:
+                    next_game = state
+        return next_game
\ No newline at end of file
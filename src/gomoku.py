@@ -1,5 +1,6 @@
 import numpy as np
-from mcts import State
+from mcts import State, ActionsBuffer
+import mctsnj_game_mechanics
 from numba import jit
 from numba import int8
 
@@ -23,6 +24,12 @@ class Gomoku(State):
     M = 15
     N = 15
     SYMBOLS = ["\u25CB", "+", "\u25CF"] # or: [['O', '+', 'X']
+    ZOBRIST_KEYS = State._make_zobrist_keys(M * N)
+    __slots__ = ("board",)
+    PLAYOUT_ACTIONS = ActionsBuffer(M * N)
+    NO_EXTRA_INFO = np.zeros(0, dtype=np.int8) # for compiled mechanics (Gomoku states keep no extra information)
+    WIDENING_RADIUS = 2 # cells farther from stones are not distinguished by widening_order
+    BOARD_FIELDS = ("board",)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -84,7 +91,9 @@ class Gomoku(State):
         if self.board[i, j] != 0:
             return False
         self.board[i, j] = self.turn
+        self._zobrist_toggle(i * Gomoku.N + j, self.turn)
         self.turn *= -1
+        self._zobrist_toggle_turn()
         return True
     
     def compute_outcome_job(self):
@@ -214,18 +223,107 @@ class Gomoku(State):
             return last_token        
         return 0        
                             
-    def take_random_action_playout(self):
+    def take_random_action_playout(self, rng=None):
         """        
         Picks a uniformly random action from actions available in this state and returns the result of calling ``take_action`` with the action index as argument.
         
+        Args:
+            rng (np.random.Generator):
+                generator of random numbers or ``None`` for the global one of ``np.random``, defaults to ``None``.
+
         Returns:
             child (State): 
                 result of ``take_action`` call for the random action.          
         """        
-        indexes = np.where(np.ravel(self.board) == 0)[0]
-        action_index = np.random.choice(indexes) 
-        child = self.take_action(action_index)
+        child = self.take_action(self.random_playout_action(rng))
         return child    
+
+    def legal_actions_mask(self):
+        """
+        Returns a boolean mask over all action indexes indicating legal actions - empty cells (computed in one vectorized pass).
+
+        Returns:
+            mask (ndarray[np.bool_, ndim=1]):
+                boolean mask of legal actions.
+        """
+        return np.ravel(self.board) == 0
+
+    def widening_order(self, rng=None):
+        """
+        Returns indexes of empty cells ordered by their (Chebyshev) distance to the nearest stone - cells next to stones first, ties in a random order (cells at distance above ``WIDENING_RADIUS`` are tied).
+        On an empty board, cells are ordered by their distance to the center.
+
+        Args:
+            rng (np.random.Generator):
+                generator of random numbers (breaking ties) or ``None`` for the global one of ``np.random``, defaults to ``None``.
+
+        Returns:
+            actions (list[int]):
+                ordered indexes of empty cells.
+        """
+        occupied = self.board != 0
+        if not np.any(occupied):
+            occupied = np.zeros_like(occupied)
+            occupied[Gomoku.M // 2, Gomoku.N // 2] = True
+        distances = np.full((Gomoku.M, Gomoku.N), Gomoku.WIDENING_RADIUS + 1, dtype=np.int8)
+        distances[occupied] = 0
+        reached = occupied
+        for r in range(1, Gomoku.WIDENING_RADIUS + 1): # dilation of occupied cells by one cell in each pass
+            padded = np.pad(reached, 1)
+            dilated = np.zeros_like(reached)
+            for di in range(3):
+                for dj in range(3):
+                    dilated |= padded[di:di + Gomoku.M, dj:dj + Gomoku.N]
+            distances[dilated & ~reached] = r
+            reached = dilated
+        actions = (np.random if rng is None else rng).permutation(self.legal_actions())
+        return actions[np.argsort(np.ravel(distances)[actions], kind="stable")].tolist()
+
+    def random_playout_action(self, rng=None):
+        """
+        Picks and returns the index of a uniformly random empty cell (in flat indexing). Empty cells are listed into a preallocated buffer by a compiled function, without allocating arrays.
+
+        Args:
+            rng (np.random.Generator):
+                generator of random numbers or ``None`` for the global one of ``np.random``, defaults to ``None``.
+
+        Returns:
+            action_index (int):
+                index of the random cell.
+        """
+        actions = Gomoku.PLAYOUT_ACTIONS.actions
+        count = mctsnj_game_mechanics.legal_actions_gomoku(self.board, Gomoku.NO_EXTRA_INFO, self.turn, actions)
+        return actions[np.random.randint(count) if rng is None else rng.integers(count)]
+
+    def make_move(self, action_index):
+        """
+        Places a stone on cell indicated by the (legal) action_index in place, on this state object.
+
+        Args:
+            action_index (int):
+                index of cell where to place a stone.
+        """
+        self.board[action_index // Gomoku.N, action_index % Gomoku.N] = self.turn
+        super().make_move(action_index)
+
+    def unmake_move(self):
+        """
+        Removes the stone placed most recently by ``make_move``.
+        """
+        action_index = self.last_action_index
+        super().unmake_move()
+        self.board[action_index // Gomoku.N, action_index % Gomoku.N] = 0
+
+    def copy_from(self, state):
+        """
+        Overwrites this (scratch) state with the contents of the given ``Gomoku`` state, copying its board into the existing array.
+
+        Args:
+            state (Gomoku):
+                state to be copied.
+        """
+        super().copy_from(state)
+        np.copyto(self.board, state.board)
     
     def get_board(self):
         """                
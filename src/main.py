@@ -9,13 +9,17 @@ The following variables allow to define the settings of an experiment:
     AI_A_SHORTNAME = None # human
     AI_B_SHORTNAME = "mctsnc_5_inf_4_256_acp_prodigal"
     REPRODUCE_EXPERIMENT = False
+    PONDER = False # AIs with vanilla=False keep searching while the other side is thinking
 
 String names of predefined AI instances can be found in dictionary named ``AIS``._
 """
 
 import numpy as np
 from mcts import MCTS
+from mcts_soa import MCTSSoA
 from mctsnc import MCTSNC
+from mctsnj import MCTSNJ
+from mctsrp import MCTSRP
 from game_runner import GameRunner
 import time
 from utils import (
@@ -39,6 +43,7 @@ AI_B_SHORTNAME = "mctsnc_5_inf_4_256_acp_prodigal"
 # AI_B_SHORTNAME =  None
 # AI_A_SHORTNAME = None
 REPRODUCE_EXPERIMENT = False
+PONDER = False
 
 # folders
 FOLDER_EXPERIMENTS = "../experiments/"
@@ -68,9 +73,46 @@ AIS = {
     "mcts_30_inf_vanilla": MCTS(
         search_time_limit=30.0, search_steps_limit=np.inf, vanilla=True
     ),
+    "mcts_30_inf_vanilla_1m_nodes": MCTS(
+        search_time_limit=30.0, search_steps_limit=np.inf, vanilla=True, max_nodes=2**20
+    ),
     "mcts_inf_5_vanilla": MCTS(
         search_time_limit=np.inf, search_steps_limit=5, vanilla=True
     ),
+    "mcts_5_inf_vanilla_64": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=True, n_playouts=64
+    ),
+    "mcts_5_inf_vanilla_tt": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=True, transposition_table_size=2**20
+    ),
+    "mcts_5_inf_vanilla_lazy": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=True, lazy_expansion=True
+    ),
+    "mcts_5_inf_vanilla_gc": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=True, gc_aware=True
+    ),
+    "mcts_5_inf_vanilla_solver": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=True, solver=True
+    ),
+    "mcts_5_inf_vanilla_es": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=True, early_stopping_interval=256, early_stopping_z=3.0
+    ),
+    "mcts_5_inf_vanilla_pw": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=True, progressive_widening=True
+    ),
+    "mcts_5_inf_vanilla_rave": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=True, rave=True, ucb_c=0.0
+    ),
+    "mcts_5_inf_vanilla_sh": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=True, sequential_halving=True
+    ),
+    "mcts_5_inf": MCTS(
+        search_time_limit=5.0, search_steps_limit=np.inf, vanilla=False
+    ),
+    "mcts_5_inf_soa": MCTSSoA(search_time_limit=5.0, search_steps_limit=np.inf),
+    "mctsnj_5_inf": MCTSNJ(search_time_limit=5.0, search_steps_limit=np.inf),
+    "mctsnj_5_inf_8_threads": MCTSNJ(search_time_limit=5.0, search_steps_limit=np.inf, n_threads=8),
+    "mctsrp_5_inf_8": MCTSRP(search_time_limit=5.0, search_steps_limit=np.inf, n_workers=8),
     "mctsnc_1_inf_1_32_ocp_thrifty": MCTSNC(
         _BOARD_SHAPE,
         _EXTRA_INFO_MEMORY,
@@ -882,6 +924,8 @@ if __name__ == "__main__":
         "game_name": STATE_CLASS.class_repr(),
         "n_games": N_GAMES,
     }
+    if PONDER:
+        matchup_info["ponder"] = PONDER # included only if on (hashes of former experiments unchanged)
     outcomes = np.zeros(N_GAMES, dtype=np.int8)
     c_props = cpu_and_system_props()
     g_props = gpu_props()
@@ -943,6 +987,7 @@ if __name__ == "__main__":
             i + 1,
             N_GAMES,
             experiment_info_old,
+            PONDER,
         )
         # game_runner = GameRunner2(STATE_CLASS, black_player_ai, white_player_ai, i + 1, N_GAMES, experiment_info_old)
         outcome, game_info = game_runner.run()
@@ -959,6 +1004,10 @@ if __name__ == "__main__":
         )
         print(LINE_SEPARATOR)
 
+    for ai in (ai_a, ai_b):
+        if isinstance(ai, MCTS): # thread pools (and worker processes of MCTSRP) released
+            ai.close()
+
     print(f"OUTCOMES: {outcomes}")
     outcomes = np.array(outcomes, dtype=np.int8)
     n_wins_white = np.sum(outcomes == -1)
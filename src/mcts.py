@@ -20,12 +20,25 @@ For public methods full docstrings are provided (with arguments and returns desc
 
 import numpy as np
 import time
-from utils import dict_to_str
+import os
+import itertools
+import heapq
+import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils import dict_to_str, early_stopping_reason, remaining_steps_estimate, saved_budget, search_snapshot, step_cost_update, overruns_info
+import mctsnj_game_mechanics
 
 __version__ = "1.0.1"
 __author__ = "Przemysław Klęsk"
 __email__ = "pklesk@zut.edu.pl" 
 
+class ActionsBuffer(threading.local):
+    """Preallocated array (separate for each thread) into which games write indexes of legal actions when drawing random playout actions, so that playouts do not allocate arrays."""
+
+    def __init__(self, size):
+        self.actions = np.empty(size, dtype=np.int16)
+
 class State:
     """
     Arbitrary abstract state of some game or sequential decision problem. Meant to be inherited - extended to subclasses 
@@ -39,11 +52,28 @@ class State:
     When searches using ``MCTS`` class are planned, the programmer, while inheriting from ``State``, must provide implementations for the following non-static methods: 
     ``take_action_job``, ``compute_outcome_job``, ``take_random_action_playout``, ``__str__``; 
     and one static method ``class_repr``.
+    Optionally, methods ``random_playout_action``, ``make_move``, ``unmake_move`` and ``copy_from`` can be provided, which makes ``MCTS`` carry out playouts in place on a reusable scratch state (without creating child states).
     When searches using ``MCTSNC`` class are planned, the programmer, while inheriting from ``State``, must provide the following non-static methods:    
     ``get_board``, ``get_extra_info``
     and the following static ones:
     ``get_board_shape``, ``get_extra_info_memory``, ``get_max_actions``.
+    To let ``MCTS`` keep arrays of states (board, etc.) in a shared ``BoardArena``, or drop them from tree nodes (replay mode, requires also ``make_move`` and ``unmake_move``),
+    subclasses should list names of these array attributes in ``BOARD_FIELDS``.
+    Instances have a compact layout with no per-instance ``__dict__`` (all fields are listed in ``__slots__``); children are kept in a list (indexed by ``child_index``) parallel to arrays of their actions and statistics.
+    Subclasses should declare ``__slots__`` for their own fields (e.g., board) as well; subclasses without such declaration work too, but pay the cost of per-instance dictionaries.
     """        
+
+    __slots__ = ("win_flag", "n", "n_wins", "parent", "children", "outcome_computed", "outcome", "turn", "last_action_index",
+                 "children_actions", "children_ns", "children_ns_wins", "child_index", "zobrist_key", "ply", "untried_actions", "moves_stack", "board_index",
+                 "proven", "children_proven", "children_amaf_ns", "children_amaf_ns_wins")
+    BOARD_FIELDS = () # names of array attributes (slots) representing the board (kept in a BoardArena or dropped from tree nodes in replay mode), to be set in subclasses
+    arena = None # BoardArena in which arrays of this state are kept (set in arena subclasses), None if state owns its arrays
+
+    NO_CHILDREN = () # shared (immutable) empty sequence and arrays for states with no children
+    NO_CHILDREN_ACTIONS = np.empty(0, dtype=np.int16)
+    NO_CHILDREN_NS = np.empty(0, dtype=np.int32)
+    ZOBRIST_KEYS = None # to be set in subclasses (via _make_zobrist_keys) - random 64-bit keys for pawns of minimizing and maximizing player on each board cell
+    ZOBRIST_TURN_KEY = 0x9E3779B97F4A7C15 # 64-bit key for the minimizing player's turn
             
     def __init__(self, parent=None):
         """
@@ -57,11 +87,22 @@ class State:
         self.n = 0
         self.n_wins = 0
         self.parent = parent
-        self.children = {}
+        self.children = State.NO_CHILDREN # replaced by an own list when the first child is added
         self.outcome_computed = False # has outcome value been already prepared within last call of get_outcome  
         self.outcome = None # None - ongoing, or {-1, 0, 1} - win for min player, draw, win for max player        
         self.turn = 1 if self.parent is None else self.parent.turn
         self.last_action_index = None        
+        self.children_actions = State.NO_CHILDREN_ACTIONS # actions of children (edges) and their statistics in contiguous arrays (order as in children list), for vectorized selection
+        self.children_ns = State.NO_CHILDREN_NS
+        self.children_ns_wins = State.NO_CHILDREN_NS
+        self.child_index = -1 # index of this state in arrays of its parent
+        self.zobrist_key = 0 if self.parent is None else self.parent.zobrist_key # incremental hash of board and turn (updated in take_action_job)
+        self.ply = 0 if self.parent is None else self.parent.ply + 1 # number of actions taken to reach this state (nodes are shared only among equal plies, which excludes cycles)
+        self.untried_actions = None # candidate actions not materialized as children yet (lazy expansion), None if not expanded lazily
+        self.proven = None # game-theoretic value {-1, 0, 1} of this state proven by MCTS-Solver backups (or by the outcome, for terminal states), None if not proven
+        self.children_proven = None # flags of proven children (order as in children list), None if no child is proven
+        self.children_amaf_ns = None # AMAF (all-moves-as-first) statistics of children (order as in children list), None if not collected (see MCTS parameter rave)
+        self.children_amaf_ns_wins = None
 
     def __str__(self):
         """
@@ -86,29 +127,169 @@ class State:
         """
         pass
             
-    def _subtree_size(self):
-        """Returns size of the subtree rooted by this state (number of tree nodes including this one)."""
-        size = 1
-        for key in self.children:
-            size += self.children[key]._subtree_size()
-        return size
-    
-    def _subtree_max_depth(self):
-        """Returns (maximum) depth of the subtree rooted by this state."""
-        d = 0
-        for key in self.children:
-            temp_d = self.children[key]._subtree_max_depth()
-            if 1 + temp_d > d:
-                d = 1 + temp_d 
-        return d
-    
-    def _subtree_depths(self, d=0, depths=[]):
-        """Returns a list of depths for nodes in the subtree rooted by this state."""
-        depths.append(d)
-        for key in self.children:
-            self.children[key]._subtree_depths(d + 1, depths)
-        return depths
-    
+    def _update_children_arrays(self):
+        """Rebuilds arrays with statistics of children (n, n_wins) from the children list (actions of children are kept up to date on their own)."""
+        n_children = len(self.children)
+        self.children_ns = np.empty(n_children, dtype=np.int32)
+        self.children_ns_wins = np.empty(n_children, dtype=np.int32)
+        for i, child in enumerate(self.children):
+            self.children_ns[i] = child.n
+            self.children_ns_wins[i] = child.n_wins
+        proven = np.array([child.proven is not None for child in self.children], dtype=np.bool_)
+        self.children_proven = proven if np.any(proven) else None
+
+    def _add_children(self, children, actions):
+        """Appends new children (list of states) implied by the given actions to this state, extending arrays of their statistics and assigning to children their indexes in these arrays."""
+        if len(self.children) == 0:
+            self.children = []
+        for child in children:
+            child.child_index = len(self.children)
+            self.children.append(child)
+        self.children_actions = np.append(self.children_actions, np.array(actions, dtype=np.int16))
+        self.children_ns = np.append(self.children_ns, np.array([child.n for child in children], dtype=np.int32))
+        self.children_ns_wins = np.append(self.children_ns_wins, np.array([child.n_wins for child in children], dtype=np.int32))
+        if self.children_proven is not None:
+            self.children_proven = np.append(self.children_proven, np.array([child.proven is not None for child in children], dtype=np.bool_))
+        if self.children_amaf_ns is not None:
+            self.children_amaf_ns = np.append(self.children_amaf_ns, np.zeros(len(children), dtype=np.int32))
+            self.children_amaf_ns_wins = np.append(self.children_amaf_ns_wins, np.zeros(len(children), dtype=np.int32))
+
+    def _new_child(self, action_index):
+        """Creates and returns the child-state implied by the action (not attached to children of this state) or ``None`` if the action is illegal."""
+        child = type(self)(self) # copying constructor
+        action_legal = child.take_action_job(action_index) 
+        if not action_legal:
+            return None # no effect takes place
+        child.last_action_index = action_index
+        return child
+
+    def _clear_children(self):
+        """Removes all children of this state (together with arrays of their statistics), turning it into a leaf."""
+        self.children = State.NO_CHILDREN
+        self.children_actions = State.NO_CHILDREN_ACTIONS
+        self.children_ns = State.NO_CHILDREN_NS
+        self.children_ns_wins = State.NO_CHILDREN_NS
+        self.untried_actions = None
+        self.children_proven = None
+        self.children_amaf_ns = None
+        self.children_amaf_ns_wins = None
+
+    def _mark_child_proven(self, index):
+        """Flags the child at the given ``index`` (in children list) as proven."""
+        if self.children_proven is None:
+            self.children_proven = np.zeros(len(self.children), dtype=np.bool_)
+        self.children_proven[index] = True
+
+    def _update_amaf(self, actions, n_playouts, n_wins):
+        """Credits AMAF statistics of children whose actions are among the given ``actions`` (taken later on by the player to move in this state) with ``n_playouts`` playouts and ``n_wins`` wins; returns the number of credited children."""
+        if self.children_amaf_ns is None:
+            self.children_amaf_ns = np.zeros(len(self.children), dtype=np.int32)
+            self.children_amaf_ns_wins = np.zeros(len(self.children), dtype=np.int32)
+        mask = np.isin(self.children_actions, actions)
+        self.children_amaf_ns[mask] += n_playouts
+        self.children_amaf_ns_wins[mask] += n_wins
+        return int(np.count_nonzero(mask))
+
+    def _prove_from_children(self):
+        """
+        Returns the game-theoretic value of this state implied by values of its proven children (MCTS-Solver rules) or ``None`` if it is not implied yet:
+        the player to move wins if some child is a proven win for that player, otherwise the value is the best one (for that player) among children values provided that all children are proven.
+        """
+        if self.children_proven is None:
+            return None
+        values = [child.proven for child in self.children]
+        if self.turn in values:
+            return self.turn
+        if self.untried_actions or not np.all(self.children_proven): # untried actions (lazy expansion) not proven yet
+            return None
+        return self.turn * max(self.turn * value for value in values)
+
+    def _set_proven(self, value):
+        """Sets the proven game-theoretic value of this state (and its win flag if the value is a win for the player who took the action leading to this state)."""
+        self.proven = value
+        if value == -self.turn:
+            self.win_flag = True
+
+    def _detached_copy(self):
+        """Returns a copy of this state (with no parent and no children) suitable for playouts that must not touch the tree."""
+        copy = type(self)(self)
+        copy.parent = None
+        copy.ply = self.ply
+        copy.last_action_index = self.last_action_index
+        copy.outcome_computed = self.outcome_computed
+        copy.outcome = self.outcome
+        return copy
+
+    def _make_scratch(self):
+        """Returns a detached copy of this state equipped with a stack of moves - a reusable scratch state for in-place playouts (see ``make_move``)."""
+        scratch = self._detached_copy()
+        scratch._detach_from_arena()
+        scratch.moves_stack = []
+        return scratch
+
+    def _attach_to_arena(self, arena):
+        """Moves arrays of this state (``BOARD_FIELDS``) into a new row of the given arena and turns this state into an instance of the arena subclass of its class."""
+        self._detach_from_arena()
+        row = arena.allocate()
+        for name in self.BOARD_FIELDS:
+            arena.arrays[name][row] = getattr(self, name)
+            setattr(self, name, None)
+        self.__class__ = arena.state_class
+        self.board_index = row
+
+    def _detach_from_arena(self):
+        """Moves arrays of this state out of its arena (into own arrays), turning it back into an instance of its base class; has no effect if the state is not kept in an arena."""
+        arena = self.arena
+        if arena is None:
+            return
+        arrays = {name: np.copy(getattr(self, name)) for name in self.BOARD_FIELDS}
+        arena.free(self.board_index)
+        self.__class__ = arena.base_class
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+    def _has_board(self):
+        """Returns ``True`` if arrays of this state (``BOARD_FIELDS``) are present, i.e. were not dropped in replay mode."""
+        return getattr(self, self.BOARD_FIELDS[0]) is not None
+
+    def _restore_board(self, source):
+        """Restores arrays of this state (``BOARD_FIELDS``) as copies of arrays of the given state representing the same position (e.g., a replay cursor)."""
+        for name in self.BOARD_FIELDS:
+            setattr(self, name, np.copy(getattr(source, name)))
+
+    def _drop_board(self):
+        """Drops arrays of this state (``BOARD_FIELDS``), leaving only its action and statistics (replay mode)."""
+        for name in self.BOARD_FIELDS:
+            setattr(self, name, None)
+
+    @staticmethod
+    def _make_zobrist_keys(n_cells, seed=0):
+        """Returns a list of pairs of random 64-bit keys (for pawns of minimizing and maximizing player, respectively) for each of ``n_cells`` board cells."""
+        keys = np.random.default_rng(seed).integers(0, np.iinfo(np.uint64).max, size=(n_cells, 2), dtype=np.uint64, endpoint=True)
+        return [[int(key) for key in pair] for pair in keys]
+
+    def _zobrist_toggle(self, cell, token):
+        """Updates the Zobrist key of this state by toggling the given ``token`` ({-1, 1}) at the given board ``cell`` (flat index)."""
+        self.zobrist_key ^= type(self).ZOBRIST_KEYS[cell][(token + 1) >> 1]
+
+    def _zobrist_toggle_turn(self):
+        """Updates the Zobrist key of this state by toggling the turn."""
+        self.zobrist_key ^= State.ZOBRIST_TURN_KEY
+
+    def compute_zobrist_key(self):
+        """
+        Computes (from scratch, based on ``get_board`` and turn) and returns the Zobrist key of this state. Normally, keys are updated incrementally in ``take_action_job``.
+        
+        Returns:
+            zobrist_key (int):
+                64-bit key (hash) of this state.
+        """
+        key = State.ZOBRIST_TURN_KEY if self.turn == -1 else 0
+        for cell, token in enumerate(self.get_board().ravel()):
+            if token != 0:
+                key ^= type(self).ZOBRIST_KEYS[cell][(int(token) + 1) >> 1]
+        return key
+
     def get_turn(self):
         """
         Returns {-1, 1} indicating whose turn it is: -1 for the minimizing player, 1 for the maximizing player.
@@ -134,15 +315,30 @@ class State:
             child (State): 
                 reference to child state implied by the action or ``None`` if action illegal.
         """
-        if action_index in self.children:            
-            return self.children[action_index]
-        child = type(self)(self) # copying constructor
-        action_legal = child.take_action_job(action_index) 
-        if not action_legal:
-            return None # no effect takes place
-        child.last_action_index = action_index
-        self.children[action_index] = child
+        child = self.get_child(action_index)
+        if child is not None:
+            return child
+        child = self._new_child(action_index)
+        if child is not None:
+            self._add_children([child], [action_index])
         return child
+
+    def get_child(self, action_index):
+        """
+        Returns the child-state implied by the action (specified by its index) if it exists among children of this state.
+        
+        Args:
+            action_index (int): 
+                index of action.
+            
+        Returns:
+            child (State): 
+                reference to child state implied by the action or ``None`` if there is no such child.
+        """
+        if len(self.children) == 0:
+            return None
+        positions = np.flatnonzero(self.children_actions == action_index)
+        return self.children[positions[0]] if positions.size > 0 else None
     
     def take_action_job(self, action_index):
         """
@@ -226,26 +422,187 @@ class State:
         """        
         return None
             
-    def expand(self):
+    def legal_actions_mask(self):
+        """
+        [To be optionally implemented in subclasses - natively, without taking actions.]
+
+        Returns a boolean mask over all action indexes (of size ``get_max_actions()``) indicating which actions are legal in this state.
+        This base version discovers legality by trial: it calls ``take_action_job`` on a copy of this state for each action index.
+
+        Returns:
+            mask (ndarray[np.bool_, ndim=1]):
+                boolean mask of legal actions.
+        """
+        mask = np.zeros(self.__class__.get_max_actions(), dtype=np.bool_)
+        for action_index in range(mask.size):
+            mask[action_index] = bool(type(self)(self).take_action_job(action_index))
+        return mask
+
+    def legal_actions(self):
+        """
+        Returns indexes of actions legal in this state (in ascending order), based on ``legal_actions_mask``.
+
+        Returns:
+            actions (ndarray[np.int64, ndim=1]):
+                indexes of legal actions.
+        """
+        return np.flatnonzero(self.legal_actions_mask())
+
+    def expand(self, deadline=np.inf):
         """        
-        Expands this state to generate its children by calling ``take_action`` multiple times for all possible action indexes. 
+        Expands this state to generate its children for all legal action indexes (see ``legal_actions``) - in one batch, the same as by calling ``take_action`` for each of them. 
+
+        Args:
+            deadline (float):
+                time (as given by ``time.time``) at which the expansion is abandoned - children generated so far are discarded (releasing their rows of a board arena), defaults to ``np.inf``.
+
+        Returns:
+            completed (bool):
+                ``False`` if the expansion was abandoned at the deadline (no children added), ``True`` otherwise.
         """
         if len(self.children) == 0 and self.compute_outcome() is None:
-            for action_index in range(self.__class__.get_max_actions()):
-                self.take_action(action_index)
+            children = []
+            actions = []
+            for action_index in self.legal_actions().tolist():
+                if deadline < np.inf and time.time() >= deadline:
+                    for child in children:
+                        if child.arena is not None:
+                            child.arena.free(child.board_index)
+                    return False
+                child = self._new_child(action_index)
+                if child is not None:
+                    children.append(child)
+                    actions.append(action_index)
+            if len(children) > 0:
+                self._add_children(children, actions)
+        return True
+
+    def expand_lazily(self, ordered=False, rng=None):
+        """
+        Expands this state lazily - instead of generating all children, records (in a random order) indexes of legal actions as untried ones, to be materialized one by one by ``take_untried_action``.
+        Has no effect if this state already has children, has been expanded lazily before, or is terminal.
+
+        Args:
+            ordered (bool):
+                flag indicating whether untried actions are to be materialized in the order given by ``widening_order`` (most promising first) instead of a random one, defaults to ``False``.
+            rng (np.random.Generator):
+                generator of random numbers or ``None`` for the global one of ``np.random``, defaults to ``None``.
+        """
+        if len(self.children) == 0 and self.untried_actions is None and self.compute_outcome() is None:
+            if ordered:
+                self.untried_actions = list(reversed(self.widening_order(rng))) # taken from the end
+            else:
+                self.untried_actions = (np.random if rng is None else rng).permutation(self.legal_actions()).tolist()
+
+    def widening_order(self, rng=None):
+        """
+        [To be optionally implemented in subclasses - e.g., by a game-specific heuristic.]
+
+        Returns indexes of legal actions in this state ordered from the most to the least promising one - the order in which children are admitted by progressive widening in ``MCTS``.
+        This base version returns legal actions in a random order.
+
+        Args:
+            rng (np.random.Generator):
+                generator of random numbers or ``None`` for the global one of ``np.random``, defaults to ``None``.
+
+        Returns:
+            actions (list[int]):
+                ordered indexes of legal actions.
+        """
+        return (np.random if rng is None else rng).permutation(self.legal_actions()).tolist()
+
+    def take_untried_action(self):
+        """
+        Materializes the child-state implied by the next untried action and returns it.
+
+        Returns:
+            child (State):
+                reference to the new child state or ``None`` if no untried actions remain.
+        """
+        while self.untried_actions:
+            action_index = self.untried_actions.pop()
+            if self.get_child(action_index) is not None:
+                continue
+            child = self.take_action(action_index)
+            if child is not None:
+                return child
+        return None
     
-    def take_random_action_playout(self):
+    def take_random_action_playout(self, rng=None):
         """
         [To be implemented in subclasses.]
         
         Should pick a uniformly random action from actions available in this state and return the result of calling ``take_action`` with the action index as argument.
+
+        Args:
+            rng (np.random.Generator):
+                generator of random numbers or ``None`` for the global one of ``np.random``, defaults to ``None``.
         
         Returns:
             child (State): 
-                result of ``take_action`` call for the random action.          
+                result of ``take_action`` call for the random action.
         """
-        pass  
-    
+        pass
+
+    def random_playout_action(self, rng=None):
+        """
+        [To be optionally implemented in subclasses, together with ``make_move`` and ``unmake_move``.]
+
+        Should return the index of a uniformly random action from actions available in this state (without taking it).
+
+        Args:
+            rng (np.random.Generator):
+                generator of random numbers or ``None`` for the global one of ``np.random``, defaults to ``None``.
+
+        Returns:
+            action_index (int):
+                index of the random action.
+        """
+        pass
+
+    def make_move(self, action_index):
+        """
+        [To be optionally implemented in subclasses, together with ``random_playout_action`` and ``unmake_move``. Subclasses should call this base version after modifying their board; they may push their own undo information onto ``moves_stack`` before the call.]
+
+        Should take the given (legal) action in place, on this very state object (no child is created), memorizing what is needed to undo it by ``unmake_move``.
+        Meant for allocation-free playouts carried out on a reusable scratch state (see ``_make_scratch`` and ``copy_from``). Zobrist key is not maintained by in-place moves.
+
+        Args:
+            action_index (int):
+                index of action to be taken.
+        """
+        self.moves_stack.append(self.last_action_index)
+        self.last_action_index = action_index
+        self.turn *= -1
+        self.outcome_computed = False
+
+    def unmake_move(self):
+        """
+        [To be optionally implemented in subclasses, together with ``random_playout_action`` and ``make_move``. Subclasses should call this base version first and then restore their board (popping their own undo information from ``moves_stack``, if any).]
+
+        Should undo the most recent action taken in place by ``make_move``.
+        """
+        self.last_action_index = self.moves_stack.pop()
+        self.turn *= -1
+        self.outcome_computed = False
+
+    def copy_from(self, state):
+        """
+        [To be optionally extended in subclasses - by copying the board (and extra information) into the existing arrays of this state.]
+
+        Overwrites this (scratch) state with the contents of the given state of the same class, without allocating new arrays.
+
+        Args:
+            state (State):
+                state to be copied.
+        """
+        self.turn = state.turn
+        self.last_action_index = state.last_action_index
+        self.outcome_computed = state.outcome_computed
+        self.outcome = state.outcome
+        self.ply = state.ply
+        self.moves_stack.clear()
+
     @staticmethod
     def action_name_to_index(action_name):
         """
@@ -318,6 +675,93 @@ class State:
         pass
     
                                  
+class BoardArena:
+    """
+    Slab allocator keeping arrays of states (those listed in ``BOARD_FIELDS`` of their class, e.g., board) in large contiguous arrays - one row per state, instead of small per-state arrays.
+    States kept in an arena are instances of its ``state_class`` - a subclass of their class (created per arena, with no additional slots), in which array attributes are properties reading rows of arena arrays.
+    Children of such states are constructed directly in the arena: rows of their parents are copied and constructors of game classes are not called.
+    Rows are recycled via a free list and released in bulk via ``reset`` or ``compact``. Arena arrays grow geometrically when full.
+    """
+
+    DEFAULT_INITIAL_CAPACITY = 2**10 # number of rows
+
+    def __init__(self, base_class, initial_capacity=DEFAULT_INITIAL_CAPACITY):
+        """
+        Constructor of ``BoardArena`` instances.
+
+        Args:
+            base_class (type):
+                class of states (subclass of ``State`` with non-empty ``BOARD_FIELDS``) whose arrays are to be kept in the arena.
+            initial_capacity (int):
+                initial number of rows, defaults to ``2**10``.
+        """
+        self.base_class = base_class
+        prototype = base_class()
+        self.arrays = {name: np.empty((initial_capacity,) + getattr(prototype, name).shape, dtype=getattr(prototype, name).dtype) for name in base_class.BOARD_FIELDS}
+        self.capacity = initial_capacity
+        self.size = 0 # number of rows ever allocated since last reset (rows below are in use or in the free list)
+        self.free_rows = []
+        self.state_class = self._make_state_class()
+
+    def _make_state_class(self):
+        """Returns the subclass of the base class for states kept in this arena."""
+        arena = self
+        base_class = self.base_class
+        def arena_property(name):
+            def getter(state):
+                return arena.arrays[name][state.board_index]
+            def setter(state, value):
+                arena.arrays[name][state.board_index] = value
+            return property(getter, setter)
+        def __init__(state, parent):
+            state.board_index = arena.allocate(parent.board_index)
+            State.__init__(state, parent)
+        namespace = {"__slots__": (), "__init__": __init__, "arena": arena}
+        for name in base_class.BOARD_FIELDS:
+            namespace[name] = arena_property(name)
+        return type(base_class.__name__, (base_class,), namespace)
+
+    def allocate(self, source_row=-1):
+        """Returns the index of a row for a new state (taken from the free list if possible), with contents copied from ``source_row`` if non-negative."""
+        if len(self.free_rows) > 0:
+            row = self.free_rows.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            row = self.size
+            self.size += 1
+        if source_row >= 0:
+            for array in self.arrays.values():
+                array[row] = array[source_row]
+        return row
+
+    def _grow(self):
+        """Doubles the capacity of arena arrays (preserving contents)."""
+        self.capacity *= 2
+        for name, array in self.arrays.items():
+            new_array = np.empty((self.capacity,) + array.shape[1:], dtype=array.dtype)
+            new_array[:self.size] = array[:self.size]
+            self.arrays[name] = new_array
+
+    def free(self, row):
+        """Returns the given row to the free list."""
+        self.free_rows.append(row)
+
+    def reset(self):
+        """Releases all rows (states kept in the arena must not be used afterwards)."""
+        self.size = 0
+        self.free_rows = []
+
+    def compact(self, states):
+        """Moves rows of the given states (kept in this arena) to the beginning of arena arrays and releases all other rows."""
+        rows = np.array([state.board_index for state in states], dtype=np.int64)
+        for array in self.arrays.values():
+            array[:rows.size] = array[rows]
+        for row, state in enumerate(states):
+            state.board_index = row
+        self.size = rows.size
+        self.free_rows = []
+
 class MCTS:
     """
     Monte Carlo Tree Search - standard, referential implementation (for CPU, single-threaded).
@@ -326,15 +770,51 @@ class MCTS:
     DEFAULT_SEARCH_TIME_LIMIT = 5.0 # [s], np.inf possible
     DEFAULT_SEARCH_STEPS_LIMIT = np.inf # integer, np.inf possible
     DEFAULT_VANILLA = True
+    DEFAULT_REUSE_TREE_SIZE_LIMIT = np.inf # maximum number of nodes retained by advance (for non-vanilla searches), np.inf possible
+    DEFAULT_N_PLAYOUTS = 1 # playouts per step (leaf parallelization if greater than 1)
+    PLAYOUTS_CHUNKS = 8 # maximum number of chunks (seeded separately) into which leaf-parallel playouts of a step are split, independent of the number of threads
+    DEFAULT_LAZY_EXPANSION = False
+    DEFAULT_BOARD_ARENA = False
+    DEFAULT_REPLAY_NODES = False
+    DEFAULT_MAX_NODES = np.inf # maximum number of tree nodes during the search (least visited subtrees are pruned when exceeded), np.inf possible
+    PRUNING_FRACTION = 0.25 # fraction of max_nodes reclaimed when the tree is pruned
+    DEFAULT_GC_AWARE = False
+    GC_AWARE_LOCK = threading.Lock() # held during GC-aware runs - the state of the collector (enabled, frozen objects) is process-global, so at most one such run at a time
+    DEFAULT_SOLVER = False
+    DEFAULT_EARLY_STOPPING_INTERVAL = 0 # steps between checks of the early stopping rule, 0 - no early stopping
+    DEFAULT_EARLY_STOPPING_Z = np.inf # width (in standard deviations) of confidence intervals for action values in the early stopping rule, np.inf - intervals not used
+    DEFAULT_PROGRESSIVE_WIDENING = False
+    DEFAULT_WIDENING_C = 1.0 # number of children considered at a state with n visits: ceil(widening_c * n**widening_alpha)
+    DEFAULT_WIDENING_ALPHA = 0.5
+    DEFAULT_RAVE = False
+    RAVE_SCHEDULES = ("equivalence", "mse") # schedules of weights of AMAF estimates blended into action values (RAVE)
+    DEFAULT_RAVE_SCHEDULE = "equivalence"
+    DEFAULT_RAVE_EQUIVALENCE = 1000.0 # number of visits at which AMAF and plain estimates are weighted equally (with weight 1/2) in the "equivalence" schedule
+    DEFAULT_RAVE_BIAS = 0.1 # assumed bias of AMAF estimates in the "mse" (minimum mean squared error) schedule
+    DEFAULT_SEQUENTIAL_HALVING = False
+    DEFAULT_SNAPSHOT_TOP_K = 5 # number of root actions in snapshots yielded by run_iter
+    DEFAULT_HARD_DEADLINE = False
+    STEP_COST_ALPHA = 0.1 # smoothing factor of running estimates of the mean cost of a step and of its mean absolute deviation (hard deadline)
+    STEP_COST_MARGIN = 3.0 # predicted cost of the next step: mean + STEP_COST_MARGIN * mean absolute deviation (hard deadline)
+    DEFAULT_TRANSPOSITION_TABLE_SIZE = 0 # maximum number of entries in transposition table, 0 - no table
+    TRANSPOSITION_TABLE_EVICTION_FRACTION = 0.25 # fraction of least visited entries evicted when the table is full
     DEFAULT_UCB_C = 2.0
     DEFAULT_SEED = 0
     DEFAULT_VERBOSE_DEBUG = False
     DEFAULT_VERBOSE_INFO = True
+    NON_DEFAULT_PARAMS = ("reuse_tree_size_limit", "n_playouts", "transposition_table_size", "lazy_expansion", "board_arena", "replay_nodes", "max_nodes", "gc_aware", "solver", "early_stopping_interval", "early_stopping_z",
+                          "progressive_widening", "widening_c", "widening_alpha", "rave", "rave_schedule", "rave_equivalence", "rave_bias",
+                          "sequential_halving", "hard_deadline") # shown by __str__ only if not equal to defaults
     
     def __init__(self, 
                  search_time_limit=DEFAULT_SEARCH_TIME_LIMIT, search_steps_limit=DEFAULT_SEARCH_STEPS_LIMIT,
-                 vanilla=DEFAULT_VANILLA,                  
-                 ucb_c=DEFAULT_UCB_C, seed=DEFAULT_SEED,
+                 vanilla=DEFAULT_VANILLA, reuse_tree_size_limit=DEFAULT_REUSE_TREE_SIZE_LIMIT, n_playouts=DEFAULT_N_PLAYOUTS,
+                 transposition_table_size=DEFAULT_TRANSPOSITION_TABLE_SIZE, lazy_expansion=DEFAULT_LAZY_EXPANSION, board_arena=DEFAULT_BOARD_ARENA, replay_nodes=DEFAULT_REPLAY_NODES,
+                 max_nodes=DEFAULT_MAX_NODES, gc_aware=DEFAULT_GC_AWARE, solver=DEFAULT_SOLVER,
+                 early_stopping_interval=DEFAULT_EARLY_STOPPING_INTERVAL, early_stopping_z=DEFAULT_EARLY_STOPPING_Z,
+                 progressive_widening=DEFAULT_PROGRESSIVE_WIDENING, widening_c=DEFAULT_WIDENING_C, widening_alpha=DEFAULT_WIDENING_ALPHA,
+                 rave=DEFAULT_RAVE, rave_schedule=DEFAULT_RAVE_SCHEDULE, rave_equivalence=DEFAULT_RAVE_EQUIVALENCE, rave_bias=DEFAULT_RAVE_BIAS,
+                 sequential_halving=DEFAULT_SEQUENTIAL_HALVING, hard_deadline=DEFAULT_HARD_DEADLINE, ucb_c=DEFAULT_UCB_C, seed=DEFAULT_SEED,
                  verbose_debug=DEFAULT_VERBOSE_DEBUG, verbose_info=DEFAULT_VERBOSE_INFO):
         """
         Constructor of ``MCTS`` instances.
@@ -346,6 +826,65 @@ class MCTS:
                 steps limit (computational budget), ``np.inf`` if no limit, defaults to ``np.inf``.
             vanilla (bool):
                 flag indicating whether information (partial tree, action-value estimates, etc.) from previous searches is ignored, defaults to ``True``.
+            reuse_tree_size_limit (float):
+                maximum number of nodes in the subtree retained by ``advance`` (most visited branches are kept), ``np.inf`` if no limit, defaults to ``np.inf``.
+            n_playouts (int):
+                number of independent playouts carried out from each expanded leaf (if greater than ``1``, playouts are run concurrently on a thread pool by compiled functions releasing GIL), defaults to ``1``.
+            transposition_table_size (int):
+                maximum number of entries in the transposition table (keyed by Zobrist keys of states), if positive then equal positions reached by different sequences of actions share nodes
+                (the tree becomes a DAG), ``0`` if no table, defaults to ``0``.
+            lazy_expansion (bool):
+                flag indicating whether states are expanded lazily, i.e. children are materialized one at a time (one per step) from untried actions, which selection treats as having infinite UCB values, defaults to ``False``.
+            board_arena (bool):
+                flag indicating whether arrays of states (board, etc.) are kept in a shared ``BoardArena`` (for classes of states with non-empty ``BOARD_FIELDS``) instead of per-state arrays,
+                released in bulk between searches, defaults to ``False``.
+            replay_nodes (bool):
+                flag indicating whether tree nodes below the root's children are kept board-free (only actions and statistics), with the board of the selected leaf rebuilt by replaying actions
+                along the path from the root (for classes of states with non-empty ``BOARD_FIELDS`` and ``make_move``, ``unmake_move`` implemented); excludes transposition table and board arena, defaults to ``False``.
+            max_nodes (float):
+                maximum number of tree nodes, when exceeded (after a step) the least visited subtrees are collapsed back to leaves (keeping their statistics) so that
+                the search can go on in constant memory, ``np.inf`` if no limit, defaults to ``np.inf``.
+            gc_aware (bool):
+                flag indicating whether the cyclic garbage collector is kept away from the tree: it is disabled for the duration of each run, objects alive after the run are frozen (excluded from
+                collections until the next run) and parent links of states created by the search are cut, so that discarded trees and playout branches are freed by reference counting; the state of the collector
+                is process-global - it is restored after each run and a run started while another GC-aware run is in progress (any instance) leaves the collector as is, defaults to ``False``.
+            solver (bool):
+                flag indicating whether MCTS-Solver backups are carried out: game-theoretic values of terminal states are propagated up the tree (a state is proven when some child is a proven win
+                for the player to move or all its children are proven), proven children are skipped by selection, proven losses are never chosen as best actions and the search stops
+                as soon as the root is proven, defaults to ``False``.
+            early_stopping_interval (int):
+                number of steps between checks of the early stopping rule: the search ends before its budget is used up if the best root action can no longer change, i.e. the runner-up (by visits counts)
+                cannot overtake the leader within the remaining budget (estimated from the steps rate for time limits) or confidence intervals for their action values are disjoint, ``0`` if no early stopping, defaults to ``0``.
+            early_stopping_z (float):
+                half-width of confidence intervals for action values (in standard deviations, the largest standard deviation of a Bernoulli variable assumed) in the early stopping rule,
+                ``np.inf`` if only visits counts are compared, defaults to ``np.inf``.
+            progressive_widening (bool):
+                flag indicating whether children are admitted progressively: a state with ``n`` visits considers only its first ``ceil(widening_c * n**widening_alpha)`` children,
+                materialized one at a time in the order given by ``widening_order`` of states (lazy expansion mechanics), so that visits concentrate on fewer actions in wide games, defaults to ``False``.
+            widening_c (float):
+                multiplicative constant of progressive widening, defaults to ``1.0``.
+            widening_alpha (float):
+                exponent of progressive widening (from ``(0, 1)``, smaller values mean slower widening), defaults to ``0.5``.
+            rave (bool):
+                flag indicating whether AMAF (all-moves-as-first) statistics are collected - each child of a state on the selected path is credited with the playout if its action was taken later on
+                (in the tree or in the playout) by the player to move in that state - and blended into action values used by selection (RAVE), so that each playout informs many actions at once;
+                with ``n_playouts > 1`` only actions in the tree are credited; AMAF estimates guide exploration by themselves, hence small values of ``ucb_c`` (even ``0.0``) suit RAVE best, defaults to ``False``.
+            rave_schedule (str):
+                schedule of the weight ``beta`` of AMAF estimates blended into action values, ``"equivalence"`` for ``beta = sqrt(rave_equivalence / (3 * n + rave_equivalence))`` or
+                ``"mse"`` (minimum mean squared error) for ``beta = n_amaf / (n + n_amaf + 4 * rave_bias**2 * n * n_amaf)``, defaults to ``"equivalence"``.
+            rave_equivalence (float):
+                number of visits at which AMAF and plain estimates are weighted equally in the ``"equivalence"`` schedule, defaults to ``1000.0``.
+            rave_bias (float):
+                assumed bias of AMAF estimates in the ``"mse"`` schedule, defaults to ``0.1``.
+            sequential_halving (bool):
+                flag indicating whether the root budget is allocated by sequential halving instead of UCB: steps are split into ``ceil(log2(K))`` rounds (``K`` - number of root actions),
+                in each round surviving root actions are visited equally (in turns) and then the better half of them (by win flags and action values) survives; the tree below the root is searched by UCB as usual.
+                The schedule depends on ``search_steps_limit`` only (remaining steps make up one pass of rounds, or - when there is no steps limit - passes over all root actions are repeated
+                with budgets doubled each time), so that forced steps limits reproduce searches exactly; the best action is chosen among survivors; excludes progressive widening, defaults to ``False``.
+            hard_deadline (bool):
+                flag indicating whether ``search_time_limit`` is treated as a hard deadline: a step is not started if its cost, predicted from running estimates over previous steps (also of previous runs),
+                would exceed the time left, and a step still going on at the deadline is aborted (not backed up) - before or during the expansion, or during the playout (single, carried out on CPU);
+                the first step of each run is always done in full; overruns of the deadline per move (run) are reported, defaults to ``False``.
             verbose_debug (bool):
                 debug verbosity flag, if ``True`` then detailed information about each kernel invocation are printed to console (in each iteration), defaults to ``False``.
             verbose_info (bool): 
@@ -354,9 +893,102 @@ class MCTS:
         self.search_time_limit = search_time_limit
         self.search_steps_limit = search_steps_limit
         self.vanilla = vanilla # if True, statistics from previous runs (searches) are not reused         
+        self.reuse_tree_size_limit = reuse_tree_size_limit
+        if self.reuse_tree_size_limit < 1:
+            invalid_value = self.reuse_tree_size_limit
+            self.reuse_tree_size_limit = 1
+            print(f"[invalid value of parameter reuse_tree_size_limit: {invalid_value}, changed to: {self.reuse_tree_size_limit}]")
+        self.root = None
+        self.n_playouts = n_playouts
+        if self.n_playouts < 1:
+            invalid_value = self.n_playouts
+            self.n_playouts = 1
+            print(f"[invalid value of parameter n_playouts: {invalid_value}, changed to: {self.n_playouts}]")
+        self.playouts_executor = None # thread pool for leaf-parallel playouts, created lazily
+        self.playouts_batches = 0 # number of batches of leaf-parallel playouts run on the thread pool (seeds of their chunks derived from seed, batch and chunk index)
+        self.tree_counters_root = None # root for which counters of tree nodes are maintained
+        self.playout_scratch = None # reusable state for in-place playouts (make_move / unmake_move), created lazily
+        self.transposition_table_size = transposition_table_size
+        if self.transposition_table_size < 0:
+            invalid_value = self.transposition_table_size
+            self.transposition_table_size = MCTS.DEFAULT_TRANSPOSITION_TABLE_SIZE
+            print(f"[invalid value of parameter transposition_table_size: {invalid_value}, changed to: {self.transposition_table_size}]")
+        self.transposition_table = {}
+        self.lazy_expansion = lazy_expansion
+        self.board_arena = board_arena
+        self.arena = None # BoardArena, created at the first run (if board_arena flag set)
+        self.replay_nodes = replay_nodes
+        if self.replay_nodes:
+            if self.transposition_table_size > 0:
+                invalid_value = self.transposition_table_size
+                self.transposition_table_size = 0
+                print(f"[invalid value of parameter transposition_table_size: {invalid_value} (with replay_nodes), changed to: {self.transposition_table_size}]")
+            if self.board_arena:
+                self.board_arena = False
+                print(f"[invalid value of parameter board_arena: True (with replay_nodes), changed to: {self.board_arena}]")
+        self.replay_cursor = None # scratch state on which boards of selected leaves are rebuilt (replay mode), created lazily
+        self.replay_board_states = [] # board-carrying states to be made board-free after the current step (replay mode)
+        self.max_nodes = max_nodes
+        if self.max_nodes < 1:
+            invalid_value = self.max_nodes
+            self.max_nodes = 1
+            print(f"[invalid value of parameter max_nodes: {invalid_value}, changed to: {self.max_nodes}]")
+        self.gc_aware = gc_aware
+        self.gc_collections = None # number of garbage collections and their total time during the current run (tracked by _gc_callback in the GC-aware mode), None if not tracked
+        self.gc_time = 0.0
+        self.solver = solver
+        self.early_stopping_interval = early_stopping_interval
+        if self.early_stopping_interval < 0:
+            invalid_value = self.early_stopping_interval
+            self.early_stopping_interval = MCTS.DEFAULT_EARLY_STOPPING_INTERVAL
+            print(f"[invalid value of parameter early_stopping_interval: {invalid_value}, changed to: {self.early_stopping_interval}]")
+        self.early_stopping_z = early_stopping_z
+        self.progressive_widening = progressive_widening
+        self.widening_c = widening_c
+        if self.widening_c <= 0.0:
+            invalid_value = self.widening_c
+            self.widening_c = MCTS.DEFAULT_WIDENING_C
+            print(f"[invalid value of parameter widening_c: {invalid_value}, changed to: {self.widening_c}]")
+        self.widening_alpha = widening_alpha
+        if not 0.0 < self.widening_alpha < 1.0:
+            invalid_value = self.widening_alpha
+            self.widening_alpha = MCTS.DEFAULT_WIDENING_ALPHA
+            print(f"[invalid value of parameter widening_alpha: {invalid_value}, changed to: {self.widening_alpha}]")
+        self.rave = rave
+        self.rave_schedule = rave_schedule
+        if self.rave_schedule not in MCTS.RAVE_SCHEDULES:
+            invalid_value = self.rave_schedule
+            self.rave_schedule = MCTS.DEFAULT_RAVE_SCHEDULE
+            print(f"[invalid value of parameter rave_schedule: {invalid_value}, changed to: {self.rave_schedule}]")
+        self.rave_equivalence = rave_equivalence
+        if self.rave_equivalence <= 0.0:
+            invalid_value = self.rave_equivalence
+            self.rave_equivalence = MCTS.DEFAULT_RAVE_EQUIVALENCE
+            print(f"[invalid value of parameter rave_equivalence: {invalid_value}, changed to: {self.rave_equivalence}]")
+        self.rave_bias = rave_bias
+        if self.rave_bias < 0.0:
+            invalid_value = self.rave_bias
+            self.rave_bias = MCTS.DEFAULT_RAVE_BIAS
+            print(f"[invalid value of parameter rave_bias: {invalid_value}, changed to: {self.rave_bias}]")
+        self.playout_actions = None # actions taken in the last playout (collected for AMAF statistics), None if not collected
+        self.sequential_halving = sequential_halving
+        if self.sequential_halving and self.progressive_widening:
+            self.progressive_widening = False
+            print(f"[invalid value of parameter progressive_widening: True (with sequential_halving), changed to: {self.progressive_widening}]")
+        self.halving_survivors = None # indexes of root children surviving in the current pass of sequential halving, None if no pass started
+        self.hard_deadline = hard_deadline
+        self.step_cost_mean = None # running estimate of the mean cost of a step [s] (hard deadline), None before the first step
+        self.step_cost_deviation = 0.0 # running estimate of the mean absolute deviation of the cost of a step [s] (hard deadline)
+        self.deadline_overruns = [] # overruns of the deadline [s] in consecutive runs (hard deadline), negative if the loop ended before the deadline
+        self.step_deadline = np.inf # time at which steps are aborted (hard deadline), np.inf if steps are not aborted
+        self.ponder_thread = None # background thread of pondering (see ponder_start), None if not pondering
+        self.ponder_report = None # information on the last pondering, to be reported by the next run
+        self.pondering_info = None # information on the pondering preceding the last run, None if there was none
+        self.rng = None # generator of random numbers drawn by steps being carried out, None for the global one of np.random (drawn by searches)
         self.ucb_c = ucb_c                 
         self.seed = seed
         np.random.seed(self.seed)
+        self.ponder_rng = np.random.default_rng(self.seed) # own generator of pondering, so that the global one is not drawn from concurrently with searches (also of the opponent)
         self.verbose_debug = verbose_debug
         self.verbose_info = verbose_info
 
@@ -367,7 +999,8 @@ class MCTS:
         Returns:
             str: string representation of this ``MCTS`` instance.
         """           
-        return f"MCTS(search_time_limit={self.search_time_limit}, search_steps_limit={self.search_steps_limit}, vanilla={self.vanilla}, ucb_c={self.ucb_c}, seed: {self.seed})"
+        non_default_params = "".join(f", {name}={getattr(self, name)!r}" for name in self.NON_DEFAULT_PARAMS if getattr(self, name) != getattr(MCTS, "DEFAULT_" + name.upper()))
+        return f"MCTS(search_time_limit={self.search_time_limit}, search_steps_limit={self.search_steps_limit}, vanilla={self.vanilla}, ucb_c={self.ucb_c}, seed: {self.seed}{non_default_params})" # string of an instance with defaults as in former versions (hashes of experiments unchanged)
         
     def __repr__(self):
         """
@@ -378,49 +1011,359 @@ class MCTS:
         """                
         return self.__str__() 
 
-    def _make_performance_info(self):
+    def advance(self, action_index, tree_size_limit=None):
+        """
+        Advances the root of the search tree by the given action (played by either player), so that the subtree of the played child can be reused by the next non-vanilla run.
+        The played child becomes the new root, its siblings (and the old root) are freed, and the retained subtree is trimmed to at most ``tree_size_limit`` nodes:
+        child sets of nodes are kept whole, in the best-first order of visits counts ``n`` (most visited branches first), remaining nodes are turned into leaves (their statistics are kept).
+        
+        Args:
+            action_index (int):
+                index of the action played in the current root state.
+            tree_size_limit (float):
+                maximum number of nodes in the retained subtree, if ``None`` then ``reuse_tree_size_limit`` of this instance is used.
+        Returns:
+            root (State):
+                the new root state or ``None`` if there is no current root (no previous run) or the action is illegal.
+        """
+        if self.root is None:
+            return None
+        new_root = self.root.take_action(action_index)
+        if new_root is None:
+            return None
+        self.root._clear_children()
+        new_root.parent = None
+        new_root.child_index = -1
+        self.root = new_root
+        if self.replay_nodes: # children of the root keep their boards (e.g., to be taken as next game states)
+            self._restore_children_boards(new_root)
+        self.tree_counters_root = None # to be prepared again at the next run
+        tree_size_limit = self.reuse_tree_size_limit if tree_size_limit is None else tree_size_limit
+        if tree_size_limit < np.inf:
+            self._trim_tree(new_root, tree_size_limit)
+        if len(self.transposition_table) > 0 or (self.arena is not None and new_root.arena is self.arena):
+            levels = self._tree_levels(new_root)
+            self._release_discarded_states(new_root, levels)
+            self._reset_tree_counters(new_root, [len(level) for level in levels])
+        return new_root
+
+    def ponder_start(self, action_index, steps_limit=np.inf):
+        """
+        Advances the root of the search tree by the given action (just played by this AI, see ``advance``) and starts pondering - a search of the new root carried out in a background thread while the opponent is thinking.
+        Pondering lasts until ``ponder_stop`` is called (with the opponent's action) or ``steps_limit`` steps are done; statistics it gathers are kept for the next run (non-vanilla searches only - for vanilla ones pondering is not started).
+        The tree must not be accessed by the caller while pondering goes on, hence a copy of the new root state (not linked to the tree) is returned for the caller's use.
+
+        Args:
+            action_index (int):
+                index of the action played by this AI in the current root state.
+            steps_limit (float):
+                maximum number of steps of pondering, ``np.inf`` possible, defaults to ``np.inf``.
+        Returns:
+            state (State):
+                copy of the new root state or ``None`` if pondering was not started (vanilla search, no previous run, illegal action or terminal state).
+        """
+        self._join_ponder_thread()
+        if self.vanilla:
+            return None
+        root = self.advance(action_index)
+        if root is None or root.compute_outcome() is not None:
+            return None
+        self._prepare_root(root)
+        self._reset_search_counters()
+        state = root._detached_copy()
+        state._detach_from_arena()
+        self.step_deadline = np.inf
+        self.ponder_report = None
+        self.ponder_steps = 0
+        self.time_ponder = 0.0
+        self.ponder_stop_event = threading.Event()
+        self.ponder_thread = threading.Thread(target=self._ponder, args=(steps_limit,), daemon=True)
+        self.ponder_thread.start()
+        return state
+
+    def close(self):
+        """
+        Stops pondering (if started) and shuts down the thread pool of leaf-parallel playouts (if created). The instance remains usable - the pool is created again when needed.
         """
-        Prepares and returns a dictionary with information on performance during the last run. 
+        self._join_ponder_thread()
+        if self.playouts_executor is not None:
+            self.playouts_executor.shutdown()
+            self.playouts_executor = None
+
+    def ponder_stop(self, action_index=None):
+        """
+        Stops pondering (if started) and advances the root of the search tree by the given action (played by the opponent), so that statistics gathered by pondering for the matching child are reused by the next run.
+        Pondering is then reported by that run in its ``performance_info`` (section ``"pondering"``): steps and time of pondering, whether the opponent's action was searched by it (hit) and the number of visits of the new root kept.
+
+        Args:
+            action_index (int):
+                index of the action played by the opponent in the pondered root state or ``None`` to stop pondering only (e.g., game interrupted), defaults to ``None``.
+        Returns:
+            root (State):
+                the new root state (to be passed to the next run) or ``None`` if there is no current root, the action is illegal or not given.
+        """
+        pondered = self.ponder_thread is not None
+        self._join_ponder_thread()
+        if action_index is None:
+            return None
+        child = self.root.get_child(action_index) if self.root is not None else None
+        hit = child is not None and child.n > 0
+        new_root = self.advance(action_index)
+        if pondered and new_root is not None:
+            ponder_report = {}
+            ponder_report["steps"] = self.ponder_steps
+            ponder_report["time_[ms]"] = 10.0**3 * self.time_ponder
+            ponder_report["hit"] = hit
+            ponder_report["n_root_kept"] = new_root.n
+            self.ponder_report = ponder_report
+        return new_root
+
+    def _join_ponder_thread(self):
+        """Signals the pondering thread (if any) to stop and waits for it."""
+        if self.ponder_thread is not None:
+            self.ponder_stop_event.set()
+            self.ponder_thread.join()
+            self.ponder_thread = None
+
+    def _ponder(self, steps_limit):
+        """Carries out steps of pondering (in the background thread, drawing random numbers from its own generator ``ponder_rng``) from the current root until signaled to stop or ``steps_limit`` is reached; counts the steps in ``ponder_steps``."""
+        t1 = time.time()
+        self.rng = self.ponder_rng
+        try:
+            while not self.ponder_stop_event.is_set() and self.ponder_steps < steps_limit:
+                if self.solver and self.root.proven is not None and len(self.root.children) > 0:
+                    break
+                state = self._select(self.root)
+                state = self._expand(state)
+                playout_root = state
+                state = self._playout(state)
+                self._backup(state, playout_root)
+                if self.tree_nodes_count > self.max_nodes:
+                    self._prune_tree()
+                self.ponder_steps += 1
+        finally:
+            self.rng = None
+        self.time_ponder = time.time() - t1
+
+    def _release_discarded_states(self, root, levels):
+        """Rebuilds the transposition table and compacts the board arena so that only states of the tree rooted by ``root`` (given as ``levels``) are kept in them (states of freed or trimmed branches are dropped)."""
+        if len(self.transposition_table) > 0: # table rebuilt from the retained tree only (states of freed or trimmed branches must not be linked back)
+            self.transposition_table = {state.zobrist_key: state for level in levels for state in level}
+        if self.arena is not None and root.arena is self.arena: # rows of freed or trimmed branches released in bulk
+            self.arena.compact([state for level in levels for state in level if state.arena is self.arena])
+
+    def _prune_tree(self):
+        """Prunes the tree (node budget exceeded) by collapsing the least visited subtrees back to leaves until at most ``(1 - PRUNING_FRACTION) * max_nodes`` nodes remain; updates counters of tree nodes and pruning statistics."""
+        n_nodes = self.tree_nodes_count
+        self._trim_tree(self.root, max(int((1.0 - self.PRUNING_FRACTION) * self.max_nodes), 1))
+        levels = self._tree_levels(self.root)
+        self._release_discarded_states(self.root, levels)
+        self._reset_tree_counters(self.root, [len(level) for level in levels])
+        self.prunings += 1
+        self.pruned_nodes += n_nodes - self.tree_nodes_count
+
+    def _restore_children_boards(self, state):
+        """Restores boards of board-free children of the given state (having a board) by applying their actions on the replay cursor (replay mode)."""
+        cursor = self.replay_cursor
+        if cursor is None or not isinstance(state, type(cursor)):
+            cursor = state._make_scratch()
+            self.replay_cursor = cursor
+        cursor.copy_from(state)
+        for action_index, child in zip(state.children_actions.tolist(), state.children):
+            if not child._has_board():
+                cursor.make_move(action_index)
+                child._restore_board(cursor)
+                cursor.unmake_move()
+
+    def _prepare_board_arena(self):
+        """Prepares the board arena for the run - releases rows of the previous tree (all of them for vanilla searches, rows of states outside the current tree otherwise) and moves the root into the arena."""
+        root = self.root
+        base_class = type(root) if root.arena is None else root.arena.base_class
+        if len(base_class.BOARD_FIELDS) == 0:
+            print(f"[board arena not supported by class {base_class.__name__} (no BOARD_FIELDS), per-state arrays used]")
+            self.board_arena = False
+            return
+        if self.arena is None or self.arena.base_class is not base_class:
+            self.arena = BoardArena(base_class)
+        if self.vanilla:
+            root._detach_from_arena()
+            self.arena.reset()
+        elif root.arena is not self.arena or root is not self.tree_counters_root: # tree not tracked yet (e.g., not advanced by this instance)
+            self.arena.compact([state for level in self._tree_levels(root) for state in level if state.arena is self.arena])
+        if root.arena is not self.arena:
+            root._attach_to_arena(self.arena)
+
+    def _trim_tree(self, root, tree_size_limit):
+        """Trims the tree rooted by ``root`` to at most ``tree_size_limit`` nodes, admitting whole child sets of nodes in the best-first order of their visits counts; returns the size of the trimmed tree."""
+        size = 1
+        counter = itertools.count() # tie-breaker, so that states are never compared
+        heap = [(-root.n, next(counter), root)]
+        while heap:
+            _, _, state = heapq.heappop(heap)
+            if len(state.children) == 0:
+                continue
+            if size + len(state.children) <= tree_size_limit:
+                size += len(state.children)
+                for child in state.children:
+                    heapq.heappush(heap, (-child.n, next(counter), child))
+            else:
+                state._clear_children()
+        return size
+
+    @staticmethod
+    def _tree_levels(root):
+        """Returns a list of lists of states at consecutive depths of the tree (or DAG, when a transposition table is used - then each state is present once, at its smallest depth) rooted by ``root``; walks the tree iteratively (breadth-first)."""
+        visited = {id(root)}
+        level = [root]
+        levels = []
+        while len(level) > 0:
+            levels.append(level)
+            next_level = []
+            for state in level:
+                for child in state.children:
+                    if id(child) not in visited:
+                        visited.add(id(child))
+                        next_level.append(child)
+            level = next_level
+        return levels
+
+    def _reset_tree_counters(self, root, depths_counts=None):
+        """Resets counters of tree nodes (total, sum of depths and numbers of nodes per depth) maintained incrementally during the search, either to the given ``depths_counts`` or by walking the tree rooted by ``root`` once."""
+        self.tree_depths_counts = [len(level) for level in self._tree_levels(root)] if depths_counts is None else depths_counts
+        self.tree_nodes_count = sum(self.tree_depths_counts)
+        self.tree_depths_sum = sum(depth * count for depth, count in enumerate(self.tree_depths_counts))
+        self.tree_counters_root = root
+
+    def _count_new_nodes(self, depth, n_nodes):
+        """Updates counters of tree nodes by ``n_nodes`` new nodes at the given ``depth``."""
+        if depth == len(self.tree_depths_counts):
+            self.tree_depths_counts.append(0)
+        self.tree_depths_counts[depth] += n_nodes
+        self.tree_nodes_count += n_nodes
+        self.tree_depths_sum += depth * n_nodes
+
+    def _tree_stats(self):
+        """Returns size, mean depth and maximum depth of the current tree (read from counters maintained incrementally)."""
+        return self.tree_nodes_count, self.tree_depths_sum / self.tree_nodes_count, len(self.tree_depths_counts) - 1
+
+    def _make_performance_info(self, n_root=None):
+        """
+        Prepares and returns a dictionary with information on performance during the last run (``n_root`` - number of visits of the root, read from the root state if ``None``). 
         After the call, available via ``performance_info`` attribute.
         """        
+        if n_root is None:
+            n_root = self.root.n
         performance_info = {}
         performance_info["steps"] = self.steps
         performance_info["steps_per_second"] = self.steps / self.time_total                
-        performance_info["playouts"] = self.root.n
+        performance_info["playouts"] = n_root
         performance_info["playouts_per_second"] = performance_info["playouts"] / self.time_total           
         ms_factor = 10.0**3
         times_info = {}
         times_info["total"] = ms_factor * self.time_total
         times_info["loop"] = ms_factor * self.time_loop
         times_info["reduce_over_actions"] = ms_factor * self.time_reduce_over_actions
-        times_info["mean_loop"] = times_info["loop"] / self.steps
-        times_info["mean_select"] = ms_factor * self.time_select / self.steps
-        times_info["mean_expand"] = ms_factor * self.time_expand / self.steps
-        times_info["mean_playout"] = ms_factor * self.time_playout / self.steps
-        times_info["mean_backup"] = ms_factor * self.time_backup / self.steps
+        times_info["mean_loop"] = times_info["loop"] / self.steps if self.steps > 0 else np.nan # no steps e.g. when the root has been proven already
+        times_info["mean_select"] = ms_factor * self.time_select / self.steps if self.steps > 0 else np.nan
+        times_info["mean_expand"] = ms_factor * self.time_expand / self.steps if self.steps > 0 else np.nan
+        times_info["mean_playout"] = ms_factor * self.time_playout / self.steps if self.steps > 0 else np.nan
+        times_info["mean_backup"] = ms_factor * self.time_backup / self.steps if self.steps > 0 else np.nan
+        if self.max_nodes < np.inf:
+            times_info["pruning"] = ms_factor * self.time_pruning
         performance_info["times_[ms]"] = times_info
+        if self.transposition_table_size > 0:
+            transpositions_info = {}
+            transpositions_info["size"] = len(self.transposition_table)
+            transpositions_info["lookups"] = self.transposition_lookups
+            transpositions_info["hits"] = self.transposition_hits
+            transpositions_info["hit_rate"] = self.transposition_hits / self.transposition_lookups if self.transposition_lookups > 0 else np.nan
+            transpositions_info["deduplicated_nodes"] = self.transposition_hits
+            transpositions_info["evictions"] = self.transposition_evictions
+            performance_info["transpositions"] = transpositions_info
+        if self.max_nodes < np.inf:
+            pruning_info = {}
+            pruning_info["max_nodes"] = self.max_nodes
+            pruning_info["events"] = self.prunings
+            pruning_info["reclaimed_nodes"] = self.pruned_nodes
+            performance_info["pruning"] = pruning_info
+        if self.solver:
+            solver_info = {}
+            solver_info["root_proven"] = self.root.proven
+            solver_info["proven_nodes"] = self.proven_nodes
+            performance_info["solver"] = solver_info
+        if self.early_stopping_interval > 0:
+            early_stopping_info = {}
+            early_stopping_info["reason"] = self.early_stopping_reason
+            stopped = self.early_stopping_reason is not None
+            saved_steps, saved_time = saved_budget(self.steps, self.time_loop, self.search_steps_limit, self.search_time_limit) if stopped else (0, 0.0)
+            early_stopping_info["saved_steps"] = saved_steps
+            early_stopping_info["saved_time_[ms]"] = ms_factor * saved_time
+            performance_info["early_stopping"] = early_stopping_info
+        if self.progressive_widening:
+            widening_info = {}
+            widening_info["widening_c"] = self.widening_c
+            widening_info["widening_alpha"] = self.widening_alpha
+            widening_info["branching_per_depth"] = self._branching_per_depth()
+            performance_info["widening"] = widening_info
+        if self.rave:
+            rave_info = {}
+            rave_info["schedule"] = self.rave_schedule
+            rave_info["equivalence" if self.rave_schedule == "equivalence" else "bias"] = self.rave_equivalence if self.rave_schedule == "equivalence" else self.rave_bias
+            rave_info["amaf_updates"] = self.amaf_updates
+            rave_info["amaf_updates_per_playout"] = self.amaf_updates / self.steps if self.steps > 0 else np.nan
+            performance_info["rave"] = rave_info
+        if self.sequential_halving:
+            halving_info = {}
+            halving_info["passes"] = self.halving_passes
+            halving_info["rounds"] = len(self.halving_round_steps_log)
+            halving_info["survivors"] = self.halving_survivors.size if self.halving_survivors is not None else len(self.root.children)
+            halving_info["round_steps_per_action"] = self.halving_round_steps_log
+            performance_info["sequential_halving"] = halving_info
+        if self.hard_deadline:
+            deadline_info = {}
+            deadline_info["refused_steps"] = self.refused_steps
+            deadline_info["aborted_steps"] = self.aborted_steps
+            deadline_info["step_cost_estimate_[ms]"] = ms_factor * self.step_cost_mean if self.step_cost_mean is not None else np.nan
+            deadline_info["step_cost_deviation_[ms]"] = ms_factor * self.step_cost_deviation
+            deadline_info.update(overruns_info(self.deadline_overruns))
+            performance_info["deadline"] = deadline_info
+        if self.pondering_info is not None:
+            performance_info["pondering"] = self.pondering_info
+        if self.gc_collections is not None:
+            gc_info = {}
+            gc_info["collections"] = self.gc_collections
+            gc_info["pause_[ms]"] = ms_factor * self.gc_time
+            performance_info["gc"] = gc_info
         tree_info = {}
         tree_info["initial_n_root"] = self.initial_n_root
         tree_info["initial_mean_depth"] = self.initial_mean_depth        
         tree_info["initial_max_depth"] = self.initial_max_depth
         tree_info["initial_size"] = self.initial_size            
-        tree_info["n_root"] = self.root.n
-        tree_info["mean_depth"] = np.mean(self.root._subtree_depths(0, []))
-        tree_info["max_depth"] = self.root._subtree_max_depth()
-        tree_info["size"] = self.root._subtree_size()              
+        tree_info["n_root"] = n_root
+        tree_info["size"], tree_info["mean_depth"], tree_info["max_depth"] = self._tree_stats()
         performance_info["tree"] = tree_info
         self.performance_info = performance_info
         return performance_info
 
                 
+    def _branching_per_depth(self):
+        """Returns a list with mean numbers of children of non-leaf states at consecutive depths of the current tree (effective branching factors)."""
+        branching = []
+        for level in self._tree_levels(self.root):
+            counts = [len(state.children) for state in level if len(state.children) > 0]
+            if len(counts) == 0:
+                break
+            branching.append(sum(counts) / len(counts))
+        return branching
+
     def _make_actions_info(self, children, best_action_entry=False):
         """
         Prepares and returns a dictionary with information on root actions implied by the last run, in particular: estimates of action values, their UCBs, counts of times actions were taken, etc.
         After the call, available via ``actions_info`` attribute.
         """
         actions_info = {}
-        for key in children.keys():
-            n_root = children[key].parent.n
+        for index, key in enumerate(children.keys()):
+            n_root = self.root.n
             win_flag = children[key].win_flag
             n = children[key].n
             n_wins = children[key].n_wins        
@@ -434,6 +1377,13 @@ class MCTS:
             entry["n_wins"] = n_wins
             entry["q"] = n_wins / n if n > 0 else np.nan
             entry["ucb"] = ucb
+            if self.solver:
+                entry["proven"] = children[key].proven
+                entry["loss_flag"] = children[key].proven == -self.root.turn # proven win of the opponent
+            if self.rave and self.root.children_amaf_ns is not None:
+                n_amaf = int(self.root.children_amaf_ns[index])
+                entry["n_amaf"] = n_amaf
+                entry["q_amaf"] = self.root.children_amaf_ns_wins[index] / n_amaf if n_amaf > 0 else np.nan
             actions_info[key] = entry
         if best_action_entry:
             best_key = self._best_action(children, actions_info)
@@ -442,17 +1392,6 @@ class MCTS:
         self.actions_info = actions_info
         return actions_info
     
-    def _best_action_ucb(self, children, actions_info):
-        """Returns the best action for selection stage purposes, i.e. the action with the largest UCB value."""  
-        best_key = None
-        best_ucb = -1.0
-        for key in children.keys():
-            ucb = actions_info[key]["ucb"]
-            if ucb > best_ucb:
-                best_ucb = ucb
-                best_key = key                        
-        return best_key    
-    
     def _best_action(self, root_children, root_actions_info):
         """
         Returns the best action among the root actions for the final decision.
@@ -460,19 +1399,28 @@ class MCTS:
         (1) in the first order, the win flag is decisive (attribute ``win_flag`` of a child state), 
         (2) if there is a tie (win flags equal), the number of times an action was taken becomes decisive (attribute ``n`` of a child state), 
         (3) if there still is a tie (both win flags and action execution counts equal), the number of wins becomes decisive (attribute ``n_wins`` of a child state).
+        With MCTS-Solver backups, actions proven to lose (``loss_flag`` entries of actions information) are placed after all other ones (between steps (1) and (2)).
+        With sequential halving, only actions surviving in its current pass are compared.
         """ 
+        if self.halving_survivors is not None: # sequential halving - actions eliminated in the current pass not considered
+            survivors_actions = set(self.root.children_actions[self.halving_survivors].tolist())
+            root_children = {key: child for key, child in root_children.items() if key in survivors_actions}
         self.best_action = None
         self.best_win_flag = False
+        self.best_loss_flag = True
         self.best_n = -1
         self.best_n_wins = -1
         for key in root_children.keys():            
             win_flag = root_actions_info[key]["win_flag"]
+            loss_flag = root_actions_info[key].get("loss_flag", False)
             n = root_actions_info[key]["n"]
             n_wins = root_actions_info[key]["n_wins"]
             if (win_flag > self.best_win_flag) or\
-             ((win_flag == self.best_win_flag) and (n > self.best_n)) or\
-             ((win_flag == self.best_win_flag) and (n == self.best_n) and (n_wins > self.best_n_wins)):
+             ((win_flag == self.best_win_flag) and (loss_flag < self.best_loss_flag)) or\
+             ((win_flag == self.best_win_flag) and (loss_flag == self.best_loss_flag) and (n > self.best_n)) or\
+             ((win_flag == self.best_win_flag) and (loss_flag == self.best_loss_flag) and (n == self.best_n) and (n_wins > self.best_n_wins)):
                 self.best_win_flag = win_flag
+                self.best_loss_flag = loss_flag
                 self.best_n = n
                 self.best_n_wins = n_wins
                 self.best_action = key
@@ -492,27 +1440,98 @@ class MCTS:
             self.best_action (int):
                 best action resulting from search.                        
         """
+        self._start_gc_tracking()
+        try:
+            for _ in self._search(root, forced_search_steps_limit):
+                pass
+            return self.best_action
+        finally:
+            self._stop_gc_tracking()
+
+    def run_iter(self, root, forced_search_steps_limit=np.inf, snapshot_steps=0, snapshot_ms=0.0, top_k=DEFAULT_SNAPSHOT_TOP_K):
+        """
+        Runs the search as ``run`` does, but as a generator yielding lightweight snapshots of the search in progress - every ``snapshot_steps`` steps and/or every ``snapshot_ms`` milliseconds -
+        and the final snapshot (with ``"final"`` entry set to ``True``) once the computational budget is used up. Snapshots are small dictionaries (see ``search_snapshot`` in :doc:`utils`) with numbers of steps and playouts so far,
+        elapsed time, the best root action so far and ``top_k`` root actions (as tuples: action, n, q), prepared without building actions information.
+        The caller may stop the search at any point by calling ``close()`` on the generator (or by breaking a ``for`` loop over it, if the generator is not referenced otherwise);
+        the search is then finalized as if its budget was used up (``best_action``, ``root_actions_info``, etc. available as after ``run``) and no final snapshot is yielded.
+        Time the caller spends between snapshots counts towards ``search_time_limit``.
+
+        Args:
+            root (State):
+                root state from which the search starts.
+            forced_search_steps_limit (int):
+                steps limit used only when reproducing results of a previous experiment; if less than``np.inf`` then has a priority over the standard computational budget given by ``search_time_limit`` and ``search_steps_limit``.
+            snapshot_steps (int):
+                number of steps between consecutive snapshots, ``0`` if snapshots are not taken by steps, defaults to ``0``.
+            snapshot_ms (float):
+                time in milliseconds between consecutive snapshots, ``0.0`` if snapshots are not taken by time, defaults to ``0.0``.
+            top_k (int):
+                number of root actions included in snapshots, defaults to ``5``.
+        Yields:
+            snapshot (dict):
+                snapshot of the search.
+        """
+        self._start_gc_tracking()
+        try:
+            yield from self._search(root, forced_search_steps_limit, snapshot_steps, snapshot_ms, top_k)
+        finally:
+            self._stop_gc_tracking()
+
+    def _start_gc_tracking(self):
+        """In the GC-aware mode, takes the collector for the run - disables it, unfreezes objects frozen after the previous run and starts measuring garbage collections (via ``gc.callbacks``); no effect otherwise."""
+        self.gc_collections = None
+        if not self.gc_aware:
+            return
+        if not MCTS.GC_AWARE_LOCK.acquire(blocking=False):
+            print("[gc-aware run already in progress (collector state is process-global), collector left as is]")
+            return
+        self.gc_collections = 0
+        self.gc_time = 0.0
+        self.gc_t1 = None
+        gc.callbacks.append(self._gc_callback)
+        self.gc_was_enabled = gc.isenabled()
+        gc.disable()
+        gc.unfreeze() # objects frozen after the previous run (e.g., its tree) returned to the oldest generation (not scanned while the collector is disabled)
+
+    def _stop_gc_tracking(self):
+        """Stops measuring garbage collections, freezes objects alive after the run (so that collections between runs do not scan the tree) and restores the collector - if taken by ``_start_gc_tracking``."""
+        if self.gc_collections is None:
+            return
+        gc.callbacks.remove(self._gc_callback)
+        gc.freeze()
+        if self.gc_was_enabled:
+            gc.enable()
+        MCTS.GC_AWARE_LOCK.release()
+
+    def _gc_callback(self, phase, info):
+        """Callback (registered in ``gc.callbacks``) accumulating the number of garbage collections and their pause time."""
+        if phase == "start":
+            self.gc_t1 = time.perf_counter()
+        elif self.gc_t1 is not None:
+            self.gc_collections += 1
+            self.gc_time += time.perf_counter() - self.gc_t1
+            self.gc_t1 = None
+
+    def _search(self, root, forced_search_steps_limit, snapshot_steps=0, snapshot_ms=0.0, top_k=0):
+        """Performs the search for ``run`` and ``run_iter`` (with garbage collections tracked by the caller) as a generator of snapshots - taken every ``snapshot_steps`` steps and/or every ``snapshot_ms`` milliseconds (if positive) and at the end."""
         print("MCTS RUN...")
         t1 = time.time()
-        self.root = root
-        self.root.parent = None
-        if self.vanilla:
-            self.root.n = 0                       
-            self.root.children = {}
+        self._join_ponder_thread()
+        self.pondering_info, self.ponder_report = self.ponder_report, None # pondering reported by the run following it
+        self._prepare_root(root)
         
         if self.verbose_info:
             self.initial_n_root = self.root.n                    
-            self.initial_mean_depth = np.mean(self.root._subtree_depths(0, []))
-            self.initial_max_depth = self.root._subtree_max_depth()            
-            self.initial_size = self.root._subtree_size()                         
+            self.initial_size, self.initial_mean_depth, self.initial_max_depth = self._tree_stats()
             
-        self.time_select = 0.0
-        self.time_expand = 0.0        
-        self.time_playout = 0.0
-        self.time_backup = 0.0    
-        self.steps = 0
+        self._reset_search_counters()
+        streaming = snapshot_steps > 0 or snapshot_ms > 0.0
+        stopped = False # search stopped by the caller of run_iter
+        deadline_on = self.hard_deadline and forced_search_steps_limit == np.inf and self.search_time_limit < np.inf
                 
         t1_loop = time.time()
+        t_snapshot = t1_loop
         while True:
             t2_loop = time.time()
             if forced_search_steps_limit < np.inf:
@@ -520,6 +1539,13 @@ class MCTS:
                     break
             elif self.steps >= self.search_steps_limit or t2_loop - t1_loop >= self.search_time_limit:
                 break            
+            elif self.early_stopping_interval > 0 and self.steps > 0 and self.steps % self.early_stopping_interval == 0 and self._stop_early(t2_loop - t1_loop):
+                break
+            elif deadline_on and self.steps > 0 and t2_loop - t1_loop + self.step_cost_mean + self.STEP_COST_MARGIN * self.step_cost_deviation > self.search_time_limit:
+                self.refused_steps += 1 # next step would likely miss the deadline
+                break
+            if self.solver and self.root.proven is not None and len(self.root.children) > 0: # root solved - no point in searching further
+                break
             state = self.root
             
             # selection
@@ -536,11 +1562,14 @@ class MCTS:
             if self.verbose_debug:
                 print(f"[MCTS._expand()...]")
             t1_expand = time.time()
-            state = self._expand(state)
+            state = self._expand(state) if t1_expand < self.step_deadline else None
             t2_expand = time.time()
             if self.verbose_debug:
                 print(f"[MCTS._expand() done; time: {t2_expand - t1_expand} s]")            
             self.time_expand += t2_expand - t1_expand            
+            if state is None: # deadline reached before or during the expansion - step not backed up
+                self._abort_step()
+                break
             
             # playout
             if self.verbose_debug:
@@ -552,6 +1581,9 @@ class MCTS:
             if self.verbose_debug:
                 print(f"[MCTS._playout() done; time: {t2_playout - t1_playout} s]")                        
             self.time_playout += t2_playout - t1_playout                            
+            if state is None: # playout aborted at the deadline - step not backed up
+                self._abort_step()
+                break
             
             # backup
             if self.verbose_debug:
@@ -563,8 +1595,28 @@ class MCTS:
                 print(f"[MCTS._backup() done; time: {t2_backup - t1_backup} s]")            
             self.time_backup += t2_backup - t1_backup                                
             
+            # pruning (node budget exceeded)
+            if self.tree_nodes_count > self.max_nodes:
+                t1_pruning = time.time()
+                self._prune_tree()
+                self.time_pruning += time.time() - t1_pruning
+            
             self.steps += 1  
+            if self.hard_deadline:
+                self.step_cost_mean, self.step_cost_deviation = step_cost_update(self.step_cost_mean, self.step_cost_deviation, time.time() - t2_loop, self.STEP_COST_ALPHA)
+                if deadline_on and self.steps == 1: # at least one step done in full (so that some action can be chosen), later steps aborted at the deadline
+                    self.step_deadline = t1_loop + self.search_time_limit
+            if streaming and ((snapshot_steps > 0 and self.steps % snapshot_steps == 0) or (snapshot_ms > 0.0 and 10.0**3 * (time.time() - t_snapshot) >= snapshot_ms)):
+                t_snapshot = time.time()
+                try:
+                    yield self._make_snapshot(t_snapshot - t1_loop, top_k)
+                except GeneratorExit: # search stopped by the caller - finalized below (no more snapshots)
+                    stopped = True
+                    break
         self.time_loop = time.time() - t1_loop
+        self.step_deadline = np.inf
+        if deadline_on:
+            self.deadline_overruns.append(self.time_loop - self.search_time_limit)
 
         if self.verbose_debug:
             print(f"[MCTS._reduce_over_actions()...]")        
@@ -586,46 +1638,446 @@ class MCTS:
             print(f"[performance info:\n{dict_to_str(self._make_performance_info())}]")
                                              
         print(f"MCTS RUN DONE. [time: {self.time_total} s; best action: {best_action_label}, best win_flag: {self.best_win_flag}, best n: {self.best_n}, best n_wins: {self.best_n_wins}, best q: {self.best_q}]")                      
-        return self.best_action
+        if not stopped:
+            yield self._make_snapshot(self.time_loop, top_k, final=True)
+
+    def _prepare_root(self, root):
+        """Makes the given state the root of the search (detached from its parent) and prepares the board arena, counters of tree nodes and the transposition table for searching from it (statistics cleared for vanilla searches)."""
+        self.root = root
+        self.root.parent = None
+        if self.board_arena:
+            self._prepare_board_arena()
+        if self.replay_nodes and (len(type(self.root).BOARD_FIELDS) == 0 or type(self.root).make_move is State.make_move):
+            print(f"[replay nodes not supported by class {type(self.root).__name__} (no BOARD_FIELDS or make_move), boards kept in all nodes]")
+            self.replay_nodes = False
+        if self.vanilla:
+            self.root.n = 0                       
+            self.root.proven = None
+            self.root._clear_children()
+            self.transposition_table = {}
+            self._reset_tree_counters(self.root, [1])
+        elif self.root is not self.tree_counters_root: # new root (or root advanced) - counters prepared once, then maintained incrementally
+            self._reset_tree_counters(self.root)
+        if self.transposition_table_size > 0:
+            self.transposition_table[self.root.zobrist_key] = self.root
+
+    def _reset_search_counters(self):
+        """Resets timers of search stages and counters of steps and events (transposition lookups, prunings, proven nodes, etc.) gathered during a search."""
+        self.transposition_lookups = 0
+        self.transposition_hits = 0
+        self.transposition_evictions = 0
+        self.time_select = 0.0
+        self.time_expand = 0.0        
+        self.time_playout = 0.0
+        self.time_backup = 0.0    
+        self.time_pruning = 0.0
+        self.prunings = 0
+        self.pruned_nodes = 0
+        self.proven_nodes = 0
+        self.amaf_updates = 0
+        self.halving_survivors = None
+        self.halving_passes = 0
+        self.halving_round_steps_log = []
+        self.early_stopping_reason = None
+        self.refused_steps = 0
+        self.aborted_steps = 0
+        self.steps = 0
+
+    def _make_snapshot(self, elapsed, top_k, final=False):
+        """Returns a lightweight snapshot of the search (see ``run_iter``), ``elapsed`` - time of the loop so far; the best action is the one chosen by ``_best_action`` for the final snapshot."""
+        n_root, actions, ns, ns_wins, win_flags = self._root_children_stats()
+        return search_snapshot(self.steps, n_root, elapsed, actions, ns, ns_wins, win_flags, top_k, best_action=self.best_action if final else None, final=final)
+
+    def _root_children_stats(self):
+        """Returns the number of visits of the root and lists with actions, visits counts, wins counts and win flags of root children (for snapshots)."""
+        root = self.root
+        return root.n, root.children_actions.tolist(), root.children_ns.tolist(), root.children_ns_wins.tolist(), [child.win_flag for child in root.children]
     
+    def _stop_early(self, elapsed):
+        """Checks the early stopping rule on statistics of root children (``elapsed`` - time of the loop so far); memorizes the reason for stopping and returns ``True`` if the search should stop."""
+        root = self.root
+        remaining_steps = remaining_steps_estimate(self.steps, elapsed, self.search_steps_limit, self.search_time_limit)
+        z = np.inf if root.untried_actions else self.early_stopping_z # values of untried actions (lazy expansion) unknown
+        self.early_stopping_reason = early_stopping_reason(root.children_ns.tolist(), root.children_ns_wins.tolist(), [child.win_flag for child in root.children],
+                                                           remaining_steps, self.n_playouts, z)
+        if self.early_stopping_reason == "single_action" and root.untried_actions:
+            self.early_stopping_reason = None
+        return self.early_stopping_reason is not None
+
+    def _best_child_index_ucb(self, state):
+        """Returns the index (in arrays with statistics of children) of the best child for selection stage purposes, i.e. the one with the largest UCB value (first one in case of ties)."""
+        ns = state.children_ns
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.rave and state.children_amaf_ns is not None: # children with AMAF statistics have finite UCB values even if not visited yet
+                ucbs = np.where((ns > 0) | (state.children_amaf_ns > 0), self._rave_values(state) + self.ucb_c * np.sqrt(np.log(state.n) / np.maximum(ns, 1)), np.inf)
+            else:
+                ucbs = np.where(ns > 0, state.children_ns_wins / ns + self.ucb_c * np.sqrt(np.log(state.n) / ns), np.inf)
+        if state.children_proven is not None: # proven children skipped (MCTS-Solver)
+            ucbs[state.children_proven] = -np.inf
+        return int(np.argmax(ucbs))
+
+    def _rave_values(self, state):
+        """Returns action values of children of the given state blending their plain estimates with AMAF estimates (RAVE) with weights given by the schedule (AMAF weights are 1 for unvisited children, 0 for children with no AMAF statistics)."""
+        ns = state.children_ns
+        amaf_ns = state.children_amaf_ns
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.rave_schedule == "equivalence":
+                betas = np.sqrt(self.rave_equivalence / (3.0 * ns + self.rave_equivalence))
+            else:
+                betas = amaf_ns / (ns + amaf_ns + 4.0 * self.rave_bias**2 * ns * amaf_ns)
+            betas = np.where(amaf_ns > 0, betas, 0.0)
+            qs = np.where(ns > 0, state.children_ns_wins / ns, 0.0)
+            amaf_qs = np.where(amaf_ns > 0, state.children_amaf_ns_wins / amaf_ns, 0.0)
+        return (1.0 - betas) * qs + betas * amaf_qs
+
     def _select(self, state):
-        """Performs the selection stage and returns the selected state."""
-        while len(state.children) > 0:
-            actions_info = self._make_actions_info(state.children)
-            best_ucb_action = self._best_action_ucb(state.children, actions_info)
-            state = state.children[best_ucb_action]
+        """Performs the selection stage and returns the selected state (the path of states and indexes of children along it are memorized for the backup stage)."""
+        self.path = [state]
+        self.path_indexes = [-1]
+        if self.sequential_halving and len(state.children) > 0 and not state.untried_actions: # root policy (once all root actions are materialized)
+            index = self._halving_child_index()
+            state = state.children[index]
+            self.path.append(state)
+            self.path_indexes.append(index)
+        while len(state.children) > 0 and not (state.untried_actions and self._admits_new_child(state)): # untried actions (lazy expansion) have infinite UCB values - selection stops at their state
+            index = self._best_child_index_ucb(state)
+            state = state.children[index]
+            self.path.append(state)
+            self.path_indexes.append(index)
+        if self.replay_nodes and not state._has_board():
+            self._replay_path(state)
         return state     
+
+    def _halving_child_index(self):
+        """Returns the index of the root child to be visited in the current step by sequential halving - the survivor least visited in the current round; ends rounds (halving survivors) and starts passes when due."""
+        if self.halving_survivors is None or self.halving_n_actions != len(self.root.children): # first step of the root policy or root children changed (e.g., pruned)
+            self._start_halving_pass()
+        elif self.halving_counts.min() >= self.halving_round_steps:
+            self._end_halving_round()
+        i = int(np.argmin(self.halving_counts))
+        self.halving_counts[i] += 1
+        return int(self.halving_survivors[i])
+
+    def _start_halving_pass(self):
+        """Starts a pass of sequential halving over all root actions, with the budget of remaining steps (finite steps limit) or with a budget doubled with each pass (no steps limit)."""
+        n_actions = len(self.root.children)
+        self.halving_n_actions = n_actions
+        self.halving_survivors = np.arange(n_actions)
+        self.halving_n_rounds = max(int(np.ceil(np.log2(n_actions))), 1)
+        if self.search_steps_limit < np.inf:
+            self.halving_budget = max(self.search_steps_limit - self.steps, 1)
+        else:
+            self.halving_budget = n_actions * self.halving_n_rounds * 2**self.halving_passes
+        self.halving_passes += 1
+        self.halving_round = 0
+        self._start_halving_round()
+
+    def _start_halving_round(self):
+        """Starts a round of sequential halving - the budget of the pass is split equally among rounds and, within a round, among survivors."""
+        self.halving_counts = np.zeros(self.halving_survivors.size, dtype=np.int64)
+        self.halving_round_steps = max(self.halving_budget // (self.halving_n_rounds * self.halving_survivors.size), 1)
+        self.halving_round_steps_log.append(self.halving_round_steps)
+
+    def _end_halving_round(self):
+        """Ends a round of sequential halving - keeps the better half of survivors (ordered by win flags, then proven losses last, then action values) and starts the next round or pass."""
+        root = self.root
+        survivors = self.halving_survivors
+        ns = root.children_ns[survivors]
+        qs = root.children_ns_wins[survivors] / np.maximum(ns, 1)
+        win_flags = np.array([root.children[i].win_flag for i in survivors.tolist()], dtype=np.bool_)
+        loss_flags = np.array([root.children[i].proven == -root.turn for i in survivors.tolist()], dtype=np.bool_)
+        order = np.lexsort((-qs, loss_flags, ~win_flags)) # last key primary, stable (ties kept in order of children)
+        self.halving_survivors = survivors[np.sort(order[:(survivors.size + 1) // 2])]
+        self.halving_round += 1
+        if self.halving_round < self.halving_n_rounds:
+            self._start_halving_round()
+        elif self.search_steps_limit == np.inf:
+            self._start_halving_pass()
+        else: # pass completed within the steps limit - the last survivor takes remaining steps
+            self.halving_counts = np.zeros(1, dtype=np.int64)
+            self.halving_round_steps = np.inf
+
+    def _admits_new_child(self, state):
+        """Returns ``True`` if a new child is to be materialized (from untried actions) at the given state - always in the lazy expansion mode, while the number of children is below ``ceil(widening_c * n**widening_alpha)`` in the progressive widening mode."""
+        if not self.progressive_widening:
+            return True
+        return len(state.children) < max(int(np.ceil(self.widening_c * state.n**self.widening_alpha)), 1)
+
+    def _replay_path(self, state):
+        """Rebuilds the board of the selected (board-free) state by replaying actions along the current path from the root on the replay cursor (replay mode)."""
+        cursor = self.replay_cursor
+        if cursor is None or not isinstance(self.root, type(cursor)):
+            cursor = self.root._make_scratch()
+            self.replay_cursor = cursor
+        cursor.copy_from(self.root)
+        for parent, index in zip(self.path[:-1], self.path_indexes[1:]):
+            cursor.make_move(int(parent.children_actions[index]))
+        state._restore_board(cursor)
+        self.replay_board_states.append(state)
     
     def _expand(self, state):
-        """Performs the expansion stage and returns the child (picked on random) on which to carry out the playout."""
-        state.expand()
+        """Performs the expansion stage and returns the child (picked on random) on which to carry out the playout or ``None`` if the expansion was abandoned at ``step_deadline``."""
+        if self.lazy_expansion or self.progressive_widening:
+            return self._expand_lazily(state)
+        expanded = len(state.children) == 0
+        if not state.expand(self.step_deadline):
+            return None
         if len(state.children) > 0:
-            random_child_key = np.random.choice(list(state.children.keys()))
-            state = state.children[random_child_key]
+            if expanded and self.replay_nodes and len(self.path) > 1: # children below depth 1 are made board-free after the step
+                self.replay_board_states.extend(state.children)
+            if expanded:
+                if self.gc_aware: # tree kept acyclic (only links from parents to children), so that discarded branches are freed by reference counting
+                    for child in state.children:
+                        child.parent = None
+                n_hits = self.transposition_hits
+                if self.transposition_table_size > 0:
+                    self._link_transpositions(state)
+                self._count_new_nodes(len(self.path), len(state.children) - (self.transposition_hits - n_hits))
+            random_child_index = np.random.randint(state.children_actions.size) if self.rng is None else int(self.rng.integers(state.children_actions.size)) # position in children list and arrays of their statistics
+            state = state.children[random_child_index]
+            self.path.append(state)
+            self.path_indexes.append(random_child_index)
         return state
+
+    def _expand_lazily(self, state):
+        """Performs the expansion stage in the lazy (or progressive widening) mode - materializes one child from untried actions of the state and returns it (or the state itself if it is terminal)."""
+        state.expand_lazily(ordered=self.progressive_widening, rng=self.rng)
+        child = state.take_untried_action()
+        if child is None:
+            return state
+        if self.gc_aware:
+            child.parent = None
+        if self.replay_nodes and len(self.path) > 1:
+            self.replay_board_states.append(child)
+        if self.transposition_table_size > 0 and self._link_transposition(state, len(state.children) - 1):
+            child = state.children[-1]
+        else:
+            self._count_new_nodes(len(self.path), 1)
+        self.path.append(child)
+        self.path_indexes.append(len(state.children) - 1)
+        return child
+
+    def _link_transpositions(self, state):
+        """Replaces children of a just expanded state by equal states found in the transposition table (statistics of such states become initial statistics of new edges) and inserts the remaining children into the table."""
+        for index in range(len(state.children)):
+            self._link_transposition(state, index, update_arrays=False)
+        state._update_children_arrays()
+
+    def _link_transposition(self, state, index, update_arrays=True):
+        """Replaces the child of state (at the given ``index`` in children list) by an equal state found in the transposition table or inserts the child into the table; returns ``True`` in the former case."""
+        table = self.transposition_table
+        child = state.children[index]
+        self.transposition_lookups += 1
+        entry = table.get(child.zobrist_key)
+        hit = entry is not None and entry is not child and entry.ply == child.ply and entry.turn == child.turn and np.array_equal(entry.get_board(), child.get_board())
+        if hit:
+            state.children[index] = entry
+            self.transposition_hits += 1
+            if update_arrays:
+                state.children_ns[index] = entry.n
+                state.children_ns_wins[index] = entry.n_wins
+                if entry.proven is not None:
+                    state._mark_child_proven(index)
+        else:
+            table[child.zobrist_key] = child
+            if len(table) > self.transposition_table_size:
+                self._evict_transpositions()
+        return hit
+
+    def _evict_transpositions(self):
+        """Evicts the least visited entries from the transposition table (states remain in the tree, but can no longer be shared)."""
+        table = self.transposition_table
+        n_evicted = max(len(table) - self.transposition_table_size, int(self.TRANSPOSITION_TABLE_EVICTION_FRACTION * self.transposition_table_size))
+        for key, _ in heapq.nsmallest(n_evicted, table.items(), key=lambda item: item[1].n):
+            del table[key]
+        self.transposition_evictions += n_evicted
     
     def _playout(self, state):
-        """Performs the playout stage and returns the reached terminal state."""
+        """Performs the playout stage and returns the reached terminal state (or, for ``n_playouts > 1``, the playout root state with outcomes of all playouts memorized in ``playouts_outcomes``) or ``None`` if the playout was aborted at ``step_deadline``."""
+        scratch_available = type(state).make_move is not State.make_move
+        if not scratch_available and len(state.children) > 0: # state shared via transposition table and already expanded elsewhere - playout from a detached copy
+            state = state._detached_copy()
+        self.playout_origin = None if scratch_available else state # root of playout branch to be discarded in backup (none for in-place playouts)
+        self.playout_actions = [] if self.rave else None
+        if self.n_playouts > 1:
+            return self._playout_leaf_parallel(state)
+        if scratch_available: # in place, on a reusable scratch state - no playout branch is created
+            state.compute_outcome() # outcome (and win flag) of the tree leaf itself, then copied to the scratch
+            scratch = self._prepare_playout_scratch(state)
+            if self._playout_in_place(scratch, actions=self.playout_actions, deadline=self.step_deadline) is None:
+                return None
+            return scratch
+        deadline = self.step_deadline
         while True:
             outcome = state.compute_outcome()
             if outcome is not None:
                 break        
-            state = state.take_random_action_playout()
+            if deadline < np.inf and time.time() >= deadline:
+                return None
+            state = state.take_random_action_playout(self.rng)
+            if self.gc_aware:
+                state.parent = None
+            if self.rave:
+                self.playout_actions.append(state.last_action_index)
         return state        
+
+    def _prepare_playout_scratch(self, state):
+        """Returns the reusable scratch state (created once per class of states) overwritten with the contents of the given state."""
+        scratch = self.playout_scratch
+        if scratch is None or not isinstance(state, type(scratch)): # states kept in board arena are instances of subclasses
+            scratch = state._make_scratch()
+            self.playout_scratch = scratch
+        scratch.copy_from(state)
+        return scratch
+
+    def _playout_in_place(self, scratch, unmake=False, actions=None, deadline=np.inf):
+        """
+        Carries out a random playout on the scratch state via ``make_move`` calls and returns its outcome or ``None`` if the playout was aborted at the ``deadline`` (time); 
+        if ``unmake`` flag is set, restores afterwards the scratch state via ``unmake_move`` calls; taken actions are appended to ``actions`` list (if given).
+        """
+        n_moves = 0
+        outcome = scratch.compute_outcome()
+        while outcome is None:
+            if deadline < np.inf and time.time() >= deadline:
+                break
+            action_index = scratch.random_playout_action(self.rng)
+            scratch.make_move(action_index)
+            if actions is not None:
+                actions.append(action_index)
+            n_moves += 1
+            outcome = scratch.compute_outcome()
+        if unmake:
+            for _ in range(n_moves):
+                scratch.unmake_move()
+        return outcome
     
-    def _backup(self, state, playout_root):
-        """Calls ``compute_outcome`` method on the terminal state (``state``), and suitably backs up the outcome to ancestors of the playout root."""
+    def _playout_leaf_parallel(self, state):
+        """Performs the playout stage as ``n_playouts`` independent playouts (concurrent, on a thread pool, for games with compiled mechanics) and returns the playout root state."""
+        outcome = state.compute_outcome()
+        outcomes = np.full(self.n_playouts, 0 if outcome is None else outcome, dtype=np.int8)
+        if outcome is None:
+            game = mctsnj_game_mechanics.game_code(type(state))
+            if game < 0: # no compiled mechanics - sequential playouts
+                if type(state).make_move is not State.make_move:
+                    scratch = self._prepare_playout_scratch(state)
+                    for k in range(self.n_playouts):
+                        outcomes[k] = self._playout_in_place(scratch, unmake=True)
+                else:
+                    for k in range(self.n_playouts):
+                        terminal = state
+                        while terminal.compute_outcome() is None:
+                            terminal = terminal.take_random_action_playout(self.rng)
+                            if self.gc_aware:
+                                terminal.parent = None
+                        outcomes[k] = terminal.outcome
+            else:
+                if self.playouts_executor is None:
+                    self.playouts_executor = ThreadPoolExecutor(max_workers=min(self.n_playouts, self.PLAYOUTS_CHUNKS, os.cpu_count()))
+                board = np.ascontiguousarray(state.get_board(), dtype=np.int8)
+                extra_info = state.get_extra_info()
+                extra_info = np.zeros(1, dtype=np.int8) if extra_info is None else np.ascontiguousarray(extra_info, dtype=np.int8)
+                last_action = -1 if state.last_action_index is None else state.last_action_index
+                chunks = np.array_split(outcomes, min(self.n_playouts, self.PLAYOUTS_CHUNKS)) # split independent of the number of threads, so that outcomes do not depend on the machine
+                chunks_seeds = np.random.SeedSequence((self.seed, self.playouts_batches)).spawn(len(chunks)) # each chunk seeded on its own (not per thread), by seed, batch and chunk index
+                futures = [self.playouts_executor.submit(mctsnj_game_mechanics.seeded_playouts, game, board, extra_info, state.turn, last_action, chunk, int(chunk_seed.generate_state(1)[0]))
+                           for chunk, chunk_seed in zip(chunks, chunks_seeds)]
+                self.playouts_batches += 1
+                for future in futures:
+                    future.result()
+        self.playouts_outcomes = outcomes
+        return state
+
+    def _playouts_counts(self, state):
+        """Returns the number of playouts carried out in the current step and the numbers of their wins for the minimizing and maximizing player, respectively."""
+        if self.n_playouts > 1:
+            outcomes = self.playouts_outcomes
+            return self.n_playouts, int(np.sum(outcomes == -1)), int(np.sum(outcomes == 1))
         outcome = state.compute_outcome()
-        state = playout_root
-        del state.children # getting rid of playout branch
-        state.children = {}
-        while state:
-            state.n += 1
-            if state.turn == -outcome:
-                state.n_wins += 1
-            state = state.parent
+        return 1, int(outcome == -1), int(outcome == 1)
+
+    def _backup(self, state, playout_root):
+        """Calls ``compute_outcome`` method on the terminal state (``state``) (or uses outcomes of leaf-parallel playouts), and suitably backs up the outcome(s) along the selected path, i.e. to the playout root and its ancestors (states and edges)."""
+        n_playouts, n_wins_min, n_wins_max = self._playouts_counts(state)
+        self._discard_playout_branch()
+        for p in range(len(self.path) - 1, -1, -1):
+            state = self.path[p]
+            state.n += n_playouts
+            n_wins = n_wins_max if state.turn == -1 else n_wins_min
+            state.n_wins += n_wins
+            if p > 0:
+                parent = self.path[p - 1]
+                index = self.path_indexes[p]
+                parent.children_ns[index] += n_playouts
+                parent.children_ns_wins[index] += n_wins
+        if self.rave:
+            self._backup_amaf(n_playouts, n_wins_min, n_wins_max)
+        if self.solver:
+            self._backup_proofs()
+        if self.replay_nodes:
+            self._drop_replay_boards()
+
+    def _discard_playout_branch(self):
+        """Gets rid of the playout branch (states created by the last playout out of place), releasing their rows of the board arena."""
+        playout_origin = self.playout_origin
+        if playout_origin is not None:
+            if self.arena is not None:
+                self._free_arena_rows(playout_origin.children)
+            playout_origin._clear_children()
+            self.playout_origin = None
+
+    def _drop_replay_boards(self):
+        """Drops boards rebuilt (replay mode) for states along the selected path in the current step."""
+        for board_state in self.replay_board_states:
+            board_state._drop_board()
+        self.replay_board_states = []
+
+    def _abort_step(self):
+        """Cleans up after the step aborted at the deadline (the step is not backed up) - discards the playout branch (if any) and boards rebuilt along the selected path; counts the step in ``aborted_steps``."""
+        self.aborted_steps += 1
+        self._discard_playout_branch()
+        if self.replay_nodes:
+            self._drop_replay_boards()
             
+    def _backup_amaf(self, n_playouts, n_wins_min, n_wins_max):
+        """Updates AMAF statistics (RAVE) of states along the selected path - children of each state are credited with the playout(s) if their actions were taken later on (in the tree or in the playout) by the player to move in that state."""
+        path = self.path
+        actions = [int(path[p - 1].children_actions[self.path_indexes[p]]) for p in range(1, len(path))] + (self.playout_actions if self.n_playouts == 1 else [])
+        for p, state in enumerate(path):
+            if len(state.children) > 0:
+                n_wins = n_wins_max if state.turn == 1 else n_wins_min
+                self.amaf_updates += state._update_amaf(actions[p::2], n_playouts, n_wins) # players alternate, so actions of the player to move are every second one
+        
+    def _backup_proofs(self):
+        """Carries out MCTS-Solver backups - marks the selected leaf as proven if it is terminal and propagates proven values up the selected path as long as they imply values of ancestors."""
+        leaf = self.path[-1]
+        if leaf.proven is None:
+            outcome = leaf.compute_outcome()
+            if outcome is None:
+                return
+            leaf._set_proven(outcome)
+            self.proven_nodes += 1
+        for p in range(len(self.path) - 1, 0, -1):
+            parent = self.path[p - 1]
+            parent._mark_child_proven(self.path_indexes[p])
+            if parent.proven is not None:
+                break
+            value = parent._prove_from_children()
+            if value is None:
+                break
+            parent._set_proven(value)
+            self.proven_nodes += 1
+
+    def _free_arena_rows(self, states):
+        """Returns to the free list of the board arena rows of the given states and their descendants (a discarded branch)."""
+        stack = list(states)
+        while stack:
+            state = stack.pop()
+            if state.arena is self.arena:
+                self.arena.free(state.board_index)
+            stack.extend(state.children)
+
     def _reduce_over_actions(self):
         """Calls ``_make_actions_info`` and ``_best_action`` using children states of the root to finds the best available action."""
-        self.root_actions_info = self._make_actions_info(self.root.children, best_action_entry=True)
-        self._best_action(self.root.children, self.root_actions_info)
\ No newline at end of file
+        root_children = dict(zip(self.root.children_actions.tolist(), self.root.children))
+        self.root_actions_info = self._make_actions_info(root_children, best_action_entry=True)
+        self._best_action(root_children, self.root_actions_info)
\ No newline at end of file
@@ -0,0 +1,330 @@
+"""
+Auxiliary module with a struct-of-arrays (SoA) variant of the referential MCTS algorithm (for CPU, single-threaded).
+The module contains:
+
+- ``MCTSSoA``: class representing the referential MCTS algorithm (inherits from ``MCTS`` in :doc:`mcts`), in which the tree is stored
+  as a set of preallocated (and geometrically grown) NumPy arrays rather than as linked ``State`` objects.
+
+Only the root and the states along the currently selected path are materialized as ``State`` objects (by replaying actions stored in the arrays),
+hence the memory used per tree node drops from hundreds of bytes (``State`` object with its ``__dict__``, children list, arrays of children statistics and board copy) to a few dozen bytes.
+
+Link to project repository
+--------------------------
+`https://github.com/pklesk/mcts_numba_cuda <https://github.com/pklesk/mcts_numba_cuda>`_
+
+Notes
+-----
+Private functions of ``MCTSSoA`` class are named with a single leading underscore.
+For public methods full docstrings are provided (with arguments and returns described). For private functions short docstrings are provided.
+"""
+
+import numpy as np
+from mcts import MCTS
+
+__version__ = "1.0.1"
+__author__ = "Przemysław Klęsk"
+__email__ = "pklesk@zut.edu.pl"
+
+class MCTSSoA(MCTS):
+    """
+    Monte Carlo Tree Search - referential implementation (for CPU, single-threaded) with the tree kept in a struct-of-arrays form.
+    Each tree node is a row index into arrays: ``tree_parents``, ``tree_first_children``, ``tree_n_children``, ``tree_actions``, ``tree_ns``, ``tree_ns_wins``,
+    ``tree_turns``, ``tree_terminals``, ``tree_outcomes``, ``tree_depths``. Children of a node are always allocated contiguously (all at once, at its expansion),
+    so that selection computes UCBs over a slice of arrays and backup walks integer arrays instead of dicts.
+    Searches are always vanilla (no information from previous searches is reused).
+    """
+
+    DEFAULT_INITIAL_TREE_CAPACITY = 2**16
+    TREE_GROWTH_FACTOR = 2
+
+    def __init__(self,
+                 search_time_limit=MCTS.DEFAULT_SEARCH_TIME_LIMIT, search_steps_limit=MCTS.DEFAULT_SEARCH_STEPS_LIMIT,
+                 initial_tree_capacity=DEFAULT_INITIAL_TREE_CAPACITY, n_playouts=MCTS.DEFAULT_N_PLAYOUTS,
+                 ucb_c=MCTS.DEFAULT_UCB_C, seed=MCTS.DEFAULT_SEED,
+                 verbose_debug=MCTS.DEFAULT_VERBOSE_DEBUG, verbose_info=MCTS.DEFAULT_VERBOSE_INFO):
+        """
+        Constructor of ``MCTSSoA`` instances.
+
+        Args:
+            search_time_limit (float):
+                time limit in seconds (computational budget), ``np.inf`` if no limit, defaults to ``5.0``.
+            search_steps_limit (float):
+                steps limit (computational budget), ``np.inf`` if no limit, defaults to ``np.inf``.
+            initial_tree_capacity (int):
+                number of nodes for which tree arrays are preallocated (arrays grow geometrically when exceeded), defaults to ``2**16``.
+            n_playouts (int):
+                number of independent playouts carried out from each expanded leaf (leaf parallelization if greater than ``1``), defaults to ``1``.
+            ucb_c (float):
+                value of C constant, influencing exploration tendency, appearing in UCT formula (upper confidence bounds for trees), defaults to ``2.0``.
+            seed (int):
+                seed for the random number generator, defaults to ``0``.
+            verbose_debug (bool):
+                debug verbosity flag, if ``True`` then detailed information about each kernel invocation are printed to console (in each iteration), defaults to ``False``.
+            verbose_info (bool):
+                verbosity flag, if ``True`` then standard information on actions and performance are printed to console (after a full run), defaults to ``True``.
+        """
+        super().__init__(search_time_limit=search_time_limit, search_steps_limit=search_steps_limit, vanilla=True, n_playouts=n_playouts, ucb_c=ucb_c, seed=seed,
+                         verbose_debug=verbose_debug, verbose_info=verbose_info)
+        self.initial_tree_capacity = max(int(initial_tree_capacity), 1)
+        self.tree_capacity = 0
+
+    def __str__(self):
+        """
+        Returns a string representation of this ``MCTSSoA`` instance.
+
+        Returns:
+            str: string representation of this ``MCTSSoA`` instance.
+        """
+        return f"MCTSSoA(search_time_limit={self.search_time_limit}, search_steps_limit={self.search_steps_limit}, initial_tree_capacity={self.initial_tree_capacity}, n_playouts={self.n_playouts}, ucb_c={self.ucb_c}, seed: {self.seed})"
+
+    def _allocate_tree(self, capacity):
+        """Allocates (or reallocates preserving contents) tree arrays for the given capacity."""
+        old_size = self.tree_size if self.tree_capacity > 0 else 0
+        new_arrays = {
+            "tree_parents": np.empty(capacity, dtype=np.int32),
+            "tree_first_children": np.empty(capacity, dtype=np.int32),
+            "tree_n_children": np.empty(capacity, dtype=np.int16),
+            "tree_actions": np.empty(capacity, dtype=np.int16),
+            "tree_ns": np.empty(capacity, dtype=np.int32),
+            "tree_ns_wins": np.empty(capacity, dtype=np.int32),
+            "tree_turns": np.empty(capacity, dtype=np.int8),
+            "tree_terminals": np.empty(capacity, dtype=bool),
+            "tree_outcomes": np.empty(capacity, dtype=np.int8),
+            "tree_depths": np.empty(capacity, dtype=np.int16)
+            }
+        for name, array in new_arrays.items():
+            if old_size > 0:
+                array[:old_size] = getattr(self, name)[:old_size]
+            setattr(self, name, array)
+        self.tree_capacity = capacity
+
+    def _ensure_tree_capacity(self, extra_nodes):
+        """Grows tree arrays geometrically if ``extra_nodes`` more nodes would not fit into them."""
+        required = self.tree_size + extra_nodes
+        if required > self.tree_capacity:
+            capacity = max(self.tree_capacity, 1)
+            while capacity < required:
+                capacity *= self.TREE_GROWTH_FACTOR
+            if self.verbose_debug:
+                print(f"[MCTSSoA._ensure_tree_capacity(): growing tree arrays from {self.tree_capacity} to {capacity} nodes]")
+            self._allocate_tree(capacity)
+
+    def _reset_tree(self, root):
+        """Resets tree arrays so that they contain only the root node (corresponding to the given root state)."""
+        if self.tree_capacity < self.initial_tree_capacity:
+            self.tree_capacity = 0
+            self._allocate_tree(self.initial_tree_capacity)
+        self.tree_size = 1
+        outcome = root.compute_outcome()
+        self.tree_parents[0] = -1
+        self.tree_first_children[0] = -1
+        self.tree_n_children[0] = 0
+        self.tree_actions[0] = -1
+        self.tree_ns[0] = 0
+        self.tree_ns_wins[0] = 0
+        self.tree_turns[0] = root.turn
+        self.tree_terminals[0] = outcome is not None
+        self.tree_outcomes[0] = outcome if outcome is not None else 0
+        self.tree_depths[0] = 0
+        self.path_nodes = [0] # nodes of the currently materialized path (root first)
+        self.path_states = [root] # states materialized for path_nodes
+
+    def run(self, root, forced_search_steps_limit=np.inf):
+        """
+        Runs the referential implementation of Monte Carlo Tree Search (on CPU, single-threaded) with the tree stored in a struct-of-arrays form.
+
+        Args:
+            root (State):
+                root state from which the search starts.
+            forced_search_steps_limit (int):
+                steps limit used only when reproducing results of a previous experiment; if less than``np.inf`` then has a priority over the standard computational budget given by ``search_time_limit`` and ``search_steps_limit``.
+        Returns:
+            self.best_action (int):
+                best action resulting from search.
+        """
+        root.parent = None
+        root._clear_children()
+        self._reset_tree(root)
+        return super().run(root, forced_search_steps_limit)
+
+    def ponder_start(self, action_index, steps_limit=np.inf):
+        """Pondering is not supported (the tree is rebuilt in arrays from the root by each run, hence nothing pondered would be kept) - returns ``None``."""
+        return None
+
+    def run_iter(self, root, forced_search_steps_limit=np.inf, snapshot_steps=0, snapshot_ms=0.0, top_k=MCTS.DEFAULT_SNAPSHOT_TOP_K):
+        """
+        Runs the search (see ``run``) as a generator yielding lightweight snapshots of the search in progress and the final snapshot (see ``run_iter`` of ``MCTS`` for details).
+
+        Args:
+            root (State):
+                root state from which the search starts.
+            forced_search_steps_limit (int):
+                steps limit used only when reproducing results of a previous experiment; if less than``np.inf`` then has a priority over the standard computational budget given by ``search_time_limit`` and ``search_steps_limit``.
+            snapshot_steps (int):
+                number of steps between consecutive snapshots, ``0`` if snapshots are not taken by steps, defaults to ``0``.
+            snapshot_ms (float):
+                time in milliseconds between consecutive snapshots, ``0.0`` if snapshots are not taken by time, defaults to ``0.0``.
+            top_k (int):
+                number of root actions included in snapshots, defaults to ``5``.
+        Yields:
+            snapshot (dict):
+                snapshot of the search.
+        """
+        root.parent = None
+        root._clear_children()
+        self._reset_tree(root)
+        yield from super().run_iter(root, forced_search_steps_limit, snapshot_steps, snapshot_ms, top_k)
+
+    def _materialize_path(self, nodes):
+        """Makes ``State`` objects available for all the given nodes (a path from root) reusing the common prefix with the formerly materialized path; returns the last state."""
+        depth = 1
+        common = min(len(nodes), len(self.path_nodes))
+        while depth < common and nodes[depth] == self.path_nodes[depth]:
+            depth += 1
+        del self.path_nodes[depth:]
+        del self.path_states[depth:]
+        state = self.path_states[-1]
+        for node in nodes[depth:]:
+            state = self._make_child(state, node)
+            self.path_nodes.append(node)
+            self.path_states.append(state)
+        return state
+
+    def _make_child(self, state, node):
+        """Creates the ``State`` object for the given node, a child of the given state (not attached to its children), by replaying the node's action; the outcome of the node is taken from tree arrays if known."""
+        child = type(state)(state) # copying constructor
+        action_index = int(self.tree_actions[node])
+        child.take_action_job(action_index)
+        child.last_action_index = action_index
+        self.tree_turns[node] = child.turn
+        if self.tree_terminals[node]:
+            child.outcome = int(self.tree_outcomes[node])
+            child.outcome_computed = True
+            child.win_flag = child.outcome == -child.turn
+        return child
+
+    def _select(self, state):
+        """Performs the selection stage (walking tree arrays), materializes the selected path and returns the selected state."""
+        node = 0
+        nodes = [0]
+        while self.tree_n_children[node] > 0:
+            first = self.tree_first_children[node]
+            s = slice(first, first + self.tree_n_children[node])
+            ns = self.tree_ns[s]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ucbs = np.where(ns > 0, self.tree_ns_wins[s] / ns + self.ucb_c * np.sqrt(np.log(self.tree_ns[node]) / ns), np.inf)
+            node = first + int(np.argmax(ucbs))
+            nodes.append(node)
+        self.selected_nodes = nodes
+        return self._materialize_path(nodes)
+
+    def _expand(self, state):
+        """
+        Performs the expansion stage (children allocated contiguously in tree arrays, only their actions known) and returns the child (picked on random) on which to carry out the playout - 
+        the only child materialized as a ``State`` object. Outcomes of nodes are computed (and written to tree arrays) once nodes are materialized as leaves or playout roots.
+        """
+        node = self.selected_nodes[-1]
+        self.playout_root_node = node
+        if self._record_outcome(state, node) is not None:
+            return state
+        actions = state.legal_actions()
+        n_children = actions.size
+        if n_children == 0:
+            return state
+        self._ensure_tree_capacity(n_children)
+        first = self.tree_size
+        s = slice(first, first + n_children)
+        self.tree_parents[s] = node
+        self.tree_first_children[s] = -1
+        self.tree_n_children[s] = 0
+        self.tree_actions[s] = actions
+        self.tree_ns[s] = 0
+        self.tree_ns_wins[s] = 0
+        self.tree_turns[s] = -state.turn # until materialized
+        self.tree_terminals[s] = False # until materialized
+        self.tree_outcomes[s] = 0
+        self.tree_depths[s] = self.tree_depths[node] + 1
+        self.tree_first_children[node] = first
+        self.tree_n_children[node] = n_children
+        self.tree_size += n_children
+        random_child_index = np.random.randint(n_children)
+        self.playout_root_node = first + random_child_index
+        child = self._make_child(state, self.playout_root_node)
+        self._record_outcome(child, self.playout_root_node)
+        return child
+
+    def _record_outcome(self, state, node):
+        """Computes the outcome of the given (materialized) state and, if terminal, marks its node as terminal in tree arrays; returns the outcome."""
+        outcome = state.compute_outcome()
+        if outcome is not None:
+            self.tree_terminals[node] = True
+            self.tree_outcomes[node] = outcome
+        return outcome
+
+    def _backup(self, state, playout_root):
+        """Suitably backs up the outcome(s) of the playout(s) to the playout root node and its ancestors (walking the array of parents)."""
+        n_playouts, n_wins_min, n_wins_max = self._playouts_counts(state)
+        playout_root._clear_children() # getting rid of playout branch
+        node = self.playout_root_node
+        path = self.selected_nodes if node == self.selected_nodes[-1] else self.selected_nodes + [node]
+        path = np.array(path, dtype=np.int32)
+        self.tree_ns[path] += n_playouts
+        self.tree_ns_wins[path] += np.where(self.tree_turns[path] == -1, n_wins_max, n_wins_min).astype(np.int32)
+
+    def _root_children_info(self):
+        """Returns a dictionary mapping root actions to tuples with: child node index, win flag, n, n_wins."""
+        first = self.tree_first_children[0]
+        info = {}
+        for node in range(first, first + self.tree_n_children[0]):
+            win_flag = bool(self.tree_terminals[node] and self.tree_outcomes[node] == -self.tree_turns[node])
+            info[int(self.tree_actions[node])] = (node, win_flag, int(self.tree_ns[node]), int(self.tree_ns_wins[node]))
+        return info
+
+    def _root_children_stats(self):
+        """Returns the number of visits of the root and lists with actions, visits counts, wins counts and win flags of root children (read from tree arrays, for snapshots)."""
+        info = self._root_children_info()
+        return int(self.tree_ns[0]), list(info.keys()), [n for _, _, n, _ in info.values()], [n_wins for _, _, _, n_wins in info.values()], [win_flag for _, win_flag, _, _ in info.values()]
+
+    def _make_actions_info(self, children, best_action_entry=False):
+        """
+        Prepares and returns a dictionary with information on root actions implied by the last run (read from tree arrays), in particular: estimates of action values, their UCBs, counts of times actions were taken, etc.
+        After the call, available via ``actions_info`` attribute.
+        """
+        actions_info = {}
+        n_root = int(self.tree_ns[0])
+        for key, (_, win_flag, n, n_wins) in children.items():
+            entry = {}
+            entry["name"] = type(self.root).action_index_to_name(key)
+            entry["n_root"] = n_root
+            entry["win_flag"] = win_flag
+            entry["n"] = n
+            entry["n_wins"] = n_wins
+            entry["q"] = n_wins / n if n > 0 else np.nan
+            entry["ucb"] = entry["q"] + self.ucb_c * np.sqrt(np.log(n_root) / n) if n > 0 else np.inf
+            actions_info[key] = entry
+        if best_action_entry:
+            best_key = self._best_action(children, actions_info)
+            best_entry = {"index": best_key, **actions_info[best_key]}
+            actions_info["best"] = best_entry
+        self.actions_info = actions_info
+        return actions_info
+
+    def _reduce_over_actions(self):
+        """Calls ``_make_actions_info`` and ``_best_action`` using root children read from tree arrays to finds the best available action."""
+        root_children = self._root_children_info()
+        self.root_actions_info = self._make_actions_info(root_children, best_action_entry=True)
+        self._best_action(root_children, self.root_actions_info)
+
+    def _make_performance_info(self):
+        """
+        Prepares and returns a dictionary with information on performance during the last run (tree information read from tree arrays).
+        After the call, available via ``performance_info`` attribute.
+        """
+        performance_info = super()._make_performance_info(n_root=int(self.tree_ns[0]))
+        performance_info["tree"]["capacity"] = int(self.tree_capacity)
+        return performance_info
+
+    def _tree_stats(self):
+        """Returns size, mean depth and maximum depth of the current tree (read from tree arrays)."""
+        depths = self.tree_depths[:self.tree_size]
+        return int(self.tree_size), float(np.mean(depths)), int(np.max(depths))
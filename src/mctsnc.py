@@ -163,7 +163,7 @@ from numba.cuda.random import create_xoroshiro128p_states, xoroshiro128p_uniform
 import time
 import math
 from mctsnc_game_mechanics import is_action_legal, take_action, legal_actions_playout, take_action_playout, compute_outcome
-from utils import dict_to_str
+from utils import dict_to_str, early_stopping_reason, gain_per_step_estimate, remaining_steps_estimate, saved_budget, search_snapshot, step_cost_update, overruns_info
 import json
 
 __version__ = "1.0.2"
@@ -186,8 +186,14 @@ class MCTSNC:
     DEFAULT_DEVICE_MEMORY = 2.0 
     DEFAULT_UCB_C = 2.0
     DEFAULT_SEED = 0 
+    DEFAULT_EARLY_STOPPING_INTERVAL = 0 # steps between checks of the early stopping rule, 0 - no early stopping
+    DEFAULT_EARLY_STOPPING_Z = np.inf # width (in standard deviations) of confidence intervals for action values in the early stopping rule, np.inf - intervals not used
     DEFAULT_VERBOSE_DEBUG = False
     DEFAULT_VERBOSE_INFO = True
+    DEFAULT_SNAPSHOT_TOP_K = 5 # number of root actions in snapshots yielded by run_iter
+    DEFAULT_HARD_DEADLINE = False
+    STEP_COST_ALPHA = 0.1 # smoothing factor of running estimates of the mean cost of a step and of its mean absolute deviation (hard deadline)
+    STEP_COST_MARGIN = 3.0 # predicted cost of the next step: mean + STEP_COST_MARGIN * mean absolute deviation (hard deadline)
     MAX_STATE_BOARD_SHAPE = (32, 32)
     MAX_STATE_EXTRA_INFO_MEMORY = 4096
     MAX_STATE_MAX_ACTIONS = 512            
@@ -201,7 +207,8 @@ class MCTSNC:
                  n_trees=DEFAULT_N_TREES, n_playouts=DEFAULT_N_PLAYOUTS, variant=DEFAULT_VARIANT, device_memory=DEFAULT_DEVICE_MEMORY,                   
                  ucb_c=DEFAULT_UCB_C, seed=DEFAULT_SEED,
                  verbose_debug=DEFAULT_VERBOSE_DEBUG, verbose_info=DEFAULT_VERBOSE_INFO,
-                 action_index_to_name_function=None):
+                 action_index_to_name_function=None,
+                 early_stopping_interval=DEFAULT_EARLY_STOPPING_INTERVAL, early_stopping_z=DEFAULT_EARLY_STOPPING_Z, hard_deadline=DEFAULT_HARD_DEADLINE):
         """
         Constructor of ``MCTSNC`` instances.
          
@@ -232,6 +239,14 @@ class MCTSNC:
                 verbosity flag, if ``True`` then standard information on actions and performance are printed to console (after a full run), defaults to ``True``.
             action_index_to_name_function (callable):
                 pointer to user-provided function converting action indexes to a human-friendly names (e.g. ``"e2:e4"`` for chess), defaults to ``None``.            
+            early_stopping_interval (int):
+                number of steps between checks of the early stopping rule (on statistics of root actions summed over trees): the search ends before its budget is used up if the runner-up
+                (by visits counts) cannot overtake the leader within the remaining budget or confidence intervals for their action values are disjoint, ``0`` if no early stopping, defaults to ``0``.
+            early_stopping_z (float):
+                half-width of confidence intervals for action values (in standard deviations) in the early stopping rule, ``np.inf`` if only visits counts are compared, defaults to ``np.inf``.
+            hard_deadline (bool):
+                flag indicating whether ``search_time_limit`` is treated as a hard deadline: a step (sequence of kernels) is not started if its cost, predicted from running estimates over previous steps
+                (also of previous runs), would exceed the time left; the first step of each run is always done; overruns of the deadline per move (run) are reported, defaults to ``False``.
         """
         self._set_cuda_constants()
         if not self.cuda_available:
@@ -274,6 +289,15 @@ class MCTSNC:
         self.verbose_info = verbose_info 
         self._validate_param("verbose_info", bool, False, False, False, True, self.DEFAULT_VERBOSE_INFO)        
         self.action_index_to_name_function = action_index_to_name_function                                                                  
+        self.early_stopping_interval = early_stopping_interval
+        self._validate_param("early_stopping_interval", int, False, 0, False, np.inf, self.DEFAULT_EARLY_STOPPING_INTERVAL)
+        self.early_stopping_z = early_stopping_z
+        self._validate_param("early_stopping_z", float, True, 0.0, False, np.inf, self.DEFAULT_EARLY_STOPPING_Z)
+        self.hard_deadline = hard_deadline
+        self._validate_param("hard_deadline", bool, False, False, False, True, self.DEFAULT_HARD_DEADLINE)
+        self.step_cost_mean = None # running estimate of the mean cost of a step [s] (hard deadline), None before the first step
+        self.step_cost_deviation = 0.0 # running estimate of the mean absolute deviation of the cost of a step [s] (hard deadline)
+        self.deadline_overruns = [] # overruns of the deadline [s] in consecutive runs (hard deadline), negative if the loop ended before the deadline
     
     def _set_cuda_constants(self):
         """Investigates (via ``numba`` module) if CUDA-based computations are available and, if so, sets suitable constants."""
@@ -302,7 +326,12 @@ class MCTSNC:
         Returns:
             str: string representation of this ``MCTSNC`` instance.
         """   
-        return f"MCTSNC(search_time_limit={self.search_time_limit}, search_steps_limit={self.search_steps_limit}, n_trees={self.n_trees}, n_playouts={self.n_playouts}, variant='{self.variant}', device_memory={np.round(self.device_memory / 1024**3, 2)}, ucb_c={self.ucb_c}, seed: {self.seed})"
+        early_stopping_params = "" # shown only if early stopping is on (string of an instance with defaults as in former versions)
+        if self.early_stopping_interval > 0:
+            early_stopping_params = f", early_stopping_interval={self.early_stopping_interval}, early_stopping_z={self.early_stopping_z}"
+        if self.hard_deadline: # shown only if on, likewise
+            early_stopping_params += f", hard_deadline={self.hard_deadline}"
+        return f"MCTSNC(search_time_limit={self.search_time_limit}, search_steps_limit={self.search_steps_limit}, n_trees={self.n_trees}, n_playouts={self.n_playouts}, variant='{self.variant}', device_memory={np.round(self.device_memory / 1024**3, 2)}, ucb_c={self.ucb_c}, seed: {self.seed}{early_stopping_params})"
         
     def __repr__(self):
         """
@@ -425,13 +454,59 @@ class MCTSNC:
                 best action resulting from search.
         """
         print(f"MCTSNC RUN... [{self}]")        
+        self.early_stopping_reason = None
+        self.refused_steps = 0
         run_method = getattr(self, "_run_" + self.variant)
-        run_method(root_board, root_extra_info, root_turn, forced_search_steps_limit)
+        for _ in run_method(root_board, root_extra_info, root_turn, forced_search_steps_limit):
+            pass
+        self._print_run_done()
+        return self.best_action
+
+    def run_iter(self, root_board, root_extra_info, root_turn, forced_search_steps_limit=np.inf, snapshot_steps=0, snapshot_ms=0.0, top_k=DEFAULT_SNAPSHOT_TOP_K):
+        """
+        Runs the search as ``run`` does, but as a generator yielding lightweight snapshots of the search in progress - every ``snapshot_steps`` steps and/or every ``snapshot_ms`` milliseconds -
+        and the final snapshot (with ``"final"`` entry set to ``True``) once the computational budget is used up. Snapshots are small dictionaries (see ``search_snapshot`` in :doc:`utils`) with numbers of steps and playouts so far,
+        elapsed time, the best root action so far and ``top_k`` root actions (as tuples: action, n, q); each snapshot in progress costs one launch of the sum-reduction kernel over trees and small copies to host.
+        The caller may stop the search at any point by calling ``close()`` on the generator (or by breaking a ``for`` loop over it, if the generator is not referenced otherwise);
+        the search is then finalized as if its budget was used up (``best_action``, etc. available as after ``run``) and no final snapshot is yielded.
+        
+        Args:
+            root_board (ndarray): 
+                two-dimensional array with board (or other representation) of root state from which the search starts.
+            root_extra_info (ndarray): 
+                any additional information of root state not implied by the contents of the board itself.
+            root_turn {-1, 1}:
+                indicator of the player, minimizing or maximizing, to act first at root state.
+            forced_search_steps_limit (int):
+                steps limit used only when reproducing results of a previous experiment; if less than``np.inf`` then has a priority over the standard computational budget given by ``search_time_limit`` and ``search_steps_limit``.
+            snapshot_steps (int):
+                number of steps between consecutive snapshots, ``0`` if snapshots are not taken by steps, defaults to ``0``.
+            snapshot_ms (float):
+                time in milliseconds between consecutive snapshots, ``0.0`` if snapshots are not taken by time, defaults to ``0.0``.
+            top_k (int):
+                number of root actions included in snapshots, defaults to ``5``.
+        Yields:
+            snapshot (dict):
+                snapshot of the search.
+        """
+        print(f"MCTSNC RUN... [{self}]")        
+        self.early_stopping_reason = None
+        self.refused_steps = 0
+        run_method = getattr(self, "_run_" + self.variant)
+        try:
+            yield from run_method(root_board, root_extra_info, root_turn, forced_search_steps_limit, snapshot_steps, snapshot_ms, top_k)
+        except GeneratorExit: # search stopped by the caller and finalized by run_method
+            self._print_run_done()
+            raise
+        self._print_run_done()
+        yield self._make_snapshot(self.time_loop, root_turn, top_k, final=True)
+
+    def _print_run_done(self):
+        """Prints the summary line of a finished run."""
         best_action_label = str(self.best_action)
         if self.action_index_to_name_function is not None:
             best_action_label += f" ({self.action_index_to_name_function(self.best_action)})"
         print(f"MCTSNC RUN DONE. [time: {self.time_total} s; best action: {best_action_label}, best win_flag: {self.best_win_flag}, best n: {self.best_n}, best n_wins: {self.best_n_wins}, best q: {self.best_q}]")
-        return self.best_action
     
     def _flatten_trees_actions_expanded_thrifty(self, trees_actions_expanded):
         """Uses information from array ``trees_actions_expanded`` of shape ``(self.n_trees, self.state_max_actions + 2)`` and converts it to another array where the number of rows corresponds to the total of expanded legal actions in all trees. Each row contains a pair of indexes for: action and tree. The approach allows to allocate exact number of needed CUDA blocks for further operations."""            
@@ -469,6 +544,21 @@ class MCTSNC:
         times_info["mean_playout"] = ms_factor * self.time_playout / self.steps
         times_info["mean_backup"] = ms_factor * self.time_backup / self.steps
         performance_info["times_[ms]"] = times_info                                                              
+        if self.early_stopping_interval > 0:
+            early_stopping_info = {}
+            early_stopping_info["reason"] = self.early_stopping_reason
+            stopped = self.early_stopping_reason is not None
+            saved_steps, saved_time = saved_budget(self.steps, self.time_loop, self.search_steps_limit, self.search_time_limit) if stopped else (0, 0.0)
+            early_stopping_info["saved_steps"] = saved_steps
+            early_stopping_info["saved_time_[ms]"] = ms_factor * saved_time
+            performance_info["early_stopping"] = early_stopping_info
+        if self.hard_deadline:
+            deadline_info = {}
+            deadline_info["refused_steps"] = self.refused_steps
+            deadline_info["step_cost_estimate_[ms]"] = ms_factor * self.step_cost_mean if self.step_cost_mean is not None else np.nan
+            deadline_info["step_cost_deviation_[ms]"] = ms_factor * self.step_cost_deviation
+            deadline_info.update(overruns_info(self.deadline_overruns))
+            performance_info["deadline"] = deadline_info
         trees_depths = np.empty_like(self.dev_trees_depths)
         trees_sizes = np.empty_like(self.dev_trees_sizes)
         self.dev_trees_depths.copy_to_host(ary=trees_depths)
@@ -493,6 +583,43 @@ class MCTSNC:
         self.performance_info = performance_info
         return performance_info
     
+    def _root_actions_stats(self, root_turn, reduce=True):
+        """
+        Returns root actions (not expanded ones skipped) with their visits counts, wins counts and win flags summed over trees, and the number of root visits (playouts) - 
+        read from device arrays of the reduction kernel of the current variant, launched first if ``reduce`` is ``True`` (search in progress).
+        """
+        thrifty = self.variant.endswith("thrifty")
+        root_actions_expanded = self.dev_root_actions_expanded.copy_to_host()
+        bpg = int(root_actions_expanded[-1]) if thrifty else self.state_max_actions
+        if reduce:
+            tpb = self.tpb_rot
+            reduce_over_trees = MCTSNC._reduce_over_trees_thrifty if thrifty else MCTSNC._reduce_over_trees_prodigal
+            reduce_over_trees[bpg, tpb](self.dev_trees, self.dev_trees_terminals, self.dev_trees_outcomes, self.dev_trees_ns, self.dev_trees_ns_wins,
+                                        self.dev_root_actions_expanded, root_turn, self.dev_root_ns, self.dev_actions_win_flags, self.dev_actions_ns, self.dev_actions_ns_wins)
+            cuda.synchronize()
+        root_ns = self.dev_root_ns.copy_to_host()[:bpg]
+        legal = root_ns > 0 # prodigal variants: blocks of actions not expanded at root leave zeros
+        actions = (root_actions_expanded[:bpg] if thrifty else np.arange(bpg))[legal]
+        actions_ns = self.dev_actions_ns.copy_to_host()[:bpg][legal]
+        actions_ns_wins = self.dev_actions_ns_wins.copy_to_host()[:bpg][legal]
+        actions_win_flags = self.dev_actions_win_flags.copy_to_host()[:bpg][legal]
+        n_root = int(root_ns[legal][0]) if np.any(legal) else 0
+        return actions, actions_ns, actions_ns_wins, actions_win_flags, n_root
+
+    def _make_snapshot(self, elapsed, root_turn, top_k, final=False):
+        """Returns a lightweight snapshot of the search (see ``run_iter``), ``elapsed`` - time of the loop so far; the best action is the one found by the max-argmax reduction for the final snapshot."""
+        actions, actions_ns, actions_ns_wins, actions_win_flags, n_root = self._root_actions_stats(root_turn, reduce=not final)
+        return search_snapshot(self.steps, n_root, elapsed, actions.tolist(), actions_ns.tolist(), actions_ns_wins.tolist(), actions_win_flags.tolist(), top_k, 
+                               best_action=self.best_action if final else None, final=final)
+    
+    def _stop_early(self, elapsed, root_turn):
+        """Checks the early stopping rule on statistics of root actions summed over trees by the reduction kernel of the current variant (``elapsed`` - time of the loop so far); memorizes the reason for stopping and returns ``True`` if the search should stop."""
+        _, actions_ns, actions_ns_wins, actions_win_flags, n_root = self._root_actions_stats(root_turn)
+        remaining_steps = remaining_steps_estimate(self.steps, elapsed, self.search_steps_limit, self.search_time_limit)
+        max_gain_per_step = gain_per_step_estimate(self.n_trees, self.n_playouts, self.variant.startswith("acp"), self.steps, n_root)
+        self.early_stopping_reason = early_stopping_reason(actions_ns.tolist(), actions_ns_wins.tolist(), actions_win_flags.tolist(), remaining_steps, max_gain_per_step, self.early_stopping_z)
+        return self.early_stopping_reason is not None
+
     def _make_actions_info_thrifty(self):
         """
         Prepares and returns a dictionary with information on root actions (using thrifty indexing) implied by the last run, in particular: estimates of action values, their UCBs, counts of times actions were taken, etc.
@@ -562,8 +689,8 @@ class MCTSNC:
         self.actions_info = actions_info
         return actions_info
                                                    
-    def _run_ocp_thrifty(self, root_board, root_extra_info, root_turn, forced_search_steps_limit=np.inf):
-        """Runs computations for algorithmic variant: ``"ocp_thrifty"``."""
+    def _run_ocp_thrifty(self, root_board, root_extra_info, root_turn, forced_search_steps_limit=np.inf, snapshot_steps=0, snapshot_ms=0.0, top_k=0):
+        """Runs computations for algorithmic variant: ``"ocp_thrifty"`` (as a generator of snapshots of the search in progress, taken if requested by positive ``snapshot_steps`` or ``snapshot_ms``)."""
         t1 = time.time()
         
         # reset
@@ -591,7 +718,11 @@ class MCTSNC:
         self.steps = 0
         trees_actions_expanded = np.empty((self.n_trees, self.state_max_actions + 2), dtype=np.int16) # needed at host side for thrifty variants
         
+        streaming = snapshot_steps > 0 or snapshot_ms > 0.0
+        deadline_on = self.hard_deadline and forced_search_steps_limit == np.inf and self.search_time_limit < np.inf
+        
         t1_loop = time.time()
+        t_snapshot = t1_loop
         while True:
             t2_loop = time.time()            
             if forced_search_steps_limit < np.inf: 
@@ -599,6 +730,11 @@ class MCTSNC:
                     break
             elif self.steps >= self.search_steps_limit or t2_loop - t1_loop >= self.search_time_limit:
                 break
+            elif self.early_stopping_interval > 0 and self.steps > 0 and self.steps % self.early_stopping_interval == 0 and self._stop_early(t2_loop - t1_loop, root_turn):
+                break
+            elif deadline_on and self.steps > 0 and t2_loop - t1_loop + self.step_cost_mean + self.STEP_COST_MARGIN * self.step_cost_deviation > self.search_time_limit:
+                self.refused_steps += 1 # next step would likely miss the deadline
+                break
             if self.verbose_debug:
                 print(f"[step: {self.steps + 1} starting, time used so far: {t2_loop - t1_loop} s]")     
             
@@ -684,7 +820,17 @@ class MCTSNC:
                 print(f"[MCTSNC._backup() done; time: {t2_backup - t1_backup} s]")
             self.time_backup += t2_backup - t1_backup                                        
             self.steps += 1
+            if self.hard_deadline:
+                self.step_cost_mean, self.step_cost_deviation = step_cost_update(self.step_cost_mean, self.step_cost_deviation, time.time() - t2_loop, self.STEP_COST_ALPHA)
+            if streaming and ((snapshot_steps > 0 and self.steps % snapshot_steps == 0) or (snapshot_ms > 0.0 and 10.0**3 * (time.time() - t_snapshot) >= snapshot_ms)):
+                t_snapshot = time.time()
+                try:
+                    yield self._make_snapshot(t_snapshot - t1_loop, root_turn, top_k)
+                except GeneratorExit: # search stopped by the caller of run_iter - finalized below
+                    break
         self.time_loop = time.time() - t1_loop
+        if deadline_on:
+            self.deadline_overruns.append(self.time_loop - self.search_time_limit)
             
         # sum reduction over trees for each root action        
         t1_reduce_over_trees = time.time()
@@ -732,8 +878,8 @@ class MCTSNC:
             print(f"[actions info:\n{dict_to_str(self._make_actions_info_thrifty())}]")
             print(f"[performance info:\n{dict_to_str(self._make_performance_info())}]")
                          
-    def _run_ocp_prodigal(self, root_board, root_extra_info, root_turn, forced_search_steps_limit=np.inf):
-        """Runs computations for algorithmic variant: ``"ocp_prodigal"``."""
+    def _run_ocp_prodigal(self, root_board, root_extra_info, root_turn, forced_search_steps_limit=np.inf, snapshot_steps=0, snapshot_ms=0.0, top_k=0):
+        """Runs computations for algorithmic variant: ``"ocp_prodigal"`` (as a generator of snapshots of the search in progress, taken if requested by positive ``snapshot_steps`` or ``snapshot_ms``)."""
         t1 = time.time()
         
         # reset
@@ -760,7 +906,11 @@ class MCTSNC:
         self.time_backup = 0.0    
         self.steps = 0
         
+        streaming = snapshot_steps > 0 or snapshot_ms > 0.0
+        deadline_on = self.hard_deadline and forced_search_steps_limit == np.inf and self.search_time_limit < np.inf
+        
         t1_loop = time.time()
+        t_snapshot = t1_loop
         while True:
             t2_loop = time.time()
             if forced_search_steps_limit < np.inf: 
@@ -768,6 +918,11 @@ class MCTSNC:
                     break                        
             elif self.steps >= self.search_steps_limit or t2_loop - t1_loop >= self.search_time_limit:
                 break
+            elif self.early_stopping_interval > 0 and self.steps > 0 and self.steps % self.early_stopping_interval == 0 and self._stop_early(t2_loop - t1_loop, root_turn):
+                break
+            elif deadline_on and self.steps > 0 and t2_loop - t1_loop + self.step_cost_mean + self.STEP_COST_MARGIN * self.step_cost_deviation > self.search_time_limit:
+                self.refused_steps += 1 # next step would likely miss the deadline
+                break
             if self.verbose_debug:
                 print(f"[step: {self.steps + 1} starting, time used so far: {t2_loop - t1_loop} s]")     
             
@@ -850,7 +1005,17 @@ class MCTSNC:
                 print(f"[MCTSNC._backup() done; time: {t2_backup - t1_backup} s]")
             self.time_backup += t2_backup - t1_backup                                        
             self.steps += 1
+            if self.hard_deadline:
+                self.step_cost_mean, self.step_cost_deviation = step_cost_update(self.step_cost_mean, self.step_cost_deviation, time.time() - t2_loop, self.STEP_COST_ALPHA)
+            if streaming and ((snapshot_steps > 0 and self.steps % snapshot_steps == 0) or (snapshot_ms > 0.0 and 10.0**3 * (time.time() - t_snapshot) >= snapshot_ms)):
+                t_snapshot = time.time()
+                try:
+                    yield self._make_snapshot(t_snapshot - t1_loop, root_turn, top_k)
+                except GeneratorExit: # search stopped by the caller of run_iter - finalized below
+                    break
         self.time_loop = time.time() - t1_loop
+        if deadline_on:
+            self.deadline_overruns.append(self.time_loop - self.search_time_limit)
             
         # sum reduction over trees for each root action        
         t1_reduce_over_trees = time.time() 
@@ -893,8 +1058,8 @@ class MCTSNC:
             print(f"[actions info:\n{dict_to_str(self._make_actions_info_prodigal())}]")
             print(f"[performance info:\n{dict_to_str(self._make_performance_info())}]")
                                                   
-    def _run_acp_thrifty(self, root_board, root_extra_info, root_turn, forced_search_steps_limit=np.inf):
-        """Runs computations for algorithmic variant: ``"acp_thrifty"``."""
+    def _run_acp_thrifty(self, root_board, root_extra_info, root_turn, forced_search_steps_limit=np.inf, snapshot_steps=0, snapshot_ms=0.0, top_k=0):
+        """Runs computations for algorithmic variant: ``"acp_thrifty"`` (as a generator of snapshots of the search in progress, taken if requested by positive ``snapshot_steps`` or ``snapshot_ms``)."""
         t1 = time.time()
         
         # reset
@@ -922,7 +1087,11 @@ class MCTSNC:
         self.steps = 0        
         trees_actions_expanded = np.empty((self.n_trees, self.state_max_actions + 2), dtype=np.int16)
         
+        streaming = snapshot_steps > 0 or snapshot_ms > 0.0
+        deadline_on = self.hard_deadline and forced_search_steps_limit == np.inf and self.search_time_limit < np.inf
+        
         t1_loop = time.time()
+        t_snapshot = t1_loop
         while True:
             t2_loop = time.time()
             if forced_search_steps_limit < np.inf: 
@@ -930,6 +1099,11 @@ class MCTSNC:
                     break            
             elif self.steps >= self.search_steps_limit or t2_loop - t1_loop >= self.search_time_limit:
                 break
+            elif self.early_stopping_interval > 0 and self.steps > 0 and self.steps % self.early_stopping_interval == 0 and self._stop_early(t2_loop - t1_loop, root_turn):
+                break
+            elif deadline_on and self.steps > 0 and t2_loop - t1_loop + self.step_cost_mean + self.STEP_COST_MARGIN * self.step_cost_deviation > self.search_time_limit:
+                self.refused_steps += 1 # next step would likely miss the deadline
+                break
             if self.verbose_debug:
                 print(f"[step: {self.steps + 1} starting, time used so far: {t2_loop - t1_loop} s]")     
             
@@ -1030,7 +1204,17 @@ class MCTSNC:
             t2_backup = time.time()
             self.time_backup += t2_backup - t1_backup
             self.steps += 1
+            if self.hard_deadline:
+                self.step_cost_mean, self.step_cost_deviation = step_cost_update(self.step_cost_mean, self.step_cost_deviation, time.time() - t2_loop, self.STEP_COST_ALPHA)
+            if streaming and ((snapshot_steps > 0 and self.steps % snapshot_steps == 0) or (snapshot_ms > 0.0 and 10.0**3 * (time.time() - t_snapshot) >= snapshot_ms)):
+                t_snapshot = time.time()
+                try:
+                    yield self._make_snapshot(t_snapshot - t1_loop, root_turn, top_k)
+                except GeneratorExit: # search stopped by the caller of run_iter - finalized below
+                    break
         self.time_loop = time.time() - t1_loop
+        if deadline_on:
+            self.deadline_overruns.append(self.time_loop - self.search_time_limit)
                     
         # sum reduction over trees for each root action        
         t1_reduce_over_trees = time.time()
@@ -1078,8 +1262,8 @@ class MCTSNC:
             print(f"[actions info:\n{dict_to_str(self._make_actions_info_thrifty())}]")
             print(f"[performance info:\n{dict_to_str(self._make_performance_info())}]")
             
-    def _run_acp_prodigal(self, root_board, root_extra_info, root_turn, forced_search_steps_limit=np.inf):
-        """Runs computations for algorithmic variant: ``"acp_prodigal"``."""
+    def _run_acp_prodigal(self, root_board, root_extra_info, root_turn, forced_search_steps_limit=np.inf, snapshot_steps=0, snapshot_ms=0.0, top_k=0):
+        """Runs computations for algorithmic variant: ``"acp_prodigal"`` (as a generator of snapshots of the search in progress, taken if requested by positive ``snapshot_steps`` or ``snapshot_ms``)."""
         t1 = time.time()    
         
         # reset
@@ -1106,7 +1290,11 @@ class MCTSNC:
         self.time_backup = 0.0
         self.steps = 0
         
+        streaming = snapshot_steps > 0 or snapshot_ms > 0.0
+        deadline_on = self.hard_deadline and forced_search_steps_limit == np.inf and self.search_time_limit < np.inf
+        
         t1_loop = time.time()
+        t_snapshot = t1_loop
         while True:
             t2_loop = time.time()
             if forced_search_steps_limit < np.inf: 
@@ -1114,6 +1302,11 @@ class MCTSNC:
                     break            
             elif self.steps >= self.search_steps_limit or t2_loop - t1_loop >= self.search_time_limit:
                 break
+            elif self.early_stopping_interval > 0 and self.steps > 0 and self.steps % self.early_stopping_interval == 0 and self._stop_early(t2_loop - t1_loop, root_turn):
+                break
+            elif deadline_on and self.steps > 0 and t2_loop - t1_loop + self.step_cost_mean + self.STEP_COST_MARGIN * self.step_cost_deviation > self.search_time_limit:
+                self.refused_steps += 1 # next step would likely miss the deadline
+                break
             if self.verbose_debug:
                 print(f"[step: {self.steps + 1} starting, time used so far: {t2_loop - t1_loop} s]")     
         
@@ -1213,7 +1406,17 @@ class MCTSNC:
             self.time_backup += t2_backup - t1_backup
                                                     
             self.steps += 1
+            if self.hard_deadline:
+                self.step_cost_mean, self.step_cost_deviation = step_cost_update(self.step_cost_mean, self.step_cost_deviation, time.time() - t2_loop, self.STEP_COST_ALPHA)
+            if streaming and ((snapshot_steps > 0 and self.steps % snapshot_steps == 0) or (snapshot_ms > 0.0 and 10.0**3 * (time.time() - t_snapshot) >= snapshot_ms)):
+                t_snapshot = time.time()
+                try:
+                    yield self._make_snapshot(t_snapshot - t1_loop, root_turn, top_k)
+                except GeneratorExit: # search stopped by the caller of run_iter - finalized below
+                    break
         self.time_loop = time.time() - t1_loop
+        if deadline_on:
+            self.deadline_overruns.append(self.time_loop - self.search_time_limit)
                                                         
         # sum reduction over trees
         t1_reduce_over_trees = time.time()
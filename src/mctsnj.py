@@ -0,0 +1,504 @@
+"""
+Auxiliary module with a CPU implementation of MCTS algorithm compiled by ``numba`` (hence the "NJ" suffix - numba jit), embodied by the class ``MCTSNJ``.
+
+The class mirrors the referential ``MCTS`` class (same UCB rule, same tie-breaking of ``_best_action``, same keys in ``performance_info``),
+but keeps the tree in a struct-of-arrays form (as ``MCTSSoA`` in :doc:`mcts_soa`) and carries out whole batches of search steps inside compiled code
+(selection, expansion, playout and backup stages are compiled functions with GIL released). Optionally, several threads can descend the same tree concurrently (tree parallelization with virtual loss). Game mechanics are taken from :doc:`mctsnj_game_mechanics`
+(currently available for: Connect 4, Gomoku, Reversi). Boards are not stored in tree nodes - the board of a selected node is rebuilt by replaying actions along the path from root.
+
+Link to project repository
+--------------------------
+`https://github.com/pklesk/mcts_numba_cuda <https://github.com/pklesk/mcts_numba_cuda>`_
+
+Notes
+-----
+Private functions of ``MCTSNJ`` class and compiled module-level functions (search stages) are named with a single leading underscore.
+For public methods full docstrings are provided (with arguments and returns described). For private functions short docstrings are provided.
+"""
+
+import numpy as np
+from numba import jit
+from numba import void, int8, int16, int32, int64, float64, boolean, types
+from numba.extending import intrinsic
+from numba.core import cgutils
+import time
+import sys
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from mcts import MCTS
+from mcts_soa import MCTSSoA
+import mctsnj_game_mechanics
+from mctsnj_game_mechanics import game_code, legal_actions, take_action, compute_outcome, playout, OUTCOME_ONGOING
+from utils import dict_to_str
+
+__version__ = "1.0.1"
+__author__ = "Przemysław Klęsk"
+__email__ = "pklesk@zut.edu.pl"
+
+def _item_pointer(context, builder, array_type, array_value, index_type, index_value):
+    """Returns LLVM pointer to an item of a one-dimensional array (helper for atomic intrinsics)."""
+    array = context.make_array(array_type)(context, builder, array_value)
+    return cgutils.get_item_pointer(context, builder, array_type, array, [context.cast(builder, index_value, index_type, types.intp)])
+
+@intrinsic
+def _atomic_add(typingctx, array, index, value):
+    """Atomically adds ``value`` to ``array[index]`` and returns the old value (``numba`` provides no atomics for CPU code)."""
+    def codegen(context, builder, signature, args):
+        array_type, index_type, value_type = signature.args
+        pointer = _item_pointer(context, builder, array_type, args[0], index_type, args[1])
+        return builder.atomic_rmw("add", pointer, context.cast(builder, args[2], value_type, array_type.dtype), "seq_cst")
+    return array.dtype(array, index, value), codegen
+
+@intrinsic
+def _atomic_cas(typingctx, array, index, expected, value):
+    """Atomically sets ``array[index]`` to ``value`` if it equals ``expected`` and returns the old value."""
+    def codegen(context, builder, signature, args):
+        array_type, index_type, expected_type, value_type = signature.args
+        pointer = _item_pointer(context, builder, array_type, args[0], index_type, args[1])
+        old_and_success = builder.cmpxchg(pointer, context.cast(builder, args[2], expected_type, array_type.dtype), context.cast(builder, args[3], value_type, array_type.dtype),
+                                          "seq_cst", "seq_cst")
+        return builder.extract_value(old_and_success, 0)
+    return array.dtype(array, index, expected, value), codegen
+
+@intrinsic
+def _atomic_load(typingctx, array, index):
+    """Atomically (with acquire semantics) reads and returns ``array[index]``."""
+    def codegen(context, builder, signature, args):
+        array_type, index_type = signature.args
+        pointer = _item_pointer(context, builder, array_type, args[0], index_type, args[1])
+        return builder.load_atomic(pointer, "acquire", context.get_abi_sizeof(context.get_value_type(array_type.dtype)))
+    return array.dtype(array, index), codegen
+
+@jit(int32(float64, int32[:], int32[:], int16[:], int32[:], int32[:], int32[:]), nopython=True, nogil=True, cache=True)
+def _select(ucb_c, parents, first_children, n_children, ns, ns_wins, path):
+    """
+    Performs the selection stage (UCB rule, first maximum wins ties) writing the selected path into ``path`` array; returns the length of path.
+    The descent stops (at an expanded node) when only one entry of ``path`` is left - for the child chosen at expansion.
+    """
+    node = 0
+    path[0] = 0
+    path_length = 1
+    while n_children[node] > 0 and path_length < path.size - 1:
+        first = first_children[node]
+        log_n_parent = np.log(ns[node])
+        best_child = first
+        best_ucb = -1.0
+        for child in range(first, first + n_children[node]):
+            n = ns[child]
+            if n == 0:
+                best_child = child
+                break
+            ucb = ns_wins[child] / n + ucb_c * np.sqrt(log_n_parent / n)
+            if ucb > best_ucb:
+                best_ucb = ucb
+                best_child = child
+        node = best_child
+        path[path_length] = node
+        path_length += 1
+    return path_length
+
+@jit(int16(int8, int8[:, :], int8[:], int16, int16[:], int8[:], int32[:], int32), nopython=True, nogil=True, cache=True)
+def _replay(game, board, extra_info, last_action, actions, turns, path, path_length):
+    """Replays actions along the path (from root) on ``board`` and ``extra_info`` arrays (initially containing the root state); returns the last action index."""
+    for p in range(1, path_length):
+        node = path[p]
+        take_action(game, board, extra_info, turns[path[p - 1]], actions[node])
+        last_action = actions[node]
+    return last_action
+
+@jit(int32(int8, int8[:, :], int8[:], int32, int32[:], int32[:], int16[:], int16[:], int32[:], int32[:], int8[:], boolean[:], int8[:], int16[:], int64[:],
+           int8[:, :], int8[:], int16[:]), nopython=True, nogil=True, cache=True)
+def _expand(game, board, extra_info, node, parents, first_children, n_children, actions, ns, ns_wins, turns, terminals, outcomes, depths, tree_size,
+            child_board, child_extra_info, legal):
+    """Performs the expansion stage - allocates all children of ``node`` contiguously in tree arrays (outcomes computed eagerly) and returns a randomly chosen child (or ``node`` itself if terminal)."""
+    if terminals[node]:
+        return node
+    turn = turns[node]
+    count = legal_actions(game, board, extra_info, turn, legal)
+    first = int32(tree_size[0])
+    for k in range(count):
+        child = first + k
+        child_board[:, :] = board
+        child_extra_info[:] = extra_info
+        take_action(game, child_board, child_extra_info, turn, legal[k])
+        outcome = compute_outcome(game, child_board, child_extra_info, -turn, legal[k])
+        parents[child] = node
+        first_children[child] = -1
+        n_children[child] = 0
+        actions[child] = legal[k]
+        ns[child] = 0
+        ns_wins[child] = 0
+        turns[child] = -turn
+        terminals[child] = outcome != OUTCOME_ONGOING
+        outcomes[child] = outcome if outcome != OUTCOME_ONGOING else 0
+        depths[child] = depths[node] + 1
+    first_children[node] = first
+    n_children[node] = count
+    tree_size[0] += count
+    return first + np.random.randint(count)
+
+@jit(void(int32[:], int32[:], int8[:], int32[:], int32, int8), nopython=True, nogil=True, cache=True)
+def _backup(ns, ns_wins, turns, path, path_length, outcome):
+    """Performs the backup stage along the path (a win is counted for nodes whose turn is opposite to the outcome, i.e., for nodes reached by the winner's move)."""
+    for p in range(path_length):
+        node = path[p]
+        ns[node] += 1
+        if turns[node] == -outcome:
+            ns_wins[node] += 1
+
+@jit(int32(int8, int32, float64, int8[:, :], int8[:], int16,
+           int32[:], int32[:], int16[:], int16[:], int32[:], int32[:], int8[:], boolean[:], int8[:], int16[:], int64[:],
+           int8[:, :], int8[:], int8[:, :], int8[:], int16[:], int32[:]), nopython=True, nogil=True, cache=True)
+def _run_steps(game, n_steps, ucb_c, root_board, root_extra_info, root_last_action,
+               parents, first_children, n_children, actions, ns, ns_wins, turns, terminals, outcomes, depths, tree_size,
+               board, extra_info, child_board, child_extra_info, legal, path):
+    """Runs (at most) ``n_steps`` steps of search (select, expand, playout, backup) and returns the number of steps done (fewer if tree arrays are about to be exhausted)."""
+    capacity = parents.size
+    max_actions = legal.size
+    steps = 0
+    while steps < n_steps and tree_size[0] + max_actions <= capacity:
+        board[:, :] = root_board
+        extra_info[:] = root_extra_info
+        path_length = _select(ucb_c, parents, first_children, n_children, ns, ns_wins, path)
+        last_action = _replay(game, board, extra_info, root_last_action, actions, turns, path, path_length)
+        node = path[path_length - 1]
+        if n_children[node] > 0: # descent stopped at the maximum depth of paths - playout from the expanded node
+            child = node
+        else:
+            child = _expand(game, board, extra_info, node, parents, first_children, n_children, actions, ns, ns_wins, turns, terminals, outcomes, depths, tree_size,
+                            child_board, child_extra_info, legal)
+        if child != node:
+            take_action(game, board, extra_info, turns[node], actions[child])
+            last_action = actions[child]
+            path[path_length] = child
+            path_length += 1
+        if terminals[child]:
+            outcome = outcomes[child]
+        else:
+            outcome = playout(game, board, extra_info, turns[child], last_action, legal)
+        _backup(ns, ns_wins, turns, path, path_length, outcome)
+        steps += 1
+    return steps
+
+@jit(int32(int8, int32, int32, float64, int32, int8[:, :], int8[:], int16,
+           int32[:], int32[:], int16[:], int16[:], int32[:], int32[:], int8[:], boolean[:], int8[:], int16[:], int64[:],
+           int8[:, :], int8[:], int8[:, :], int8[:], int16[:], int32[:]), nopython=True, nogil=True, cache=True)
+def _run_steps_tree_parallel(game, n_steps, n_threads, ucb_c, virtual_loss, root_board, root_extra_info, root_last_action,
+                             parents, first_children, n_children, actions, ns, ns_wins, turns, terminals, outcomes, depths, tree_size,
+                             board, extra_info, child_board, child_extra_info, legal, path):
+    """
+    Runs (at most) ``n_steps`` steps of search on a tree shared by ``n_threads`` concurrent callers and returns the number of steps done.
+    Nodes on the selected path get a virtual loss (extra visits without wins) taken back in backup, so that concurrent descents diverge.
+    Synchronization is lock-free: visits and wins are updated atomically, a leaf is expanded by the thread that claims it (``n_children`` switched from ``0`` to ``-1``),
+    children are published by an atomic write of their count, and new nodes are allocated by an atomic increment of ``tree_size``
+    (each caller stops when less than ``n_threads`` expansions would still fit into tree arrays).
+    """
+    capacity = parents.size
+    max_actions = legal.size
+    steps = 0
+    while steps < n_steps and _atomic_load(tree_size, 0) + n_threads * max_actions <= capacity:
+        board[:, :] = root_board
+        extra_info[:] = root_extra_info
+        # selection
+        node = 0
+        path[0] = 0
+        path_length = 1
+        _atomic_add(ns, 0, virtual_loss)
+        while path_length < path.size - 1: # one entry of path left for the child chosen at expansion
+            count = _atomic_load(n_children, node)
+            if count <= 0: # leaf or leaf being expanded by another thread
+                break
+            first = first_children[node]
+            log_n_parent = np.log(ns[node])
+            best_child = first
+            best_ucb = -1.0
+            for child in range(first, first + count):
+                n = ns[child]
+                if n == 0:
+                    best_child = child
+                    break
+                ucb = ns_wins[child] / n + ucb_c * np.sqrt(log_n_parent / n)
+                if ucb > best_ucb:
+                    best_ucb = ucb
+                    best_child = child
+            node = best_child
+            _atomic_add(ns, node, virtual_loss)
+            path[path_length] = node
+            path_length += 1
+        last_action = _replay(game, board, extra_info, root_last_action, actions, turns, path, path_length)
+        # expansion
+        child = node
+        if not terminals[node] and _atomic_cas(n_children, node, 0, -1) == 0:
+            turn = turns[node]
+            count = legal_actions(game, board, extra_info, turn, legal)
+            first = int32(_atomic_add(tree_size, 0, count))
+            for k in range(count):
+                c = first + k
+                child_board[:, :] = board
+                child_extra_info[:] = extra_info
+                take_action(game, child_board, child_extra_info, turn, legal[k])
+                outcome = compute_outcome(game, child_board, child_extra_info, -turn, legal[k])
+                parents[c] = node
+                first_children[c] = -1
+                n_children[c] = 0
+                actions[c] = legal[k]
+                ns[c] = 0
+                ns_wins[c] = 0
+                turns[c] = -turn
+                terminals[c] = outcome != OUTCOME_ONGOING
+                outcomes[c] = outcome if outcome != OUTCOME_ONGOING else 0
+                depths[c] = depths[node] + 1
+            first_children[node] = first
+            _atomic_cas(n_children, node, -1, count) # publishing children
+            child = first + np.random.randint(count)
+            _atomic_add(ns, child, virtual_loss)
+            take_action(game, board, extra_info, turn, actions[child])
+            last_action = actions[child]
+            path[path_length] = child
+            path_length += 1
+        # playout
+        if terminals[child]:
+            outcome = outcomes[child]
+        else:
+            outcome = playout(game, board, extra_info, turns[child], last_action, legal)
+        # backup
+        for p in range(path_length):
+            node = path[p]
+            _atomic_add(ns, node, 1 - virtual_loss)
+            if turns[node] == -outcome:
+                _atomic_add(ns_wins, node, 1)
+        steps += 1
+    return steps
+
+class MCTSNJ(MCTSSoA):
+    """
+    Monte Carlo Tree Search for CPU compiled via ``numba`` (``nopython`` mode), with the tree stored in a struct-of-arrays form and search steps executed in batches inside compiled code.
+    Searches are always vanilla (no information from previous searches is reused).
+    """
+
+    DEFAULT_N_THREADS = 1
+    DEFAULT_VIRTUAL_LOSS = 1
+    MAX_TREE_DEPTH = 2048 # to memorize paths at select stage (descents stop at this depth)
+    BATCH_TIME = 0.01 # [s], intended duration of a batch of steps executed inside compiled code (between consecutive checks of time limit)
+
+    def __init__(self,
+                 search_time_limit=MCTS.DEFAULT_SEARCH_TIME_LIMIT, search_steps_limit=MCTS.DEFAULT_SEARCH_STEPS_LIMIT,
+                 initial_tree_capacity=MCTSSoA.DEFAULT_INITIAL_TREE_CAPACITY,
+                 n_threads=DEFAULT_N_THREADS, virtual_loss=DEFAULT_VIRTUAL_LOSS,
+                 ucb_c=MCTS.DEFAULT_UCB_C, seed=MCTS.DEFAULT_SEED,
+                 verbose_debug=MCTS.DEFAULT_VERBOSE_DEBUG, verbose_info=MCTS.DEFAULT_VERBOSE_INFO):
+        """
+        Constructor of ``MCTSNJ`` instances.
+
+        Args:
+            search_time_limit (float):
+                time limit in seconds (computational budget), ``np.inf`` if no limit, defaults to ``5.0``.
+            search_steps_limit (float):
+                steps limit (computational budget), ``np.inf`` if no limit, defaults to ``np.inf``.
+            initial_tree_capacity (int):
+                number of nodes for which tree arrays are preallocated (arrays grow geometrically when exceeded), defaults to ``2**16``.
+            n_threads (int):
+                number of threads descending the same tree concurrently (tree parallelization if greater than ``1``), defaults to ``1``.
+            virtual_loss (int):
+                number of virtual visits (without wins) added to nodes on a path selected by a thread until its backup (relevant only for ``n_threads > 1``), defaults to ``1``.
+            ucb_c (float):
+                value of C constant, influencing exploration tendency, appearing in UCT formula (upper confidence bounds for trees), defaults to ``2.0``.
+            seed (int):
+                seed for the random number generator (of compiled code), thread ``i`` of the pool is seeded with ``seed + 1 + i``, defaults to ``0``.
+            verbose_debug (bool):
+                debug verbosity flag, if ``True`` then detailed information about each batch of steps is printed to console, defaults to ``False``.
+            verbose_info (bool):
+                verbosity flag, if ``True`` then standard information on actions and performance are printed to console (after a full run), defaults to ``True``.
+        """
+        super().__init__(search_time_limit=search_time_limit, search_steps_limit=search_steps_limit, initial_tree_capacity=initial_tree_capacity,
+                         ucb_c=ucb_c, seed=seed, verbose_debug=verbose_debug, verbose_info=verbose_info)
+        self.n_threads = n_threads
+        if self.n_threads < 1:
+            invalid_value = self.n_threads
+            self.n_threads = 1
+            print(f"[invalid value of parameter n_threads: {invalid_value}, changed to: {self.n_threads}]")
+        self.virtual_loss = virtual_loss
+        if self.virtual_loss < 0:
+            invalid_value = self.virtual_loss
+            self.virtual_loss = MCTSNJ.DEFAULT_VIRTUAL_LOSS
+            print(f"[invalid value of parameter virtual_loss: {invalid_value}, changed to: {self.virtual_loss}]")
+        self.threads_executor = None # thread pool for tree parallelization, created lazily
+        mctsnj_game_mechanics.seed(self.seed)
+
+    def __str__(self):
+        """
+        Returns a string representation of this ``MCTSNJ`` instance.
+
+        Returns:
+            str: string representation of this ``MCTSNJ`` instance.
+        """
+        return f"MCTSNJ(search_time_limit={self.search_time_limit}, search_steps_limit={self.search_steps_limit}, initial_tree_capacity={self.initial_tree_capacity}, n_threads={self.n_threads}, virtual_loss={self.virtual_loss}, ucb_c={self.ucb_c}, seed: {self.seed})"
+
+    def _prepare_root_arrays(self, root):
+        """Prepares and returns: game code, root board and root extra info (as ``np.int8`` arrays) and root's last action index (``-1`` if none)."""
+        game = game_code(type(root))
+        if game < 0:
+            sys.exit(f"[MCTSNJ.run(): exiting due to no compiled mechanics available for states of class {type(root).__name__}]")
+        root_board = np.ascontiguousarray(root.get_board(), dtype=np.int8)
+        root_extra_info = root.get_extra_info()
+        root_extra_info = np.zeros(1, dtype=np.int8) if root_extra_info is None else np.ascontiguousarray(root_extra_info, dtype=np.int8)
+        root_last_action = -1 if root.last_action_index is None else root.last_action_index
+        return game, root_board, root_extra_info, root_last_action
+
+    def _tree_arrays(self):
+        """Returns a tuple of tree arrays in the order expected by compiled functions."""
+        return (self.tree_parents, self.tree_first_children, self.tree_n_children, self.tree_actions, self.tree_ns, self.tree_ns_wins,
+                self.tree_turns, self.tree_terminals, self.tree_outcomes, self.tree_depths)
+
+    def _run_batch(self, game, threads_batch_steps, root_board, root_extra_info, root_last_action, tree_size, workspaces):
+        """Runs a batch of steps (given per thread) inside compiled code - directly for a single thread, or on the thread pool for tree parallelization; returns the numbers of steps done per thread."""
+        if self.n_threads == 1:
+            return [_run_steps(game, threads_batch_steps[0], self.ucb_c, root_board, root_extra_info, root_last_action, *self._tree_arrays(), tree_size, *workspaces[0])]
+        if self.threads_executor is None:
+            thread_seeds = itertools.count(self.seed + 1) # each thread has its own generator in compiled code
+            self.threads_executor = ThreadPoolExecutor(max_workers=self.n_threads, initializer=lambda: mctsnj_game_mechanics.seed(next(thread_seeds)))
+        futures = [self.threads_executor.submit(_run_steps_tree_parallel, game, batch_steps, self.n_threads, self.ucb_c, self.virtual_loss, root_board, root_extra_info, root_last_action,
+                                                *self._tree_arrays(), tree_size, *workspace) for batch_steps, workspace in zip(threads_batch_steps, workspaces)]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """
+        Shuts down the thread pool of tree parallelization (if created). The instance remains usable - the pool is created again at the next run.
+        """
+        super().close()
+        if self.threads_executor is not None:
+            self.threads_executor.shutdown()
+            self.threads_executor = None
+
+    def run(self, root, forced_search_steps_limit=np.inf):
+        """
+        Runs the Monte Carlo Tree Search on CPU, executing batches of steps inside compiled code (by ``n_threads`` threads sharing the tree).
+
+        Args:
+            root (State):
+                root state from which the search starts.
+            forced_search_steps_limit (int):
+                steps limit used only when reproducing results of a previous experiment; if less than``np.inf`` then has a priority over the standard computational budget given by ``search_time_limit`` and ``search_steps_limit``.
+        Returns:
+            self.best_action (int):
+                best action resulting from search.
+        """
+        for _ in self._search(root, forced_search_steps_limit):
+            pass
+        return self.best_action
+
+    def run_iter(self, root, forced_search_steps_limit=np.inf, snapshot_steps=0, snapshot_ms=0.0, top_k=MCTS.DEFAULT_SNAPSHOT_TOP_K):
+        """
+        Runs the search (see ``run``) as a generator yielding lightweight snapshots of the search in progress and the final snapshot (see ``run_iter`` of ``MCTS`` for details).
+        Snapshots are taken between compiled batches of steps - once ``snapshot_steps`` steps or ``snapshot_ms`` milliseconds have passed since the previous snapshot.
+
+        Args:
+            root (State):
+                root state from which the search starts.
+            forced_search_steps_limit (int):
+                steps limit used only when reproducing results of a previous experiment; if less than``np.inf`` then has a priority over the standard computational budget given by ``search_time_limit`` and ``search_steps_limit``.
+            snapshot_steps (int):
+                number of steps between consecutive snapshots, ``0`` if snapshots are not taken by steps, defaults to ``0``.
+            snapshot_ms (float):
+                time in milliseconds between consecutive snapshots, ``0.0`` if snapshots are not taken by time, defaults to ``0.0``.
+            top_k (int):
+                number of root actions included in snapshots, defaults to ``5``.
+        Yields:
+            snapshot (dict):
+                snapshot of the search.
+        """
+        yield from self._search(root, forced_search_steps_limit, snapshot_steps, snapshot_ms, top_k)
+
+    def _search(self, root, forced_search_steps_limit, snapshot_steps=0, snapshot_ms=0.0, top_k=0):
+        """Performs the search for ``run`` and ``run_iter`` as a generator of snapshots - taken between batches (if requested by positive ``snapshot_steps`` or ``snapshot_ms``) and at the end."""
+        print(f"MCTSNJ RUN... [{self}]")
+        t1 = time.time()
+        self.root = root
+        self.root.parent = None
+        self.root.n = 0
+        self.root._clear_children()
+        self._reset_tree(root)
+        game, root_board, root_extra_info, root_last_action = self._prepare_root_arrays(root)
+        max_actions = type(root).get_max_actions()
+        workspaces = [(np.empty_like(root_board), np.empty_like(root_extra_info), np.empty_like(root_board), np.empty_like(root_extra_info), # board, extra info, child board, child extra info
+                       np.empty(max_actions, dtype=np.int16), np.empty(self.MAX_TREE_DEPTH + 2, dtype=np.int32)) for _ in range(self.n_threads)] # legal actions, path
+        tree_size = np.array([self.tree_size], dtype=np.int64)
+
+        self.initial_n_root = 0
+        self.initial_mean_depth = 0.0
+        self.initial_max_depth = 0
+        self.initial_size = 1
+        self.time_select = np.nan # stages run inside compiled batches, hence not timed separately
+        self.time_expand = np.nan
+        self.time_playout = np.nan
+        self.time_backup = np.nan
+        self.steps = 0
+        self.threads_steps = np.zeros(self.n_threads, dtype=np.int64)
+        self.batches = 0
+        steps_limit = forced_search_steps_limit if forced_search_steps_limit < np.inf else self.search_steps_limit
+        time_limit = np.inf if forced_search_steps_limit < np.inf else self.search_time_limit
+        batch_steps = 1
+        streaming = snapshot_steps > 0 or snapshot_ms > 0.0
+        stopped = False # search stopped by the caller of run_iter
+
+        t1_loop = time.time()
+        t_snapshot = t1_loop
+        steps_snapshot = 0
+        while True:
+            t2_loop = time.time()
+            if self.steps >= steps_limit or t2_loop - t1_loop >= time_limit:
+                break
+            threads_batch_steps = [batch_steps] * self.n_threads
+            if steps_limit < np.inf:
+                remaining_steps = int(steps_limit - self.steps)
+                threads_batch_steps = [min(batch_steps, remaining_steps // self.n_threads + (1 if t < remaining_steps % self.n_threads else 0)) for t in range(self.n_threads)]
+            if self.verbose_debug:
+                print(f"[MCTSNJ._run_batch()...; batch steps per thread: {threads_batch_steps}, time used so far: {t2_loop - t1_loop} s]")
+            threads_steps_done = self._run_batch(game, threads_batch_steps, root_board, root_extra_info, root_last_action, tree_size, workspaces)
+            t3_loop = time.time()
+            steps_done = sum(threads_steps_done)
+            self.tree_size = int(tree_size[0])
+            self.steps += steps_done
+            self.threads_steps += threads_steps_done
+            self.batches += 1
+            if any(done < batch for done, batch in zip(threads_steps_done, threads_batch_steps)):
+                self._ensure_tree_capacity(self.n_threads * max_actions + 1) # tree arrays full (compiled batch stopped early)
+            if steps_done > 0:
+                rate = max(threads_steps_done) / max(t3_loop - t2_loop, 1e-6) # per thread
+                batch_steps = max(1, int(rate * min(self.BATCH_TIME, max(time_limit - (t3_loop - t1_loop), 0.0))))
+            if streaming and ((snapshot_steps > 0 and self.steps - steps_snapshot >= snapshot_steps) or (snapshot_ms > 0.0 and 10.0**3 * (t3_loop - t_snapshot) >= snapshot_ms)):
+                t_snapshot = time.time()
+                steps_snapshot = self.steps
+                try:
+                    yield self._make_snapshot(t_snapshot - t1_loop, top_k)
+                except GeneratorExit: # search stopped by the caller - finalized below (no more snapshots)
+                    stopped = True
+                    break
+        self.time_loop = time.time() - t1_loop
+
+        t1_reduce_over_actions = time.time()
+        self._reduce_over_actions()
+        t2_reduce_over_actions = time.time()
+        self.time_reduce_over_actions = t2_reduce_over_actions - t1_reduce_over_actions
+        best_action_label = str(self.best_action)
+        best_action_label += f" ({type(self.root).action_index_to_name(self.best_action)})"
+        t2 = time.time()
+        self.time_total = t2 - t1
+
+        if self.verbose_info:
+            print(f"[actions info:\n{dict_to_str(self.root_actions_info)}]")
+            print(f"[performance info:\n{dict_to_str(self._make_performance_info())}]")
+
+        print(f"MCTSNJ RUN DONE. [time: {self.time_total} s; best action: {best_action_label}, best win_flag: {self.best_win_flag}, best n: {self.best_n}, best n_wins: {self.best_n_wins}, best q: {self.best_q}]")
+        if not stopped:
+            yield self._make_snapshot(self.time_loop, top_k, final=True)
+
+    def _make_performance_info(self):
+        """
+        Prepares and returns a dictionary with information on performance during the last run (per-stage mean times are ``nan``, since stages run inside compiled batches).
+        After the call, available via ``performance_info`` attribute.
+        """
+        performance_info = super()._make_performance_info()
+        performance_info["batches"] = self.batches
+        performance_info["threads_steps"] = [int(steps) for steps in self.threads_steps]
+        return performance_info
@@ -0,0 +1,310 @@
+"""
+Auxiliary module with mechanics of games (Connect 4, Gomoku, Reversi) defined as CPU functions compiled by ``numba`` (``nopython`` mode, GIL released).
+Meant to be used by compiled searches (e.g., ``MCTSNJ`` in :doc:`mctsnj`) which operate on boards and extra information arrays directly, without ``State`` objects.
+
+Public functions (``legal_actions``, ``take_action``, ``compute_outcome``, ``playout``, ``playouts``) dispatch to game-specific implementations based on a game code,
+i.e., an index into the tuple ``GAMES`` (see ``game_code``). Outcomes ``{-1, 1}`` denote a win by minimizing or maximizing player, respectively, ``0`` denotes a tie
+and ``OUTCOME_ONGOING`` denotes an ongoing game. Index ``-1`` of the last action denotes that no action has been taken yet (e.g., initial state of a game).
+For Reversi, the extra information array holds counts of pawns of the minimizing and maximizing player (as returned by ``Reversi.get_extra_info``), kept up to date by ``take_action``.
+
+Link to project repository
+--------------------------
+`https://github.com/pklesk/mcts_numba_cuda <https://github.com/pklesk/mcts_numba_cuda>`_
+"""
+
+import numpy as np
+from numba import jit
+from numba import void, int8, int16, int32, int64, boolean
+
+__version__ = "1.0.1"
+__author__ = "Przemysław Klęsk"
+__email__ = "pklesk@zut.edu.pl"
+
+GAMES = ("C4", "Gomoku", "Reversi") # game codes are indexes into this tuple
+GAME_C4 = 0
+GAME_GOMOKU = 1
+GAME_REVERSI = 2
+OUTCOME_ONGOING = 2
+
+def game_code(state_class):
+    """Returns the game code for a class of states (or for its closest base class named in ``GAMES``), or ``-1`` if the game has no compiled mechanics."""
+    for cls in state_class.__mro__:
+        if cls.__name__ in GAMES:
+            return GAMES.index(cls.__name__)
+    return -1
+
+@jit(int32(int8[:, :], int32, int32, int32, int32, int8), nopython=True, nogil=True, cache=True)
+def _count_in_line(board, i, j, di, dj, token):
+    """Returns the number of consecutive ``token`` entries on ``board`` in both directions ``(di, dj)`` and ``(-di, -dj)`` from cell ``(i, j)`` (cell itself excluded)."""
+    m, n = board.shape
+    total = 0
+    k = 1
+    while 0 <= i + k * di < m and 0 <= j + k * dj < n and board[i + k * di, j + k * dj] == token:
+        total += 1
+        k += 1
+    k = 1
+    while 0 <= i - k * di < m and 0 <= j - k * dj < n and board[i - k * di, j - k * dj] == token:
+        total += 1
+        k += 1
+    return total
+
+@jit(int8(int8[:, :], int32, int32, int8, int32, boolean), nopython=True, nogil=True, cache=True)
+def _line_outcome(board, i, j, token, line_length, exact):
+    """Returns ``token`` if a line of (at least or exactly, depending on ``exact`` flag) ``line_length`` tokens passes through cell ``(i, j)``, or ``0`` otherwise."""
+    for d in range(4):
+        di = 1 if d < 3 else 0 # directions: N-S, NE-SW, NW-SE, E-W
+        dj = d - 1 if d < 3 else 1
+        total = 1 + _count_in_line(board, i, j, di, dj, token)
+        if total == line_length or (not exact and total > line_length):
+            return token
+    return int8(0)
+
+@jit(int16(int8[:, :], int8[:], int8, int16[:]), nopython=True, nogil=True, cache=True)
+def legal_actions_c4(board, extra_info, turn, actions):
+    m, n = board.shape
+    count = 0
+    for j in range(n):
+        if extra_info[j] < m:
+            actions[count] = j
+            count += 1
+    return count
+
+@jit(void(int8[:, :], int8[:], int8, int16), nopython=True, nogil=True, cache=True)
+def take_action_c4(board, extra_info, turn, action):
+    m = board.shape[0]
+    board[m - 1 - extra_info[action], action] = turn
+    extra_info[action] += 1
+
+@jit(int8(int8[:, :], int8[:], int8, int16), nopython=True, nogil=True, cache=True)
+def compute_outcome_c4(board, extra_info, turn, last_action):
+    if last_action < 0:
+        return OUTCOME_ONGOING
+    m, n = board.shape
+    j = last_action
+    i = m - extra_info[j]
+    outcome = _line_outcome(board, i, j, -turn, 4, False)
+    if outcome != 0:
+        return outcome
+    for j in range(n):
+        if extra_info[j] < m:
+            return OUTCOME_ONGOING
+    return int8(0)
+
+@jit(int16(int8[:, :], int8[:], int8, int16[:]), nopython=True, nogil=True, cache=True)
+def legal_actions_gomoku(board, extra_info, turn, actions):
+    m, n = board.shape
+    count = 0
+    for i in range(m):
+        for j in range(n):
+            if board[i, j] == 0:
+                actions[count] = i * n + j
+                count += 1
+    return count
+
+@jit(void(int8[:, :], int8[:], int8, int16), nopython=True, nogil=True, cache=True)
+def take_action_gomoku(board, extra_info, turn, action):
+    n = board.shape[1]
+    board[action // n, action % n] = turn
+
+@jit(int8(int8[:, :], int8[:], int8, int16), nopython=True, nogil=True, cache=True)
+def compute_outcome_gomoku(board, extra_info, turn, last_action):
+    if last_action < 0:
+        return OUTCOME_ONGOING
+    m, n = board.shape
+    outcome = _line_outcome(board, last_action // n, last_action % n, -turn, 5, True)
+    if outcome != 0:
+        return outcome
+    for i in range(m):
+        for j in range(n):
+            if board[i, j] == 0:
+                return OUTCOME_ONGOING
+    return int8(0)
+
+@jit(int32(int8[:, :], int32, int32, int8), nopython=True, nogil=True, cache=True)
+def _flips_reversi(board, i, j, turn):
+    """Returns the number of opponent's pawns that would be flipped by ``turn`` player placing a pawn at cell ``(i, j)`` (zero if cell occupied)."""
+    if board[i, j] != 0:
+        return 0
+    m, n = board.shape
+    flips = 0
+    for di in range(-1, 2):
+        for dj in range(-1, 2):
+            if di == 0 and dj == 0:
+                continue
+            row = i + di
+            col = j + dj
+            count = 0
+            while 0 <= row < m and 0 <= col < n and board[row, col] == -turn:
+                row += di
+                col += dj
+                count += 1
+            if count > 0 and 0 <= row < m and 0 <= col < n and board[row, col] == turn:
+                flips += count
+    return flips
+
+@jit(int32(int8[:, :], int32, int32, int32, int32, int8), nopython=True, nogil=True, cache=True, inline="always")
+def _flip_line_reversi(board, i, j, di, dj, turn):
+    """Flips opponent's pawns bracketed by a pawn of ``turn`` player in the line going from cell ``(i, j)`` in direction ``(di, dj)``; returns the number of flipped pawns."""
+    m, n = board.shape
+    row = i + di
+    col = j + dj
+    count = 0
+    while 0 <= row < m and 0 <= col < n and board[row, col] == -turn:
+        row += di
+        col += dj
+        count += 1
+    if count > 0 and 0 <= row < m and 0 <= col < n and board[row, col] == turn:
+        for k in range(1, count + 1):
+            board[i + k * di, j + k * dj] = turn
+        return count
+    return 0
+
+@jit(boolean(int8[:, :], int8), nopython=True, nogil=True, cache=True)
+def _has_any_move_reversi(board, turn):
+    """Returns ``True`` if ``turn`` player has at least one move placing a pawn (stops at the first one found)."""
+    m, n = board.shape
+    for i in range(m):
+        for j in range(n):
+            if _flips_reversi(board, i, j, turn) > 0:
+                return True
+    return False
+
+@jit(int16(int8[:, :], int8[:], int8, int16[:]), nopython=True, nogil=True, cache=True)
+def legal_actions_reversi(board, extra_info, turn, actions):
+    m, n = board.shape
+    count = 0
+    for i in range(m):
+        for j in range(n):
+            if _flips_reversi(board, i, j, turn) > 0:
+                actions[count] = i * n + j
+                count += 1
+    if count == 0:
+        actions[0] = m * n # pass
+        count = 1
+    return count
+
+@jit(void(int8[:, :], int8[:], int8, int16), nopython=True, nogil=True, cache=True)
+def take_action_reversi(board, extra_info, turn, action):
+    m, n = board.shape
+    if action == m * n: # pass
+        return
+    i = action // n
+    j = action % n
+    flips = 0
+    for di in range(-1, 2):
+        for dj in range(-1, 2):
+            if di == 0 and dj == 0:
+                continue
+            flips += _flip_line_reversi(board, i, j, di, dj, turn)
+    board[i, j] = turn
+    extra_info[(turn + 1) // 2] += flips + 1 # pawns counts: [minimizing player, maximizing player]
+    extra_info[(1 - turn) // 2] -= flips
+
+@jit(void(int8[:, :], int8, int16, int16[:], int32[:], int32), nopython=True, nogil=True, cache=True)
+def make_move_reversi(board, turn, action, flipped, offsets, ply):
+    """
+    Takes the (legal) action in place, as ``take_action_reversi`` (but with no extra information), recording the undo information of ``ply``-th move: 
+    flat indexes of flipped pawns are written to ``flipped`` array from ``offsets[ply]`` on, and ``offsets[ply + 1]`` is set to the end of written indexes. 
+    """
+    m, n = board.shape
+    start = offsets[ply]
+    end = start
+    if action != m * n: # not a pass
+        i = action // n
+        j = action % n
+        for di in range(-1, 2):
+            for dj in range(-1, 2):
+                if di == 0 and dj == 0:
+                    continue
+                count = _flip_line_reversi(board, i, j, di, dj, turn)
+                for k in range(1, count + 1):
+                    flipped[end] = (i + k * di) * n + j + k * dj
+                    end += 1
+        board[i, j] = turn
+    offsets[ply + 1] = end
+
+@jit(void(int8[:, :], int8, int16, int16[:], int32[:], int32), nopython=True, nogil=True, cache=True)
+def unmake_move_reversi(board, turn, action, flipped, offsets, ply):
+    """Undoes the ``ply``-th move (action taken by ``turn`` player via ``make_move_reversi``) - empties the cell of the placed pawn and flips back pawns recorded in ``flipped[offsets[ply]:offsets[ply + 1]]``."""
+    m, n = board.shape
+    if action == m * n: # pass
+        return
+    board[action // n, action % n] = 0
+    for k in range(offsets[ply], offsets[ply + 1]):
+        board[flipped[k] // n, flipped[k] % n] = -turn
+
+@jit(int8(int8[:, :], int8[:], int8, int16), nopython=True, nogil=True, cache=True)
+def compute_outcome_reversi(board, extra_info, turn, last_action):
+    """Game ends when neither player has a move, as in ``Reversi.compute_outcome_job`` (a pass, being legal also alongside moves, does not imply the opponent has none)."""
+    if _has_any_move_reversi(board, turn):
+        return OUTCOME_ONGOING
+    if _has_any_move_reversi(board, -turn):
+        return OUTCOME_ONGOING
+    balance = extra_info[1] - extra_info[0] # pawns counts kept up to date by take_action_reversi
+    if balance > 0:
+        return int8(1)
+    if balance < 0:
+        return int8(-1)
+    return int8(0)
+
+@jit(int16(int8, int8[:, :], int8[:], int8, int16[:]), nopython=True, nogil=True, cache=True)
+def legal_actions(game, board, extra_info, turn, actions):
+    """Writes indexes of legal actions into array ``actions`` and returns their count (for Reversi, the pass action is legal only when no other action is)."""
+    if game == GAME_C4:
+        return legal_actions_c4(board, extra_info, turn, actions)
+    if game == GAME_GOMOKU:
+        return legal_actions_gomoku(board, extra_info, turn, actions)
+    return legal_actions_reversi(board, extra_info, turn, actions)
+
+@jit(void(int8, int8[:, :], int8[:], int8, int16), nopython=True, nogil=True, cache=True)
+def take_action(game, board, extra_info, turn, action):
+    """Takes (legal) action defined by index ``action`` for player ``turn`` - modifies the ``board`` and possibly ``extra_info`` arrays."""
+    if game == GAME_C4:
+        take_action_c4(board, extra_info, turn, action)
+    elif game == GAME_GOMOKU:
+        take_action_gomoku(board, extra_info, turn, action)
+    else:
+        take_action_reversi(board, extra_info, turn, action)
+
+@jit(int8(int8, int8[:, :], int8[:], int8, int16), nopython=True, nogil=True, cache=True)
+def compute_outcome(game, board, extra_info, turn, last_action):
+    """Computes and returns the outcome of game state represented by ``board`` and ``extra_info`` arrays, with ``turn`` indicating the player to act next."""
+    if game == GAME_C4:
+        return compute_outcome_c4(board, extra_info, turn, last_action)
+    if game == GAME_GOMOKU:
+        return compute_outcome_gomoku(board, extra_info, turn, last_action)
+    return compute_outcome_reversi(board, extra_info, turn, last_action)
+
+@jit(int8(int8, int8[:, :], int8[:], int8, int16, int16[:]), nopython=True, nogil=True, cache=True)
+def playout(game, board, extra_info, turn, last_action, actions):
+    """Carries out a uniformly random playout (in place, on the given ``board`` and ``extra_info`` arrays) and returns its outcome; ``actions`` is a working array of size at least the maximum number of actions."""
+    outcome = compute_outcome(game, board, extra_info, turn, last_action)
+    while outcome == OUTCOME_ONGOING:
+        count = legal_actions(game, board, extra_info, turn, actions)
+        last_action = actions[np.random.randint(count)]
+        take_action(game, board, extra_info, turn, last_action)
+        turn = -turn
+        outcome = compute_outcome(game, board, extra_info, turn, last_action)
+    return outcome
+
+@jit(void(int8, int8[:, :], int8[:], int8, int16, int8[:]), nopython=True, nogil=True, cache=True)
+def playouts(game, board, extra_info, turn, last_action, outcomes):
+    """Carries out ``outcomes.size`` independent uniformly random playouts from the state represented by ``board`` and ``extra_info`` arrays (left unchanged) and writes their outcomes into ``outcomes``."""
+    playout_board = np.empty_like(board)
+    playout_extra_info = np.empty_like(extra_info)
+    actions = np.empty(board.size + 1, dtype=np.int16)
+    for k in range(outcomes.size):
+        playout_board[:, :] = board
+        playout_extra_info[:] = extra_info
+        outcomes[k] = playout(game, playout_board, playout_extra_info, turn, last_action, actions)
+
+@jit(void(int8, int8[:, :], int8[:], int8, int16, int8[:], int64), nopython=True, nogil=True, cache=True)
+def seeded_playouts(game, board, extra_info, turn, last_action, outcomes, seed_value):
+    """Carries out playouts as ``playouts`` after seeding the random number generator of the calling thread with ``seed_value`` (outcomes do not depend on which thread runs them)."""
+    np.random.seed(seed_value)
+    playouts(game, board, extra_info, turn, last_action, outcomes)
+
+@jit(void(int64), nopython=True, cache=True)
+def seed(value):
+    """Seeds the random number generator used in compiled code (the generator is local to the calling thread)."""
+    np.random.seed(value)
@@ -0,0 +1,326 @@
+"""
+Auxiliary module with a root-parallel CPU implementation of MCTS algorithm (hence the "RP" suffix - root parallelization), embodied by the class ``MCTSRP``.
+
+Searches are carried out by a pool of long-lived worker processes (started once, at the first run, and reused across moves). Each worker holds its own
+instance of the referential ``MCTS`` class (with a distinct seed) and grows an independent tree from the same root. After all workers finish, statistics of root actions
+(``n``, ``n_wins``) are summed over trees, in the same manner as in ``MCTSNC._reduce_over_trees_*`` functions on GPU, and the final decision is made by ``_best_action``.
+
+Link to project repository
+--------------------------
+`https://github.com/pklesk/mcts_numba_cuda <https://github.com/pklesk/mcts_numba_cuda>`_
+
+Notes
+-----
+Private functions of ``MCTSRP`` class are named with a single leading underscore.
+For public methods full docstrings are provided (with arguments and returns described). For private functions short docstrings are provided.
+"""
+
+import numpy as np
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from mcts import MCTS
+from utils import dict_to_str
+
+__version__ = "1.0.1"
+__author__ = "Przemysław Klęsk"
+__email__ = "pklesk@zut.edu.pl"
+
+def _worker(connection, search_time_limit, search_steps_limit, ucb_c, seed):
+    """
+    Main function of a worker process - runs ``MCTS`` searches for roots received via ``connection`` and sends back summaries of root actions and performance (until ``None`` is received).
+    If a search fails, the formatted traceback is sent back instead of the summary (as ``{"error": ...}``).
+    """
+    sys.stdout = open(os.devnull, "w")
+    ai = MCTS(search_time_limit=search_time_limit, search_steps_limit=search_steps_limit, vanilla=True, ucb_c=ucb_c, seed=seed, verbose_debug=False, verbose_info=True)
+    while True:
+        job = connection.recv()
+        if job is None:
+            break
+        try:
+            root, forced_search_steps_limit = job
+            ai.run(root, forced_search_steps_limit)
+            actions = {key: (bool(entry["win_flag"]), int(entry["n"]), int(entry["n_wins"])) for key, entry in ai.root_actions_info.items() if key != "best"}
+            summary = {"actions": actions, "n_root": int(ai.root.n), "steps": int(ai.steps),
+                       "times": (ai.time_select, ai.time_expand, ai.time_playout, ai.time_backup), "tree": ai.performance_info["tree"]}
+        except Exception:
+            summary = {"error": traceback.format_exc()}
+        connection.send(summary)
+    connection.close()
+
+class MCTSRP(MCTS):
+    """
+    Monte Carlo Tree Search for CPU with root parallelization - independent trees grown by a pool of worker processes, root statistics summed over trees.
+    Searches are always vanilla (no information from previous searches is reused).
+    """
+
+    DEFAULT_N_WORKERS = None # number of CPU cores (resolved at construction)
+    WORKERS_POLL_INTERVAL = 1.0 # [s], interval of checks whether workers are still alive while waiting for their summaries
+
+    def __init__(self,
+                 search_time_limit=MCTS.DEFAULT_SEARCH_TIME_LIMIT, search_steps_limit=MCTS.DEFAULT_SEARCH_STEPS_LIMIT,
+                 n_workers=DEFAULT_N_WORKERS,
+                 ucb_c=MCTS.DEFAULT_UCB_C, seed=MCTS.DEFAULT_SEED,
+                 verbose_debug=MCTS.DEFAULT_VERBOSE_DEBUG, verbose_info=MCTS.DEFAULT_VERBOSE_INFO):
+        """
+        Constructor of ``MCTSRP`` instances.
+
+        Args:
+            search_time_limit (float):
+                time limit in seconds (computational budget), ``np.inf`` if no limit, defaults to ``5.0``.
+            search_steps_limit (float):
+                steps limit (computational budget, per worker), ``np.inf`` if no limit, defaults to ``np.inf``.
+            n_workers (int):
+                number of worker processes (independent trees), if ``None`` then the number of CPU cores, defaults to ``None``.
+            ucb_c (float):
+                value of C constant, influencing exploration tendency, appearing in UCT formula (upper confidence bounds for trees), defaults to ``2.0``.
+            seed (int):
+                seed for random number generators, worker ``i`` is seeded with ``seed + i``, defaults to ``0``.
+            verbose_debug (bool):
+                debug verbosity flag, if ``True`` then detailed information about communication with workers is printed to console, defaults to ``False``.
+            verbose_info (bool):
+                verbosity flag, if ``True`` then standard information on actions and performance are printed to console (after a full run), defaults to ``True``.
+        """
+        super().__init__(search_time_limit=search_time_limit, search_steps_limit=search_steps_limit, vanilla=True, ucb_c=ucb_c, seed=seed,
+                         verbose_debug=verbose_debug, verbose_info=verbose_info)
+        self.n_workers = multiprocessing.cpu_count() if n_workers is None else n_workers
+        if self.n_workers < 1:
+            invalid_value = self.n_workers
+            self.n_workers = 1
+            print(f"[invalid value of parameter n_workers: {invalid_value}, changed to: {self.n_workers}]")
+        self.workers = None # started lazily, at the first run
+        self.connections = None
+
+    def __str__(self):
+        """
+        Returns a string representation of this ``MCTSRP`` instance.
+
+        Returns:
+            str: string representation of this ``MCTSRP`` instance.
+        """
+        return f"MCTSRP(search_time_limit={self.search_time_limit}, search_steps_limit={self.search_steps_limit}, n_workers={self.n_workers}, ucb_c={self.ucb_c}, seed: {self.seed})"
+
+    def _start_workers(self):
+        """Starts worker processes (daemons) and pipes connecting them to this process."""
+        if self.verbose_debug:
+            print(f"[MCTSRP._start_workers()... for {self}]")
+        t1 = time.time()
+        self.workers = []
+        self.connections = []
+        for i in range(self.n_workers):
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_worker, args=(worker_connection, self.search_time_limit, self.search_steps_limit, self.ucb_c, self.seed + i), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+            self.connections.append(connection)
+        t2 = time.time()
+        if self.verbose_debug:
+            print(f"[MCTSRP._start_workers() done; time: {t2 - t1} s]")
+
+    def _terminate_workers(self):
+        """Terminates worker processes (e.g. after a failure of any of them) without waiting for their current searches."""
+        for worker, connection in zip(self.workers, self.connections):
+            worker.terminate()
+            worker.join()
+            connection.close()
+        self.workers = None
+        self.connections = None
+
+    def _receive_summary(self, worker, connection):
+        """Waits for the summary of a search sent back by the given worker; raises ``RuntimeError`` (after terminating all workers) if the worker died or its search failed."""
+        while not connection.poll(self.WORKERS_POLL_INTERVAL):
+            if not worker.is_alive():
+                exitcode = worker.exitcode
+                self._terminate_workers()
+                raise RuntimeError(f"MCTSRP worker process {worker.name} died (exit code: {exitcode}) before sending back its search summary")
+        summary = connection.recv()
+        if "error" in summary:
+            self._terminate_workers()
+            raise RuntimeError(f"MCTSRP worker process {worker.name} failed during search:\n{summary['error']}")
+        return summary
+
+    def close(self):
+        """
+        Stops worker processes (if started). The instance remains usable - workers are started again at the next run.
+        """
+        super().close()
+        if self.workers is None:
+            return
+        for connection in self.connections:
+            connection.send(None)
+        for worker, connection in zip(self.workers, self.connections):
+            worker.join()
+            connection.close()
+        self.workers = None
+        self.connections = None
+
+    def run(self, root, forced_search_steps_limit=np.inf):
+        """
+        Runs the Monte Carlo Tree Search with root parallelization (on CPU, worker processes).
+
+        Args:
+            root (State):
+                root state from which the search starts.
+            forced_search_steps_limit (int):
+                steps limit (in total, over workers) used only when reproducing results of a previous experiment; if less than``np.inf`` then has a priority over the standard computational budget given by ``search_time_limit`` and ``search_steps_limit``.
+        Returns:
+            self.best_action (int):
+                best action resulting from search.
+        """
+        print(f"MCTSRP RUN... [{self}]")
+        t1 = time.time()
+        if self.workers is None:
+            self._start_workers()
+        self.root = root
+        self.root.parent = None
+        self.root.n = 0
+        self.root._clear_children()
+        self.root._detach_from_arena() # states kept in a board arena (of another search) are not sent to workers as such
+
+        t1_loop = time.time()
+        if forced_search_steps_limit < np.inf:
+            forced_search_steps_limit = int(forced_search_steps_limit)
+            workers_steps_limits = [forced_search_steps_limit // self.n_workers + (1 if i < forced_search_steps_limit % self.n_workers else 0) for i in range(self.n_workers)]
+        else:
+            workers_steps_limits = [np.inf] * self.n_workers
+        active_workers = []
+        for worker, connection, steps_limit in zip(self.workers, self.connections, workers_steps_limits):
+            if steps_limit > 0:
+                connection.send((self.root, steps_limit))
+                active_workers.append((worker, connection))
+        self.summaries = [self._receive_summary(worker, connection) for worker, connection in active_workers]
+        self.time_loop = time.time() - t1_loop
+        if self.verbose_debug:
+            print(f"[MCTSRP.run(): searches of {len(self.summaries)} workers done; time: {self.time_loop} s]")
+
+        t1_reduce_over_trees = time.time()
+        self._reduce_over_trees()
+        t2_reduce_over_trees = time.time()
+        self.time_reduce_over_trees = t2_reduce_over_trees - t1_reduce_over_trees
+
+        t1_reduce_over_actions = time.time()
+        self._reduce_over_actions()
+        best_action_label = str(self.best_action)
+        best_action_label += f" ({type(self.root).action_index_to_name(self.best_action)})"
+        t2_reduce_over_actions = time.time()
+        self.time_reduce_over_actions = t2_reduce_over_actions - t1_reduce_over_actions
+
+        t2 = time.time()
+        self.time_total = t2 - t1
+
+        if self.verbose_info:
+            print(f"[actions info:\n{dict_to_str(self.root_actions_info)}]")
+            print(f"[performance info:\n{dict_to_str(self._make_performance_info())}]")
+
+        print(f"MCTSRP RUN DONE. [time: {self.time_total} s; best action: {best_action_label}, best win_flag: {self.best_win_flag}, best n: {self.best_n}, best n_wins: {self.best_n_wins}, best q: {self.best_q}]")
+        return self.best_action
+
+    def ponder_start(self, action_index, steps_limit=np.inf):
+        """Pondering is not supported (trees are built by workers from the root at each run, hence nothing pondered would be kept) - returns ``None``."""
+        return None
+
+    def run_iter(self, root, forced_search_steps_limit=np.inf, snapshot_steps=0, snapshot_ms=0.0, top_k=MCTS.DEFAULT_SNAPSHOT_TOP_K):
+        """
+        Runs the search (see ``run``) as a generator compatible with ``run_iter`` of ``MCTS``. Since statistics of workers are gathered only once their searches are done,
+        no snapshots of the search in progress are available and only the final snapshot is yielded (``snapshot_steps`` and ``snapshot_ms`` are ignored).
+
+        Args:
+            root (State):
+                root state from which the search starts.
+            forced_search_steps_limit (int):
+                steps limit (in total, over workers) used only when reproducing results of a previous experiment; if less than``np.inf`` then has a priority over the standard computational budget given by ``search_time_limit`` and ``search_steps_limit``.
+            snapshot_steps (int):
+                ignored (kept for compatibility with ``run_iter`` of ``MCTS``).
+            snapshot_ms (float):
+                ignored (kept for compatibility with ``run_iter`` of ``MCTS``).
+            top_k (int):
+                number of root actions included in the final snapshot, defaults to ``5``.
+        Yields:
+            snapshot (dict):
+                final snapshot of the search.
+        """
+        self.run(root, forced_search_steps_limit)
+        yield self._make_snapshot(self.time_loop, top_k, final=True)
+
+    def _reduce_over_trees(self):
+        """Sums root statistics over trees (summaries sent by workers) - counts of root visits and, per root action, counts of visits and wins (win flags are properties of root children, hence taken from any tree)."""
+        self.root_n = 0
+        self.steps = 0
+        self.root_actions_stats = {}
+        for summary in self.summaries:
+            self.root_n += summary["n_root"]
+            self.steps += summary["steps"]
+            for key, (win_flag, n, n_wins) in summary["actions"].items():
+                win_flag_sum, n_sum, n_wins_sum = self.root_actions_stats.get(key, (False, 0, 0))
+                self.root_actions_stats[key] = (win_flag_sum or win_flag, n_sum + n, n_wins_sum + n_wins)
+        self.root.n = self.root_n
+        self.root_actions_stats = dict(sorted(self.root_actions_stats.items()))
+
+    def _root_children_stats(self):
+        """Returns the number of visits of the root and lists with actions, visits counts, wins counts and win flags of root actions (summed over trees, for snapshots)."""
+        stats = self.root_actions_stats
+        return self.root_n, list(stats.keys()), [n for _, n, _ in stats.values()], [n_wins for _, _, n_wins in stats.values()], [win_flag for win_flag, _, _ in stats.values()]
+
+    def _reduce_over_actions(self):
+        """Calls ``_make_actions_info`` and ``_best_action`` using root statistics summed over trees to find the best available action."""
+        self.root_actions_info = self._make_actions_info(self.root_actions_stats, best_action_entry=True)
+
+    def _make_actions_info(self, actions_stats, best_action_entry=False):
+        """
+        Prepares and returns a dictionary with information on root actions implied by the last run (statistics summed over trees), in particular: estimates of action values, their UCBs, counts of times actions were taken, etc.
+        After the call, available via ``actions_info`` attribute.
+        """
+        actions_info = {}
+        for key, (win_flag, n, n_wins) in actions_stats.items():
+            entry = {}
+            entry["name"] = type(self.root).action_index_to_name(key)
+            entry["n_root"] = self.root_n
+            entry["win_flag"] = win_flag
+            entry["n"] = n
+            entry["n_wins"] = n_wins
+            entry["q"] = n_wins / n if n > 0 else np.nan
+            entry["ucb"] = entry["q"] + self.ucb_c * np.sqrt(np.log(self.root_n) / n) if n > 0 else np.inf
+            actions_info[key] = entry
+        if best_action_entry:
+            best_key = self._best_action(actions_stats, actions_info)
+            best_entry = {"index": best_key, **actions_info[best_key]}
+            actions_info["best"] = best_entry
+        self.actions_info = actions_info
+        return actions_info
+
+    def _make_performance_info(self):
+        """
+        Prepares and returns a dictionary with information on performance during the last run (stage times summed and tree information aggregated over workers).
+        After the call, available via ``performance_info`` attribute.
+        """
+        performance_info = {}
+        performance_info["steps"] = int(self.steps)
+        performance_info["steps_per_second"] = self.steps / self.time_total
+        performance_info["playouts"] = int(self.root_n)
+        performance_info["playouts_per_second"] = performance_info["playouts"] / self.time_total
+        ms_factor = 10.0**3
+        times_select, times_expand, times_playout, times_backup = np.sum([summary["times"] for summary in self.summaries], axis=0)
+        times_info = {}
+        times_info["total"] = ms_factor * self.time_total
+        times_info["loop"] = ms_factor * self.time_loop
+        times_info["reduce_over_trees"] = ms_factor * self.time_reduce_over_trees
+        times_info["reduce_over_actions"] = ms_factor * self.time_reduce_over_actions
+        times_info["mean_loop"] = times_info["loop"] / self.steps
+        times_info["mean_select"] = ms_factor * times_select / self.steps
+        times_info["mean_expand"] = ms_factor * times_expand / self.steps
+        times_info["mean_playout"] = ms_factor * times_playout / self.steps
+        times_info["mean_backup"] = ms_factor * times_backup / self.steps
+        performance_info["times_[ms]"] = times_info
+        trees_sizes = np.array([summary["tree"]["size"] for summary in self.summaries])
+        trees_mean_depths = np.array([summary["tree"]["mean_depth"] for summary in self.summaries])
+        trees_info = {}
+        trees_info["count"] = len(self.summaries)
+        trees_info["mean_depth"] = float(np.sum(trees_mean_depths * trees_sizes) / np.sum(trees_sizes))
+        trees_info["max_depth"] = int(max(summary["tree"]["max_depth"] for summary in self.summaries))
+        trees_info["mean_size"] = float(np.mean(trees_sizes))
+        trees_info["max_size"] = int(np.max(trees_sizes))
+        performance_info["trees"] = trees_info
+        self.performance_info = performance_info
+        return performance_info
@@ -0,0 +1,64 @@
+"""
+Auxiliary module with a memory benchmark for trees built by ``MCTS`` (see :doc:`mcts`) - measures the number of bytes per tree node for classes of states ``C4``, ``Gomoku`` and ``Reversi``.
+Memory is traced (via ``tracemalloc``) while a tree is grown by a fixed number of search steps, and the memory held after the search is divided by the number of tree nodes.
+The measured amount covers all per-node allocations: state objects, their boards, lists of children and arrays of children statistics (and the whole board arena, if used). Can be run as a script.
+
+Link to project repository
+--------------------------
+`https://github.com/pklesk/mcts_numba_cuda <https://github.com/pklesk/mcts_numba_cuda>`_
+"""
+
+import gc
+import tracemalloc
+import numpy as np
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+
+__version__ = "1.0.1"
+__author__ = "Przemysław Klęsk"
+__email__ = "pklesk@zut.edu.pl"
+
+# benchmark settings
+STATE_CLASSES_STEPS = {C4: 5000, Gomoku: 500, Reversi: 2000} # class of states -> number of search steps
+NODE_MODES = {"board per node": {}, "board arena": {"board_arena": True}, "replay": {"replay_nodes": True}} # mode name -> keyword arguments for MCTS
+SEED = 0
+
+def bytes_per_node(state_class, n_steps, seed=SEED, **mcts_kwargs):
+    """
+    Grows a tree by ``n_steps`` steps of ``MCTS`` search from the initial state of the given class and returns the number of bytes (held after the search) per tree node, together with the tree size.
+
+    Args:
+        state_class (type):
+            class of states (subclass of ``State``).
+        n_steps (int):
+            number of search steps.
+        seed (int):
+            seed for the search.
+        mcts_kwargs (dict):
+            other keyword arguments passed to ``MCTS`` constructor.
+
+    Returns:
+        bytes_per_node (float):
+            number of bytes per tree node.
+        size (int):
+            number of tree nodes.
+    """
+    MCTS(search_time_limit=np.inf, search_steps_limit=n_steps, seed=seed, verbose_info=False, **mcts_kwargs).run(state_class(), n_steps) # warm-up (compilations, caches)
+    gc.collect()
+    tracemalloc.start()
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=n_steps, seed=seed, verbose_info=False, **mcts_kwargs)
+    ai.run(state_class(), n_steps)
+    ai.path = ai.path_indexes = None # references to last path only
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = ai.tree_nodes_count
+    return memory / size, size
+
+if __name__ == "__main__":
+    for state_class, n_steps in STATE_CLASSES_STEPS.items():
+        for mode, mcts_kwargs in NODE_MODES.items():
+            memory_per_node, size = bytes_per_node(state_class, n_steps, **mcts_kwargs)
+            print(f"[memory benchmark: {state_class.class_repr()}, node mode: {mode}, steps: {n_steps}, tree size: {size}, bytes per node: {memory_per_node:.1f}]")
@@ -0,0 +1,109 @@
+"""
+Auxiliary module with a benchmark of RAVE for ``MCTS`` (see :doc:`mcts`, parameter ``rave``) - plays matches of Gomoku between ``MCTS`` blending AMAF (all-moves-as-first) statistics into action values
+and the plain ``MCTS`` with the settings of ``mcts_5_inf_vanilla`` (see :doc:`main`), with colors alternated between games.
+The first match is played at equal wall time per move (both searches get the same ``search_time_limit``), the second one at equal move quality targets - the RAVE search gets
+``STEPS_RATIO`` times fewer steps (playouts) per move than the plain one. Win rates (draws counted as halves) and mean numbers of playouts per move are reported. Can be run as a script.
+
+Link to project repository
+--------------------------
+`https://github.com/pklesk/mcts_numba_cuda <https://github.com/pklesk/mcts_numba_cuda>`_
+"""
+
+import contextlib
+import io
+import numpy as np
+from mcts import MCTS
+from gomoku import Gomoku
+
+__version__ = "1.0.1"
+__author__ = "Przemysław Klęsk"
+__email__ = "pklesk@zut.edu.pl"
+
+# benchmark settings
+STATE_CLASS = Gomoku
+N_GAMES = 10
+SEARCH_TIME_LIMIT = 5.0 # [s] per move, as in mcts_5_inf_vanilla
+SEARCH_STEPS_LIMIT = 4000 # steps per move of the plain search in the match at equal move quality targets
+STEPS_RATIO = 4 # how many times fewer steps the RAVE search gets in the match at equal move quality targets
+RAVE_KWARGS = {"rave": True, "ucb_c": 0.0} # keyword arguments for MCTS turning RAVE on (other settings as in mcts_5_inf_vanilla), as in mcts_5_inf_vanilla_rave
+SEED = 0
+
+def play_game(state_class, black_ai, white_ai):
+    """
+    Plays a single game between two AIs (instances of ``MCTS``) from the initial state of the given class and returns its outcome together with numbers of playouts per move of each AI.
+
+    Args:
+        state_class (type):
+            class of states (subclass of ``State``).
+        black_ai (MCTS):
+            AI of the black (maximizing, moving first) player.
+        white_ai (MCTS):
+            AI of the white (minimizing) player.
+
+    Returns:
+        outcome ({-1, 0, 1}):
+            outcome of the game.
+        playouts (dict):
+            dictionary mapping {1, -1} (black, white) to lists with numbers of playouts per move.
+    """
+    ais = {1: black_ai, -1: white_ai}
+    playouts = {1: [], -1: []}
+    state = state_class()
+    with contextlib.redirect_stdout(io.StringIO()): # searches' printouts suppressed
+        while state.compute_outcome() is None:
+            ai = ais[state.turn]
+            action_index = ai.run(state)
+            playouts[state.turn].append(ai.root.n)
+            state = state.take_action(action_index)
+            state.parent = None # finished search trees freed
+    return state.compute_outcome(), playouts
+
+def match(state_class, ai_kwargs, opponent_kwargs, n_games=N_GAMES, seed=SEED):
+    """
+    Plays a match between two ``MCTS`` AIs (colors alternated between games, the first game with the first AI as black) and returns its summary.
+
+    Args:
+        state_class (type):
+            class of states (subclass of ``State``).
+        ai_kwargs (dict):
+            keyword arguments for ``MCTS`` constructor of the first AI.
+        opponent_kwargs (dict):
+            keyword arguments for ``MCTS`` constructor of the second AI (opponent).
+        n_games (int):
+            number of games.
+        seed (int):
+            seed for the first game (subsequent games use subsequent seeds, opponents' seeds are shifted by ``n_games``).
+
+    Returns:
+        match_info (dict):
+            dictionary with numbers of wins, draws and losses of the first AI, its score (win rate with draws counted as halves) and mean numbers of playouts per move of both AIs.
+    """
+    wins, draws, losses = 0, 0, 0
+    ai_playouts, opponent_playouts = [], []
+    for game_index in range(n_games):
+        ai = MCTS(seed=seed + game_index, verbose_info=False, **ai_kwargs)
+        opponent = MCTS(seed=seed + n_games + game_index, verbose_info=False, **opponent_kwargs)
+        ai_turn = 1 if game_index % 2 == 0 else -1
+        outcome, playouts = play_game(state_class, ai if ai_turn == 1 else opponent, opponent if ai_turn == 1 else ai)
+        wins += int(outcome == ai_turn)
+        draws += int(outcome == 0)
+        losses += int(outcome == -ai_turn)
+        ai_playouts += playouts[ai_turn]
+        opponent_playouts += playouts[-ai_turn]
+    match_info = {}
+    match_info["wins"] = wins
+    match_info["draws"] = draws
+    match_info["losses"] = losses
+    match_info["score"] = (wins + 0.5 * draws) / n_games
+    match_info["mean_playouts"] = np.mean(ai_playouts)
+    match_info["opponent_mean_playouts"] = np.mean(opponent_playouts)
+    return match_info
+
+if __name__ == "__main__":
+    vanilla_kwargs = {"vanilla": True}
+    time_kwargs = {"search_time_limit": SEARCH_TIME_LIMIT, "search_steps_limit": np.inf}
+    match_info = match(STATE_CLASS, {**time_kwargs, **vanilla_kwargs, **RAVE_KWARGS}, {**time_kwargs, **vanilla_kwargs})
+    print(f"[rave benchmark: {STATE_CLASS.class_repr()}, equal time per move: {SEARCH_TIME_LIMIT} s, games: {N_GAMES}, rave vs mcts_5_inf_vanilla: {match_info}]")
+    steps_kwargs = {"search_time_limit": np.inf, "search_steps_limit": SEARCH_STEPS_LIMIT}
+    match_info = match(STATE_CLASS, {**steps_kwargs, "search_steps_limit": SEARCH_STEPS_LIMIT // STEPS_RATIO, **vanilla_kwargs, **RAVE_KWARGS}, {**steps_kwargs, **vanilla_kwargs})
+    print(f"[rave benchmark: {STATE_CLASS.class_repr()}, steps per move: {SEARCH_STEPS_LIMIT // STEPS_RATIO} (rave) vs {SEARCH_STEPS_LIMIT} (plain), games: {N_GAMES}, rave vs plain: {match_info}]")
@@ -1,7 +1,8 @@
 import numpy as np
-from mcts import State
+from mcts import State, ActionsBuffer
+import mctsnj_game_mechanics
 from numba import jit
-from numba import int8
+from numba import int8, boolean
 
 
 class Reversi(State):
@@ -9,6 +10,11 @@ class Reversi(State):
 
     SYMBOLS = ["\u25cb", "+", "\u25cf"]
     # SYMBOLS = ["\u25cf", "+", "\u25cb"]
+    ZOBRIST_KEYS = State._make_zobrist_keys(M * N)
+    __slots__ = ("board",)
+    PLAYOUT_ACTIONS = ActionsBuffer(M * N + 1)
+    NO_EXTRA_INFO = np.zeros(2, dtype=np.int8) # legal actions in compiled mechanics do not depend on pawns counts
+    BOARD_FIELDS = ("board",)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -23,6 +29,7 @@ class Reversi(State):
             self.board[mid_row, mid_col] = 1 
             self.board[mid_row - 1, mid_col] = -1  
             self.board[mid_row, mid_col - 1] = -1 
+            self.zobrist_key = self.compute_zobrist_key()
 
             # self.board[0, 3] = -1
             # self.board[0, 4] = -1
@@ -96,6 +103,7 @@ class Reversi(State):
     def take_action_job(self, action_index):
         if action_index == Reversi.M * Reversi.N:
             self.turn *= -1
+            self._zobrist_toggle_turn()
             return True
 
         row = action_index // Reversi.N
@@ -109,10 +117,16 @@ class Reversi(State):
 
         self.board[pawns_indices[0], pawns_indices[1]] = self.turn
 
+        self._zobrist_toggle(action_index, self.turn)
+        for flip_row, flip_col in zip(pawns_indices[0], pawns_indices[1]):
+            self._zobrist_toggle(flip_row * Reversi.N + flip_col, -self.turn)
+            self._zobrist_toggle(flip_row * Reversi.N + flip_col, self.turn)
+
         # if self.has_legal_actions(-self.turn):
         #     self.turn *= -1
 
         self.turn *= -1
+        self._zobrist_toggle_turn()
 
         return True
 
@@ -134,34 +148,76 @@ class Reversi(State):
             return 0
 
     def has_legal_actions(self, turn):
-        for action_index in range(Reversi.M * Reversi.N):
-            if self.get_pawns_to_flip(action_index, turn)[0]:
-                return True
-        return False
+        return bool(np.any(Reversi.legal_actions_mask_numba_jit(Reversi.M, Reversi.N, turn, self.board)[:-1]))
 
     def get_all_legal_actions(self, turn):
-        legal_actions = []
-        for action_index in range(Reversi.M * Reversi.N):
-            if self.get_pawns_to_flip(action_index, turn)[0]:
-                legal_actions.append(action_index)
-        return legal_actions
-
-    def take_random_action_playout(self):
-        legal_actions = self.get_all_legal_actions(self.turn)
-
-        if legal_actions:
-            random_action_index = np.random.choice(legal_actions)
-            child = self.take_action(random_action_index)
-            return child
+        mask = Reversi.legal_actions_mask_numba_jit(Reversi.M, Reversi.N, turn, self.board)
+        return np.flatnonzero(mask[:-1]).tolist()
+
+    def legal_actions_mask(self):
+        # pass (last action index) always legal, as in take_action_job (playouts pass only when no other action is legal)
+        return Reversi.legal_actions_mask_numba_jit(Reversi.M, Reversi.N, self.turn, self.board)
+
+    @staticmethod
+    @jit(boolean[:](int8, int8, int8, int8[:, :]), nopython=True, cache=True)
+    def legal_actions_mask_numba_jit(M, N, turn, board):
+        mask = np.zeros(M * N + 1, dtype=np.bool_)
+        for i in range(M):
+            for j in range(N):
+                if board[i, j] != 0:
+                    continue
+                for di in range(-1, 2):
+                    for dj in range(-1, 2):
+                        if di == 0 and dj == 0:
+                            continue
+                        row = i + di
+                        col = j + dj
+                        count = 0
+                        while 0 <= row < M and 0 <= col < N and board[row, col] == -turn:
+                            row += di
+                            col += dj
+                            count += 1
+                        if count > 0 and 0 <= row < M and 0 <= col < N and board[row, col] == turn:
+                            mask[i * N + j] = True
+                            break
+                    if mask[i * N + j]:
+                        break
+        mask[M * N] = True
+        return mask
+
+    def take_random_action_playout(self, rng=None):
+        child = self.take_action(self.random_playout_action(rng))
+        return child
+
+    def random_playout_action(self, rng=None):
+        # legal actions listed into a preallocated buffer (no arrays allocated in playouts), pass listed only if no move
+        actions = Reversi.PLAYOUT_ACTIONS.actions
+        count = mctsnj_game_mechanics.legal_actions_reversi(self.board, Reversi.NO_EXTRA_INFO, self.turn, actions)
+        if actions[0] != Reversi.M * Reversi.N:
+            return actions[np.random.randint(count) if rng is None else rng.integers(count)]
         else:
-            child = self.take_action(Reversi.M * Reversi.N)
-            return child
+            return Reversi.M * Reversi.N
+
+    def _make_scratch(self):
+        scratch = super()._make_scratch()
+        scratch.moves_stack = FlipsStack()
+        return scratch
 
-        # random_action_index = np.random.choice(legal_actions)
+    def make_move(self, action_index):
+        # flipped pawns recorded in preallocated undo buffers of the scratch state (ply = index of this move on moves stack)
+        stack = self.moves_stack
+        mctsnj_game_mechanics.make_move_reversi(self.board, self.turn, action_index, stack.flipped, stack.offsets, len(stack))
+        super().make_move(action_index)
 
-        # child = self.take_action(random_action_index)
+    def unmake_move(self):
+        action_index = self.last_action_index
+        super().unmake_move()
+        stack = self.moves_stack
+        mctsnj_game_mechanics.unmake_move_reversi(self.board, self.turn, action_index, stack.flipped, stack.offsets, len(stack))
 
-        # return child
+    def copy_from(self, state):
+        super().copy_from(state)
+        np.copyto(self.board, state.board)
 
     def get_board(self):
         return self.board
@@ -240,3 +296,11 @@ class Reversi(State):
                         break
 
         return pawns_to_flip_coords
+
+
+class FlipsStack(list):
+    # moves stack of a Reversi scratch state with preallocated undo buffers: flat indexes of pawns flipped by consecutive moves and offsets of moves in them
+    def __init__(self):
+        super().__init__()
+        self.flipped = np.empty(8 * max(Reversi.M, Reversi.N) * Reversi.M * Reversi.N, dtype=np.int16)
+        self.offsets = np.zeros(2 * Reversi.M * Reversi.N + 2, dtype=np.int32)
@@ -6,6 +6,7 @@ Link to project repository
 `https://github.com/pklesk/mcts_numba_cuda <https://github.com/pklesk/mcts_numba_cuda>`_ 
 """
 
+import numpy as np
 import cpuinfo
 import platform
 import psutil
@@ -39,6 +40,88 @@ def list_to_str(l, indent=0):
         list_str += str(elem) + (",\n" if i < len(l) - 1 else "]")
     return list_str 
 
+def early_stopping_reason(ns, ns_wins, win_flags, remaining_steps, max_gain_per_step, z=float("inf")):
+    """
+    Returns the reason for stopping a search early, based on statistics of root actions (lists of visits counts ``ns``, wins counts ``ns_wins`` and win flags), or ``None`` if the search should go on.
+    Reasons: ``"single_action"`` - only one action available, ``"win_flag"`` - a winning action found (decisive for the final choice),
+    ``"unreachable"`` - the runner-up (by visits counts) cannot overtake the leader within ``remaining_steps`` steps, each adding at most ``max_gain_per_step`` visits to an action (see ``gain_per_step_estimate``),
+    ``"separated"`` - confidence intervals (of half-width ``z / (2 sqrt(n))``) for action-value estimates of the leader and the runner-up are disjoint, the leader being better.
+    """
+    if len(ns) == 0:
+        return None
+    if len(ns) == 1:
+        return "single_action"
+    if any(win_flags):
+        return "win_flag"
+    order = sorted(range(len(ns)), key=lambda i: (ns[i], ns_wins[i]), reverse=True)
+    leader, runner_up = order[0], order[1]
+    if ns[leader] - ns[runner_up] > remaining_steps * max_gain_per_step:
+        return "unreachable"
+    if z < float("inf") and ns[runner_up] > 0:
+        lower_leader = ns_wins[leader] / ns[leader] - 0.5 * z / ns[leader]**0.5
+        upper_runner_up = ns_wins[runner_up] / ns[runner_up] + 0.5 * z / ns[runner_up]**0.5
+        if lower_leader > upper_runner_up:
+            return "separated"
+    return None
+
+def remaining_steps_estimate(steps, elapsed, search_steps_limit, search_time_limit):
+    """Returns an estimate of the number of steps remaining within the computational budget (steps and time limits), given the number of steps done in ``elapsed`` seconds so far."""
+    remaining_steps = search_steps_limit - steps
+    if search_time_limit < float("inf"):
+        remaining_steps = min(remaining_steps, steps / elapsed * (search_time_limit - elapsed) if elapsed > 0.0 else float("inf"))
+    return max(remaining_steps, 0)
+
+def gain_per_step_estimate(n_trees, n_playouts, all_children=False, steps=0, n_root=0):
+    """Returns the number of visits gained by the root action chosen in a step (summed over ``n_trees`` trees): ``n_trees * n_playouts`` if one child of the selected leaf is played out,
+    the mean number of playouts per step so far (``n_root`` visits of the root in ``steps`` steps) if all children of the selected leaf are played out - each backed up through the root action chosen in the step."""
+    if not all_children or steps == 0:
+        return n_trees * n_playouts
+    return max(n_root / steps, n_trees * n_playouts)
+
+def saved_budget(steps, elapsed, search_steps_limit, search_time_limit):
+    """Returns the numbers of steps and seconds saved by stopping a search early after ``steps`` steps done in ``elapsed`` seconds (steps remaining within the budget are estimated as in ``remaining_steps_estimate``, time - as taking the mean time of a step done)."""
+    saved_steps = remaining_steps_estimate(steps, elapsed, search_steps_limit, search_time_limit)
+    saved_time = saved_steps * elapsed / steps if steps > 0 else 0.0
+    if saved_steps < float("inf"):
+        saved_steps = int(round(saved_steps))
+    return saved_steps, saved_time
+
+def step_cost_update(mean, deviation, cost, alpha):
+    """Returns running (exponentially weighted, with smoothing factor ``alpha``) estimates of the mean cost of a search step and of its mean absolute deviation, updated by the ``cost`` of the last step (``mean`` is ``None`` before the first step)."""
+    if mean is None:
+        return cost, 0.0
+    deviation += alpha * (abs(cost - mean) - deviation)
+    mean += alpha * (cost - mean)
+    return mean, deviation
+
+def overruns_info(overruns):
+    """Returns a dictionary with the number of moves (runs) and the last, median (p50), 99th percentile (p99) and maximum overruns of the deadline in milliseconds, given the list of overruns in seconds (negative if a run ended before the deadline)."""
+    ms_factor = 10.0**3
+    overruns_info = {}
+    overruns_info["moves"] = len(overruns)
+    overruns_info["overrun_[ms]"] = ms_factor * overruns[-1] if len(overruns) > 0 else np.nan
+    overruns_info["overrun_p50_[ms]"] = ms_factor * float(np.percentile(overruns, 50)) if len(overruns) > 0 else np.nan
+    overruns_info["overrun_p99_[ms]"] = ms_factor * float(np.percentile(overruns, 99)) if len(overruns) > 0 else np.nan
+    overruns_info["overrun_max_[ms]"] = ms_factor * max(overruns) if len(overruns) > 0 else np.nan
+    return overruns_info
+
+def search_snapshot(steps, playouts, elapsed, actions, ns, ns_wins, win_flags, top_k, best_action=None, final=False):
+    """
+    Returns a lightweight snapshot of a search - a dictionary with numbers of steps and playouts so far, elapsed time, the best root action (given as ``best_action`` or, if ``None``,
+    the first one in the order of win flags, visits counts ``ns`` and wins counts ``ns_wins`` - as in final decisions) and ``top_k`` root actions in that order (as tuples: action, n, q).
+    """
+    order = sorted(range(len(ns)), key=lambda i: (win_flags[i], ns[i], ns_wins[i]), reverse=True)[:top_k] # stable, ties kept in order of actions
+    if best_action is None and len(order) > 0:
+        best_action = actions[order[0]]
+    snapshot = {}
+    snapshot["steps"] = int(steps)
+    snapshot["playouts"] = int(playouts)
+    snapshot["time_[ms]"] = 10.0**3 * elapsed
+    snapshot["best_action"] = None if best_action is None else int(best_action)
+    snapshot["top_actions"] = [(int(actions[i]), int(ns[i]), ns_wins[i] / ns[i] if ns[i] > 0 else float("nan")) for i in order]
+    snapshot["final"] = final
+    return snapshot
+
 def pickle_objects(fname, some_list):
     """Pickles a list of objects to a binary file."""
     print(f"PICKLE OBJECTS... [to file: {fname}]")
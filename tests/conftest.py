@@ -0,0 +1,21 @@
+"""Common settings of tests - modules of the project (kept in ``src``) made importable with flat imports, as in ``main.py``."""
+
+import os
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def tree_states(root, expanded_only=False):
+    """Yields pairs ``(state, depth)`` for states of the tree rooted by ``root`` in breadth-first order (each state once, at its smallest depth, also when reached via transpositions); only states having children if ``expanded_only``."""
+    visited = {id(root)}
+    queue = deque([(root, 0)])
+    while queue:
+        state, depth = queue.popleft()
+        if not expanded_only or len(state.children) > 0:
+            yield state, depth
+        for child in state.children:
+            if id(child) not in visited:
+                visited.add(id(child))
+                queue.append((child, depth + 1))
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from mcts import MCTS, BoardArena
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+from conftest import tree_states
+
+
+@pytest.mark.parametrize("game_class, steps", [(C4, 1000), (Gomoku, 150), (Reversi, 500)])
+def test_tree_states_kept_in_own_rows_of_arena(game_class, steps):
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=steps, board_arena=True, seed=0, verbose_info=False)
+    ai.run(game_class())
+    states = [state for state, _ in tree_states(ai.root)]
+    assert all(state.arena is ai.arena for state in states)
+    assert len({state.board_index for state in states}) == len(states) == ai.tree_nodes_count # rows not shared
+    assert ai.arena.size - len(ai.arena.free_rows) == len(states) # no rows leaked
+    fields = game_class.BOARD_FIELDS
+    assert all(np.shares_memory(getattr(state, name), ai.arena.arrays[name]) for state in states for name in fields) # no per-state arrays
+    assert all(state.compute_zobrist_key() == state.zobrist_key for state in states) # rows hold boards of their states
+
+
+def test_arena_compacted_to_retained_tree_after_advance():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=1000, vanilla=False, board_arena=True, seed=0, verbose_info=False)
+    root = ai.advance(ai.run(C4()))
+    states = [state for state, _ in tree_states(root)]
+    assert ai.arena.size == len(states) and sorted(state.board_index for state in states) == list(range(len(states)))
+    ai.run(root)
+    assert all(state.compute_zobrist_key() == state.zobrist_key for state, _ in tree_states(ai.root))
+
+
+def test_arena_rows_recycled_and_preserved_when_grown():
+    arena = BoardArena(C4, initial_capacity=2)
+    rows = [arena.allocate() for _ in range(5)]
+    for k, row in enumerate(rows):
+        arena.arrays["board"][row] = k
+    assert arena.capacity >= 5 and all(np.all(arena.arrays["board"][row] == k) for k, row in enumerate(rows))
+    arena.free(rows[1])
+    row = arena.allocate(source_row=rows[3])
+    assert row == rows[1] and np.all(arena.arrays["board"][row] == 3)
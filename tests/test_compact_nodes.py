@@ -0,0 +1,40 @@
+import pickle
+import numpy as np
+import pytest
+from mcts import MCTS, State
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+
+
+@pytest.mark.parametrize("game_class", [C4, Gomoku, Reversi])
+def test_states_have_no_instance_dictionaries(game_class):
+    state = game_class()
+    child = state.take_action(int(state.legal_actions()[0]))
+    for s in (state, child):
+        assert not hasattr(s, "__dict__")
+        with pytest.raises(AttributeError):
+            s.undeclared_field = 0
+
+
+def test_leaves_share_immutable_empty_children():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=300, seed=0, verbose_info=False)
+    ai.run(C4())
+    stack, leaves = [ai.root], []
+    while stack:
+        state = stack.pop()
+        if len(state.children) == 0:
+            leaves.append(state)
+        stack.extend(state.children)
+    assert len(leaves) > 0 and all(leaf.children is State.NO_CHILDREN for leaf in leaves)
+    assert all(leaf.children_actions is State.NO_CHILDREN_ACTIONS for leaf in leaves)
+
+
+def test_pickled_tree_keeps_children_and_arrays():
+    state = C4()
+    state.expand()
+    copy = pickle.loads(pickle.dumps(state))
+    assert copy.children_actions.tolist() == state.children_actions.tolist()
+    assert [child.child_index for child in copy.children] == list(range(C4.N))
+    assert all(child.children is State.NO_CHILDREN for child in copy.children)
+    assert all(np.array_equal(child.board, original.board) for child, original in zip(copy.children, state.children))
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+from utils import early_stopping_reason, gain_per_step_estimate, remaining_steps_estimate, saved_budget
+
+
+def test_early_stopping_reasons():
+    assert early_stopping_reason([], [], [], 10, 1) is None
+    assert early_stopping_reason([5], [3], [False], 10, 1) == "single_action"
+    assert early_stopping_reason([5, 9], [3, 2], [True, False], 10, 1) == "win_flag"
+    assert early_stopping_reason([50, 20, 10], [30, 10, 5], [False] * 3, 29, 1) == "unreachable"
+    assert early_stopping_reason([50, 20, 10], [30, 10, 5], [False] * 3, 30, 1) is None
+    assert early_stopping_reason([50, 20, 10], [30, 10, 5], [False] * 3, 15, 2) is None
+    assert early_stopping_reason([400, 400], [360, 40], [False] * 2, np.inf, 1, z=3.0) == "separated"
+    assert early_stopping_reason([400, 400], [360, 40], [False] * 2, np.inf, 1) is None
+
+
+def test_remaining_steps_estimate():
+    assert remaining_steps_estimate(100, 1.0, 1000, np.inf) == 900
+    assert remaining_steps_estimate(100, 1.0, np.inf, 3.0) == pytest.approx(200)
+    assert remaining_steps_estimate(100, 1.0, 150, 3.0) == 50
+    assert remaining_steps_estimate(100, 1.0, np.inf, np.inf) == np.inf
+
+
+def test_all_children_playouts_can_stop_early():
+    assert gain_per_step_estimate(8, 128) == gain_per_step_estimate(8, 128, all_children=True) == 1024
+    n_root = 10 * 8 * 128 * 3 # 10 steps, leaves of 3 children on average played out in each of 8 trees
+    max_gain_per_step = gain_per_step_estimate(8, 128, all_children=True, steps=10, n_root=n_root)
+    assert max_gain_per_step == 3072
+    ns, ns_wins = [20000, 8000, 2720], [12000, 4000, 1000]
+    assert early_stopping_reason(ns, ns_wins, [False] * 3, 3, max_gain_per_step) == "unreachable"
+    assert early_stopping_reason(ns, ns_wins, [False] * 3, 3, 8 * 128 * 225) is None # bounded by all actions of a state (e.g., 225 in Gomoku) - never stops
+
+
+def test_saved_budget_finite_under_time_limit_only():
+    assert saved_budget(100, 1.0, np.inf, 3.0) == (200, pytest.approx(2.0))
+    assert saved_budget(100, 1.0, 1000, np.inf) == (900, pytest.approx(9.0))
+    assert saved_budget(0, 0.0, 1000, np.inf) == (1000, 0.0)
+
+
+def test_search_stops_early_with_same_best_action():
+    root = C4()
+    for action in [1, 0, 2, 0, 3]: # the only move not losing immediately is 4
+        root = root.take_action(action)
+    root.parent = None
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=20000, seed=0)
+    best_action = ai.run(root)
+    ai_early = MCTS(search_time_limit=np.inf, search_steps_limit=20000, early_stopping_interval=100, seed=0)
+    assert ai_early.run(root) == best_action
+    early_stopping_info = ai_early.performance_info["early_stopping"]
+    assert early_stopping_info["reason"] == "unreachable"
+    assert early_stopping_info["saved_steps"] == 20000 - ai_early.steps > 0
+    assert ai_early.steps % 100 == 0
+
+
+def test_saved_budget_reported_for_time_limited_search():
+    root = C4()
+    for action in [1, 0, 2, 0, 3]:
+        root = root.take_action(action)
+    root.parent = None
+    ai = MCTS(search_time_limit=5.0, search_steps_limit=np.inf, early_stopping_interval=100, seed=0)
+    assert ai.run(root) == 4
+    early_stopping_info = ai.performance_info["early_stopping"]
+    assert early_stopping_info["reason"] is not None
+    assert 0 < early_stopping_info["saved_steps"] < np.inf and isinstance(early_stopping_info["saved_steps"], int)
+    assert 0.0 < early_stopping_info["saved_time_[ms]"] <= 5000.0
+
+
+def test_no_early_stop_when_reproducing_or_disabled():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=np.inf, early_stopping_interval=10, early_stopping_z=0.0, seed=0)
+    ai.run(C4(), forced_search_steps_limit=500)
+    assert ai.steps == 500 and ai.performance_info["early_stopping"]["reason"] is None
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=500, seed=0)
+    ai.run(C4())
+    assert "early_stopping" not in ai.performance_info
@@ -0,0 +1,53 @@
+import gc
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+from reversi import Reversi
+from conftest import tree_states
+
+
+@pytest.mark.parametrize("params", [{}, {"lazy_expansion": True}, {"n_playouts": 4}])
+def test_gc_aware_run_keeps_collector_away_and_restores_it(params):
+    n_callbacks = len(gc.callbacks)
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=1000, gc_aware=True, seed=0, **params)
+    ai.run(C4())
+    assert ai.performance_info["gc"]["collections"] == 0 # collector disabled during the run
+    assert all(state.parent is None for state, _ in tree_states(ai.root)) # tree acyclic
+    assert gc.isenabled() and len(gc.callbacks) == n_callbacks
+    gc.disable()
+    try:
+        ai.run(C4())
+        assert not gc.isenabled() # collector disabled before the run stays disabled
+    finally:
+        gc.enable()
+
+
+def test_collector_untouched_without_gc_aware_mode_or_when_taken_by_another_run():
+    n_callbacks = len(gc.callbacks)
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=100, seed=0)
+    for _ in ai.run_iter(C4(), snapshot_steps=10):
+        assert len(gc.callbacks) == n_callbacks
+    assert "gc" not in ai.performance_info
+    ai_gc = MCTS(search_time_limit=np.inf, search_steps_limit=100, gc_aware=True, seed=0)
+    with MCTS.GC_AWARE_LOCK: # GC-aware run of another instance in progress
+        for _ in ai_gc.run_iter(C4(), snapshot_steps=10):
+            assert gc.isenabled() and len(gc.callbacks) == n_callbacks
+    assert "gc" not in ai_gc.performance_info
+    ai_gc.run(C4())
+    assert "gc" in ai_gc.performance_info
+
+
+def test_discarded_trees_are_freed_by_reference_counting():
+    gc.disable() # no automatic collections, so that cyclic garbage of the standard mode is left for the explicit one
+    try:
+        for gc_aware in [False, True]:
+            ai = MCTS(search_time_limit=np.inf, search_steps_limit=500, gc_aware=gc_aware, seed=0, verbose_info=False)
+            gc.collect() # garbage left by the previous iteration
+            ai.run(Reversi())
+            ai.run(Reversi()) # vanilla run - previous tree discarded
+            gc.unfreeze()
+            n_unreachable = gc.collect()
+            assert (n_unreachable == 0) == gc_aware
+    finally:
+        gc.enable()
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+import mcts
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+from utils import step_cost_update, overruns_info
+
+TICK = 1e-6 # [s]
+
+
+class _TickingClock:
+    """Clock advancing by ``TICK`` at each reading, so that time taken by searches is measured in readings (independent of the machine)."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        self.now += TICK
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _TickingClock()
+    monkeypatch.setattr(mcts, "time", clock)
+    return clock
+
+
+def test_step_cost_update_and_overruns_info():
+    mean, deviation = step_cost_update(None, 0.0, 0.01, 0.1)
+    assert mean == 0.01 and deviation == 0.0
+    mean, deviation = step_cost_update(mean, deviation, 0.02, 0.1)
+    assert mean == pytest.approx(0.011) and deviation == pytest.approx(0.001)
+    info = overruns_info([0.001, -0.002, 0.003])
+    assert info["moves"] == 3 and info["overrun_[ms]"] == pytest.approx(3.0) and info["overrun_max_[ms]"] == pytest.approx(3.0)
+    assert info["overrun_p50_[ms]"] == pytest.approx(1.0)
+    assert np.isnan(overruns_info([])["overrun_p99_[ms]"])
+
+
+def test_deadline_reported_per_move_and_shown_in_str(clock):
+    ai = MCTS(search_time_limit=2000 * TICK, search_steps_limit=np.inf, hard_deadline=True, seed=0)
+    assert "hard_deadline=True" in str(ai)
+    assert "hard_deadline" not in str(MCTS(seed=0))
+    game = C4()
+    for _ in range(3):
+        action = ai.run(game)
+        game = game.take_action(action)
+    deadline_info = ai.performance_info["deadline"]
+    assert deadline_info["moves"] == 3 and len(ai.deadline_overruns) == 3
+    assert deadline_info["step_cost_estimate_[ms]"] > 0.0
+    assert deadline_info["refused_steps"] + deadline_info["aborted_steps"] == 1 # last step of the move either refused or aborted
+    assert all(overrun < 6 * TICK for overrun in ai.deadline_overruns)
+    ai_plain = MCTS(search_time_limit=2000 * TICK, seed=0)
+    ai_plain.run(C4())
+    assert "deadline" not in ai_plain.performance_info and len(ai_plain.deadline_overruns) == 0
+
+
+@pytest.mark.parametrize("game_class, board_arena", [(C4, False), (Gomoku, False), (Gomoku, True)])
+def test_steps_aborted_at_deadline_in_expansion_or_playout(clock, game_class, board_arena):
+    aborted = 0
+    for limit in range(1500, 4000, 97): # deadlines falling into various stages of steps
+        ai = MCTS(search_time_limit=limit * TICK, search_steps_limit=np.inf, board_arena=board_arena, hard_deadline=True, seed=0, verbose_info=False)
+        ai.STEP_COST_MARGIN = -1e9 # never refuse, every step past the first is started
+        ai.run(game_class())
+        assert ai.steps >= 1 and ai.refused_steps == 0 and ai.aborted_steps <= 1
+        assert ai.deadline_overruns[-1] < 6 * TICK # a few clock readings past the deadline, not a remainder of a step
+        assert ai.root.n == ai.steps and sum(child.n for child in ai.root.children) == ai.root.n # aborted step not backed up
+        if board_arena:
+            assert ai.arena.size - len(ai.arena.free_rows) == ai.tree_nodes_count # rows of abandoned children released
+        aborted += ai.aborted_steps
+    assert aborted > 0
+
+
+def test_expansion_abandoned_at_deadline_adds_no_children(clock):
+    state = Gomoku()
+    assert not state.expand(deadline=clock.now + 100 * TICK)
+    assert len(state.children) == 0
+    assert state.expand() and len(state.children) == Gomoku.M * Gomoku.N
+
+
+def test_forced_steps_ignore_deadline():
+    ai = MCTS(search_time_limit=0.001, search_steps_limit=np.inf, hard_deadline=True, seed=0)
+    ai.run(C4(), forced_search_steps_limit=300)
+    assert ai.steps == 300 and ai.performance_info["deadline"]["refused_steps"] == 0 and len(ai.deadline_overruns) == 0
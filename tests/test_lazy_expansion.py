@@ -0,0 +1,27 @@
+import numpy as np
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+
+
+def test_root_children_materialized_one_per_step():
+    for steps in (3, 7, 50):
+        ai = MCTS(search_time_limit=np.inf, search_steps_limit=steps, lazy_expansion=True, seed=0, verbose_info=False)
+        ai.run(C4())
+        assert len(ai.root.children) == min(steps, C4.N)
+        assert len(ai.root.untried_actions) == max(C4.N - steps, 0)
+        assert sorted(ai.root.children_actions.tolist() + ai.root.untried_actions) == list(range(C4.N))
+
+
+def test_each_step_adds_single_node():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=200, lazy_expansion=True, seed=0)
+    ai.run(Gomoku())
+    assert ai.performance_info["tree"]["size"] == 201
+
+
+def test_lazy_search_finds_immediate_win():
+    state = C4()
+    for action in [0, 1, 0, 1, 0, 1]: # black to move, column 0 wins
+        state = state.take_action(action)
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=500, lazy_expansion=True, seed=0, verbose_info=False)
+    assert ai.run(state) == 0
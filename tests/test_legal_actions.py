@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from mcts import State
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+
+
+def _random_positions(game_class, n_games=5):
+    np.random.seed(0)
+    for _ in range(n_games):
+        state = game_class()
+        while state.compute_outcome() is None:
+            yield state
+            state = state.take_action(int(np.random.choice(state.legal_actions())))
+
+
+@pytest.mark.parametrize("game_class", [C4, Gomoku, Reversi])
+def test_native_masks_equal_masks_found_by_trial(game_class):
+    for i, state in enumerate(_random_positions(game_class)):
+        if game_class is Gomoku and i % 10 != 0: # trial masks of Gomoku slow (225 copies per position)
+            continue
+        mask = state.legal_actions_mask()
+        assert mask.dtype == np.bool_ and mask.size == game_class.get_max_actions()
+        assert np.array_equal(mask, State.legal_actions_mask(state))
+
+
+@pytest.mark.parametrize("game_class", [C4, Gomoku, Reversi])
+def test_expand_creates_children_for_legal_actions_only(game_class):
+    for state in list(_random_positions(game_class, n_games=1))[::5]:
+        state = state._detached_copy() # positions of the game already have the child taken next
+        state.expand()
+        assert state.children_actions.tolist() == np.flatnonzero(state.legal_actions_mask()).tolist()
+        assert [child.last_action_index for child in state.children] == state.children_actions.tolist()
+
+
+def test_full_column_illegal_in_c4():
+    state = C4()
+    for _ in range(C4.M):
+        state = state.take_action(3)
+    assert not state.legal_actions_mask()[3] and state.legal_actions_mask().sum() == C4.N - 1
+    assert state.take_action(3) is None
+
+
+def test_pass_legal_alongside_moves_in_reversi():
+    state = Reversi()
+    assert state.legal_actions().tolist() == [20, 29, 34, 43, Reversi.M * Reversi.N] # as in take_action_job (results of former experiments reproduced)
+    assert state.random_playout_action() != Reversi.M * Reversi.N # playouts pass only when no other action is legal
@@ -0,0 +1,94 @@
+import threading
+import tracemalloc
+import numpy as np
+import pytest
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+
+
+def _arrays(state):
+    extra_info = state.get_extra_info()
+    return [np.copy(state.get_board())] + ([] if extra_info is None else [np.copy(extra_info)])
+
+
+def _legal_actions(state):
+    return [action for action in range(state.get_max_actions()) if type(state)(state).take_action_job(action)]
+
+
+@pytest.mark.parametrize("game_class", [C4, Gomoku, Reversi])
+def test_make_moves_follow_take_action_and_unmake_restores_state(game_class):
+    np.random.seed(0)
+    for _ in range(10):
+        state = game_class()
+        for _ in range(np.random.randint(6)): # random starting position
+            state = state.take_action(int(np.random.choice(_legal_actions(state))))
+        scratch = state._make_scratch()
+        scratch.copy_from(state)
+        original = (_arrays(scratch), scratch.turn, scratch.last_action_index, scratch.zobrist_key)
+        reference = state
+        n_moves = 0
+        while reference.compute_outcome() is None:
+            action_index = scratch.random_playout_action()
+            assert action_index in _legal_actions(reference)
+            scratch.make_move(action_index)
+            reference = reference.take_action(action_index)
+            n_moves += 1
+            assert all(np.array_equal(a, b) for a, b in zip(_arrays(scratch), _arrays(reference)))
+            assert scratch.turn == reference.turn and scratch.compute_outcome() == reference.compute_outcome()
+        for _ in range(n_moves):
+            scratch.unmake_move()
+        assert all(np.array_equal(a, b) for a, b in zip(_arrays(scratch), original[0]))
+        assert (scratch.turn, scratch.last_action_index, scratch.zobrist_key) == original[1:]
+        assert scratch.compute_zobrist_key() == state.zobrist_key
+
+
+def test_random_playout_action_passes_only_when_no_move_in_reversi():
+    state = Reversi()
+    state.board[:, :] = 0
+    state.board[0, 0] = 1 # lone pawn - no move for either player
+    state.board[7, 7] = -1
+    assert state.random_playout_action() == Reversi.M * Reversi.N
+    assert state.legal_actions().tolist() == [Reversi.M * Reversi.N]
+
+
+@pytest.mark.parametrize("game_class", [C4, Gomoku])
+def test_random_playout_action_uniform_over_legal_actions(game_class):
+    np.random.seed(0)
+    state = game_class().take_action(0)
+    counts = np.bincount([state.random_playout_action() for _ in range(20000)], minlength=game_class.get_max_actions())
+    legal = np.isin(np.arange(game_class.get_max_actions()), _legal_actions(state))
+    assert np.all(counts[~legal] == 0)
+    expected = 20000 / np.sum(legal)
+    assert np.all(np.abs(counts[legal] - expected) < 5 * np.sqrt(expected))
+
+
+def test_playout_actions_buffer_separate_for_each_thread():
+    buffers = []
+    thread = threading.Thread(target=lambda: buffers.append(C4.PLAYOUT_ACTIONS.actions))
+    thread.start()
+    thread.join()
+    assert buffers[0] is not C4.PLAYOUT_ACTIONS.actions and buffers[0].size == C4.N
+
+
+def test_reversi_moves_in_place_do_not_allocate_undo_information():
+    np.random.seed(0)
+    state = Reversi()
+    scratch = state._make_scratch()
+    for k in range(2): # first playout warms up (compilation, buffers of moves stack)
+        scratch.copy_from(state)
+        if k == 1:
+            tracemalloc.start()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        n_moves = 0
+        while scratch.compute_outcome() is None:
+            scratch.make_move(scratch.random_playout_action())
+            n_moves += 1
+        if k == 1:
+            memory_after_moves = tracemalloc.get_traced_memory()[0]
+        for _ in range(n_moves):
+            scratch.unmake_move()
+    tracemalloc.stop()
+    assert n_moves > 50
+    assert memory_after_moves - memory_before < 48 * n_moves # undo information kept in preallocated buffers (stack holds only last actions)
+    assert np.array_equal(scratch.board, state.board)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import mcts
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+
+
+def _c4_win_in_one():
+    state = C4()
+    for action in [0, 1, 0, 1, 0, 1]: # black to move, column 0 wins
+        state = state.take_action(action)
+    return state
+
+
+@pytest.mark.parametrize("game_class", [C4, Gomoku])
+def test_each_step_backs_up_all_playouts(game_class):
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=50, n_playouts=16, seed=0)
+    ai.run(game_class())
+    assert ai.performance_info["steps"] == 50
+    assert ai.root.n == ai.performance_info["playouts"] == 50 * 16
+    assert sum(child.n for child in ai.root.children) == ai.root.n
+    assert all(child.n % 16 == 0 and 0 <= child.n_wins <= child.n for child in ai.root.children)
+
+
+def test_leaf_parallel_search_finds_immediate_win():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=200, n_playouts=8, seed=0, verbose_info=False)
+    assert ai.run(_c4_win_in_one()) == 0
+    win = ai.root.get_child(0)
+    assert win.n_wins == win.n # terminal win counted for every playout
+
+
+def test_string_of_default_instance_unchanged_and_new_parameters_listed_when_not_default():
+    assert str(MCTS()) == "MCTS(search_time_limit=5.0, search_steps_limit=inf, vanilla=True, ucb_c=2.0, seed: 0)" # experiments hashed by this string
+    assert str(MCTS(n_playouts=8)) == "MCTS(search_time_limit=5.0, search_steps_limit=inf, vanilla=True, ucb_c=2.0, seed: 0, n_playouts=8)"
+
+
+def test_leaf_parallel_search_is_reproducible_for_equal_seeds():
+    results = []
+    for _ in range(2):
+        ai = MCTS(search_time_limit=np.inf, search_steps_limit=30, n_playouts=16, seed=0, verbose_info=False)
+        ai.run(Gomoku())
+        results.append((ai.root.children_ns.tolist(), ai.root.children_ns_wins.tolist()))
+    assert results[0] == results[1]
+
+
+def test_leaf_parallel_search_independent_of_number_of_cores(monkeypatch):
+    results = []
+    for n_cores in [1, 3, 16]:
+        monkeypatch.setattr(mcts.os, "cpu_count", lambda: n_cores)
+        ai = MCTS(search_time_limit=np.inf, search_steps_limit=30, n_playouts=16, seed=0, verbose_info=False)
+        ai.run(C4())
+        results.append((ai.best_action, ai.root.children_ns.tolist(), ai.root.children_ns_wins.tolist()))
+    assert results[0] == results[1] == results[2]
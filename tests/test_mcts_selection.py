@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+from conftest import tree_states
+
+
+@pytest.mark.parametrize("game_class, steps", [(C4, 1000), (Gomoku, 200)])
+def test_children_arrays_mirror_children_after_search(game_class, steps):
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=steps, seed=0, verbose_info=False)
+    ai.run(game_class())
+    for state, _ in tree_states(ai.root, expanded_only=True):
+        children = state.children
+        assert state.children_actions.tolist() == [child.last_action_index for child in children]
+        assert state.children_ns.tolist() == [child.n for child in children]
+        assert state.children_ns_wins.tolist() == [child.n_wins for child in children]
+        assert [child.child_index for child in children] == list(range(len(children)))
+
+
+def test_vectorized_ucb_selection_matches_scalar_formula():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=1000, ucb_c=1.5, seed=0, verbose_info=False)
+    ai.run(C4())
+    for state, _ in tree_states(ai.root, expanded_only=True):
+        best_index, best_ucb = None, -1.0
+        for i, child in enumerate(state.children):
+            ucb = child.n_wins / child.n + ai.ucb_c * np.sqrt(np.log(state.n) / child.n) if child.n > 0 else np.inf
+            if ucb > best_ucb:
+                best_index, best_ucb = i, ucb
+        assert ai._best_child_index_ucb(state) == best_index
+
+
+def test_children_found_by_action_and_arrays_kept_in_sync_by_take_action():
+    state = C4()
+    child = state.take_action(3)
+    assert state.get_child(3) is child and state.get_child(2) is None
+    assert state.take_action(2) is state.children[1]
+    assert state.take_action(3) is child and len(state.children) == 2
+    assert state.children_actions.tolist() == [3, 2]
+    assert state.children_ns.tolist() == state.children_ns_wins.tolist() == [0, 0]
+    assert [child.child_index for child in state.children] == [0, 1]
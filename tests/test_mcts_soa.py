@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from mcts_soa import MCTSSoA
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+
+
+@pytest.mark.parametrize("game_class, steps", [(C4, 500), (Gomoku, 100), (Reversi, 300)])
+def test_soa_search_equals_object_tree_search(game_class, steps):
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=steps, vanilla=True, seed=0) # generator seeded by constructors, hence runs follow them
+    best_action = ai.run(game_class())
+    ai_soa = MCTSSoA(search_time_limit=np.inf, search_steps_limit=steps, seed=0)
+    assert ai_soa.run(game_class()) == best_action
+    assert ai_soa.actions_info["best"]["n"] == ai.actions_info["best"]["n"]
+    assert ai_soa.actions_info["best"]["n_wins"] == ai.actions_info["best"]["n_wins"]
+    assert ai_soa.performance_info["playouts"] == ai.performance_info["playouts"] == steps
+    assert ai_soa.performance_info["tree"]["size"] == ai.performance_info["tree"]["size"]
+
+
+def test_soa_tree_arrays_grow_and_stay_consistent():
+    ai = MCTSSoA(search_time_limit=np.inf, search_steps_limit=300, initial_tree_capacity=16, seed=0, verbose_info=False)
+    ai.run(C4())
+    size = ai.tree_size
+    assert ai.tree_capacity >= size > 16
+    parents = ai.tree_parents[1:size]
+    assert np.all(ai.tree_depths[1:size] == ai.tree_depths[parents] + 1)
+    assert np.all(ai.tree_turns[1:size] == -ai.tree_turns[parents])
+    assert ai.tree_ns[0] == 300
+    for node in np.flatnonzero(ai.tree_n_children[:size] > 0):
+        first = ai.tree_first_children[node]
+        children = slice(first, first + ai.tree_n_children[node])
+        assert np.all(ai.tree_parents[children] == node)
+        assert ai.tree_ns[node] - ai.tree_ns[children].sum() in ((0,) if node == 0 else (0, 1)) # playout from the node itself (if any) took place before its expansion
@@ -0,0 +1,47 @@
+import numpy as np
+from mcts import MCTS
+from c4 import C4
+
+
+def _subtree_states(root):
+    stack = [root]
+    while stack:
+        state = stack.pop()
+        yield state
+        stack.extend(state.children)
+
+
+def test_advance_reroots_tree_and_next_run_reuses_subtree():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=2000, vanilla=False, seed=0)
+    best_action = ai.run(C4())
+    played = ai.root.get_child(best_action)
+    retained = max(played.children, key=lambda child: child.n)
+    reply = int(played.children_actions[retained.child_index])
+    ai.advance(best_action)
+    assert ai.advance(reply) is retained and ai.root is retained
+    assert retained.parent is None and retained.n > 0
+    n_retained = retained.n
+    ai.run(retained)
+    assert ai.performance_info["tree"]["initial_n_root"] == n_retained
+    assert ai.root.n == n_retained + 2000
+
+
+def test_advance_trims_retained_subtree_to_size_limit():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=3000, vanilla=False, seed=0)
+    best_action = ai.run(C4())
+    root = ai.advance(best_action, tree_size_limit=50)
+    states = list(_subtree_states(root))
+    assert len(states) <= 50
+    assert all(len(state.children) in (0, len(state.legal_actions())) for state in states) # child sets kept whole
+    ai.run(root)
+    assert ai.performance_info["tree"]["initial_size"] == len(states)
+
+
+def test_advance_with_no_tree_or_illegal_action():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=100, vanilla=False, seed=0, verbose_info=False)
+    assert ai.advance(0) is None
+    state = C4()
+    for _ in range(C4.M):
+        state = state.take_action(0) # column 0 full
+    ai.run(state)
+    assert ai.advance(0) is None
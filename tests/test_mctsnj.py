@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+import mctsnj_game_mechanics as mechanics
+from mctsnj import MCTSNJ
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+
+
+def _compiled_arrays(state):
+    extra_info = state.get_extra_info()
+    extra_info = np.zeros(1, dtype=np.int8) if extra_info is None else extra_info.astype(np.int8)
+    return np.array(state.get_board(), dtype=np.int8), extra_info
+
+
+def _legal_actions(state):
+    actions = [action for action in range(state.get_max_actions()) if type(state)(state).take_action_job(action)]
+    if isinstance(state, Reversi) and len(actions) > 1: # compiled mechanics pass only when no other action is legal
+        actions.remove(state.get_max_actions() - 1)
+    return actions
+
+
+@pytest.mark.parametrize("game_class", [C4, Gomoku, Reversi])
+def test_compiled_mechanics_agree_with_state_classes(game_class):
+    game = mechanics.game_code(game_class)
+    np.random.seed(0)
+    actions = np.empty(game_class.get_max_actions(), dtype=np.int16)
+    for _ in range(20):
+        state = game_class()
+        board, extra_info = _compiled_arrays(state)
+        last_action = -1
+        while True:
+            outcome = state.compute_outcome()
+            assert mechanics.compute_outcome(game, board, extra_info, state.turn, last_action) == (mechanics.OUTCOME_ONGOING if outcome is None else outcome)
+            if outcome is not None:
+                break
+            count = mechanics.legal_actions(game, board, extra_info, state.turn, actions)
+            assert sorted(actions[:count].tolist()) == _legal_actions(state)
+            last_action = int(actions[np.random.randint(count)])
+            mechanics.take_action(game, board, extra_info, state.turn, last_action)
+            state = state.take_action(last_action)
+            assert np.array_equal(board, state.get_board())
+            if game_class is Reversi: # pawns counts kept up to date
+                assert np.array_equal(extra_info, state.get_extra_info())
+
+
+def test_compiled_and_state_outcomes_agree_after_voluntary_pass_in_reversi():
+    state = Reversi()
+    state.board[:] = 0
+    state.board[0, 0], state.board[0, 1] = 1, -1 # only player 1 has a move (at 0, 2)
+    state = state.take_action(Reversi.M * Reversi.N) # player 1 passes (legal alongside moves)
+    assert state.turn == -1 and state.compute_outcome() is None
+    board, extra_info = _compiled_arrays(state)
+    game = mechanics.game_code(Reversi)
+    assert mechanics.compute_outcome(game, board, extra_info, state.turn, Reversi.M * Reversi.N) == mechanics.OUTCOME_ONGOING
+
+
+def test_playouts_leave_arrays_unchanged_and_return_outcomes():
+    state = C4()
+    board, extra_info = _compiled_arrays(state)
+    board_copy, extra_info_copy = board.copy(), extra_info.copy()
+    outcomes = np.full(256, mechanics.OUTCOME_ONGOING, dtype=np.int8)
+    mechanics.playouts(mechanics.GAME_C4, board, extra_info, state.turn, -1, outcomes)
+    assert np.array_equal(board, board_copy) and np.array_equal(extra_info, extra_info_copy)
+    assert set(outcomes.tolist()) <= {-1, 0, 1}
+
+
+def _c4_win_in_one():
+    state = C4()
+    for action in [0, 1, 0, 1, 0, 1]: # black to move, column 0 wins
+        state = state.take_action(action)
+    return state
+
+
+def test_mctsnj_finds_immediate_win_and_counts_visits():
+    ai = MCTSNJ(search_time_limit=np.inf, search_steps_limit=2000, seed=0)
+    assert ai.run(_c4_win_in_one()) == 0
+    assert ai.performance_info["steps"] == ai.performance_info["playouts"] == ai.tree_ns[0] == 2000
+    size = ai.tree_size
+    assert np.all(ai.tree_depths[1:size] == ai.tree_depths[ai.tree_parents[1:size]] + 1)
+
+
+def test_mctsnj_is_reproducible_for_equal_seeds():
+    results = []
+    for _ in range(2):
+        ai = MCTSNJ(search_time_limit=np.inf, search_steps_limit=1000, seed=5, verbose_info=False)
+        results.append((ai.run(Gomoku()), ai.actions_info["best"]["n"], ai.tree_size))
+    assert results[0] == results[1]
+
+
+def test_tree_parallel_search_keeps_statistics_consistent():
+    ai = MCTSNJ(search_time_limit=np.inf, search_steps_limit=4000, n_threads=4, virtual_loss=3, seed=0)
+    ai.run(C4())
+    size = ai.tree_size
+    assert ai.performance_info["steps"] == sum(ai.performance_info["threads_steps"]) == ai.tree_ns[0] == 4000 # virtual losses all taken back
+    assert np.all(ai.tree_ns[:size] >= 0) and np.all(ai.tree_ns_wins[:size] <= ai.tree_ns[:size])
+    for node in np.flatnonzero(ai.tree_n_children[:size] > 0):
+        first = ai.tree_first_children[node]
+        children = slice(first, first + ai.tree_n_children[node])
+        assert np.all(ai.tree_parents[children] == node)
+        assert ai.tree_ns[node] >= ai.tree_ns[children].sum() # concurrent descents may play out from a leaf claimed for expansion by another thread
+    ai.close()
+
+
+def test_tree_parallel_search_finds_immediate_win():
+    ai = MCTSNJ(search_time_limit=np.inf, search_steps_limit=2000, n_threads=4, seed=0, verbose_info=False)
+    assert ai.run(_c4_win_in_one()) == 0
+    ai.close()
+
+
+def test_close_shuts_down_thread_pool_and_instance_stays_usable():
+    ai = MCTSNJ(search_time_limit=np.inf, search_steps_limit=500, n_threads=2, seed=0, verbose_info=False)
+    ai.run(C4())
+    executor = ai.threads_executor
+    ai.close()
+    assert ai.threads_executor is None and executor._shutdown
+    ai.run(C4())
+    assert ai.threads_executor is not None and ai.tree_ns[0] == 500
+    ai.close()
+
+
+@pytest.mark.parametrize("n_threads", [1, 2])
+def test_descents_stop_at_maximum_depth_of_paths(n_threads):
+    ai = MCTSNJ(search_time_limit=np.inf, search_steps_limit=3000, n_threads=n_threads, seed=0, verbose_info=False)
+    ai.MAX_TREE_DEPTH = 3 # paths of at most 5 nodes (root, 3 selected, 1 expanded)
+    ai.run(C4())
+    size = ai.tree_size
+    assert ai.tree_ns[0] == 3000 and ai.tree_depths[:size].max() == ai.MAX_TREE_DEPTH + 1
+    ai.close()
+
+
+def test_invalid_number_of_threads_corrected():
+    assert MCTSNJ(n_threads=0, verbose_info=False).n_threads == 1
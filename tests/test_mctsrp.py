@@ -0,0 +1,56 @@
+import multiprocessing
+import numpy as np
+import pytest
+from mcts import MCTS
+from mctsrp import MCTSRP
+from c4 import C4
+
+
+@pytest.fixture
+def ai_rp():
+    ai = MCTSRP(search_time_limit=np.inf, search_steps_limit=400, n_workers=2, seed=0)
+    yield ai
+    ai.close()
+
+
+def test_root_statistics_are_sums_over_independent_trees(ai_rp):
+    ai_rp.run(C4())
+    expected = {}
+    for i in range(2): # worker i searches as MCTS seeded with seed + i
+        ai = MCTS(search_time_limit=np.inf, search_steps_limit=400, vanilla=True, seed=i, verbose_info=False)
+        ai.run(C4())
+        for key, child in zip(ai.root.children_actions.tolist(), ai.root.children):
+            n, n_wins = expected.get(key, (0, 0))
+            expected[key] = (n + child.n, n_wins + child.n_wins)
+    assert {key: (entry["n"], entry["n_wins"]) for key, entry in ai_rp.actions_info.items() if key != "best"} == expected
+    assert ai_rp.performance_info["steps"] == ai_rp.performance_info["playouts"] == 800
+    assert ai_rp.performance_info["trees"]["count"] == 2
+
+
+def test_forced_steps_limit_split_among_workers_and_workers_restarted(ai_rp):
+    ai_rp.run(C4(), forced_search_steps_limit=301)
+    assert ai_rp.root.n == 301
+    ai_rp.close()
+    assert ai_rp.workers is None
+    state = C4()
+    for action in [0, 1, 0, 1, 0, 1]: # black to move, column 0 wins
+        state = state.take_action(action)
+    assert ai_rp.run(state) == 0
+
+
+class _FailingC4(C4):
+    def take_action_job(self, action_index):
+        raise ValueError("broken game mechanics")
+
+
+def test_failure_of_worker_search_raised_in_main_process(ai_rp):
+    with pytest.raises(RuntimeError, match="broken game mechanics"):
+        ai_rp.run(_FailingC4())
+    assert ai_rp.workers is None # pool terminated, started again at the next run
+    ai_rp.run(C4())
+    assert ai_rp.performance_info["steps"] == 800
+
+
+def test_number_of_workers_defaults_to_cpu_count():
+    assert MCTSRP.DEFAULT_N_WORKERS is None
+    assert MCTSRP(verbose_info=False).n_workers == multiprocessing.cpu_count()
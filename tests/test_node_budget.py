@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+from conftest import tree_states
+
+
+@pytest.mark.parametrize("game_class, params", [(C4, {}), (Gomoku, {}), (C4, {"lazy_expansion": True}), (C4, {"board_arena": True}), (C4, {"transposition_table_size": 2**12})])
+def test_tree_never_exceeds_node_budget(game_class, params):
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=1000, max_nodes=500, seed=0, **params)
+    ai.run(game_class())
+    states = [state for state, _ in tree_states(ai.root)]
+    assert ai._tree_stats()[0] == len(states) <= 500
+    pruning_info = ai.performance_info["pruning"]
+    assert pruning_info["events"] > 0 and pruning_info["reclaimed_nodes"] > 0
+    assert ai.root.n == 1000 # statistics of collapsed subtrees are kept
+    assert sum(child.n for child in ai.root.children) == 1000
+
+
+def test_pruned_nodes_are_least_visited_and_reexpandable():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=3000, max_nodes=500, seed=0)
+    best_action = ai.run(C4())
+    assert ai.performance_info["pruning"]["events"] > 0
+    best_child = ai.root.get_child(best_action)
+    assert len(best_child.children) > 0 # most visited branch survives pruning
+    leaves = [state for state, _ in tree_states(ai.root) if len(state.children) == 0 and state.compute_outcome() is None]
+    assert any(leaf.n > 1 for leaf in leaves) # collapsed subtrees keep their aggregate counts
+
+
+def test_no_pruning_info_without_budget():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=100, seed=0)
+    ai.run(C4())
+    assert "pruning" not in ai.performance_info
+    assert "max_nodes" not in str(ai)
@@ -0,0 +1,97 @@
+import time
+import numpy as np
+import pytest
+from mcts import MCTS
+from mcts_soa import MCTSSoA
+from c4 import C4
+from game_runner import GameRunner
+
+
+def test_pondered_statistics_kept_and_reported_by_next_run():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=500, vanilla=False, seed=0)
+    best_action = ai.run(C4())
+    state = ai.ponder_start(best_action)
+    assert state is not ai.root and state.parent is None and len(state.children) == 0
+    assert np.array_equal(state.board, ai.root.board) and state.turn == ai.root.turn
+    time.sleep(0.3)
+    ai.ponder_stop_event.set()
+    ai.ponder_thread.join()
+    reply = int(ai.root.children_actions[np.argmax(ai.root.children_ns)])
+    n_reply = int(np.max(ai.root.children_ns))
+    root = ai.ponder_stop(reply)
+    assert ai.ponder_thread is None and root is ai.root and n_reply > 0
+    ai.run(root)
+    pondering_info = ai.performance_info["pondering"]
+    assert pondering_info["steps"] > 0 and pondering_info["hit"] and pondering_info["n_root_kept"] == n_reply
+    assert ai.performance_info["tree"]["initial_n_root"] == n_reply
+    assert ai.performance_info["steps"] == 500 and ai.root.n == n_reply + 500
+    ai.run(ai.advance(ai.best_action))
+    assert "pondering" not in ai.performance_info
+
+
+def test_pondering_steps_limit_and_stop_without_action():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=200, vanilla=False, seed=0)
+    best_action = ai.run(C4())
+    n_child = ai.root.get_child(best_action).n
+    ai.ponder_start(best_action, steps_limit=100)
+    ai.ponder_thread.join()
+    assert ai.ponder_steps == 100 and ai.root.n == n_child + 100
+    n_root = ai.root.n
+    assert ai.ponder_stop() is None and ai.root.n == n_root # pondering stopped, root kept
+
+
+@pytest.mark.parametrize("ai", [MCTS(search_time_limit=np.inf, search_steps_limit=100, vanilla=True, seed=0), MCTSSoA(search_time_limit=np.inf, search_steps_limit=100, seed=0)])
+def test_pondering_not_started_when_nothing_would_be_kept(ai):
+    best_action = ai.run(C4())
+    assert ai.ponder_start(best_action) is None and ai.ponder_thread is None
+
+
+def test_pondering_draws_from_own_generator_only():
+    results = []
+    for _ in range(2):
+        ai = MCTS(search_time_limit=np.inf, search_steps_limit=200, vanilla=False, seed=0)
+        best_action = ai.run(C4())
+        global_state = np.random.get_state()[1].copy()
+        ai.ponder_start(best_action, steps_limit=300)
+        ai.ponder_thread.join()
+        assert np.array_equal(np.random.get_state()[1], global_state) # global generator (drawn by searches, also of the opponent) untouched
+        results.append((ai.root.children_ns.tolist(), ai.root.children_ns_wins.tolist()))
+        ai.ponder_stop()
+    assert results[0] == results[1] # pondering of a given number of steps reproducible for equal seeds
+
+
+def test_game_runner_with_pondering_plays_legal_moves_and_reuses_trees():
+    black_ai = MCTS(search_time_limit=np.inf, search_steps_limit=300, vanilla=False, seed=0)
+    white_ai = MCTS(search_time_limit=np.inf, search_steps_limit=300, vanilla=False, seed=1)
+    runner = GameRunner(C4, black_ai, white_ai, 1, 1, ponder=True) # verbose info on (performance info gathered by the runner)
+    outcome, game_info = runner.run()
+    assert outcome in (-1, 0, 1) and game_info["outcome"] == outcome
+    assert black_ai.ponder_thread is None and white_ai.ponder_thread is None # pondering stopped at the end of game
+    game = C4()
+    pondered_moves = 0
+    for round_index in range(1, len(game_info["moves_rounds"]) + 1):
+        moves_round_info = game_info["moves_rounds"][str(round_index)]
+        for color in ["black", "white"]:
+            if f"{color}_best_action_info" not in moves_round_info:
+                continue
+            move_index = moves_round_info[f"{color}_best_action_info"]["index"]
+            assert game.legal_actions_mask()[move_index]
+            game = game.take_action(move_index)
+            performance_info = moves_round_info[f"{color}_performance_info"]
+            if "pondering" in performance_info:
+                pondered_moves += 1
+                assert performance_info["tree"]["initial_n_root"] > 0 # tree grown by pondering reused
+    assert game.compute_outcome() == outcome
+    assert pondered_moves > 0
+
+
+def test_game_runner_human_moves_reprompted_until_legal_and_game_stopped_by_invalid_input(monkeypatch):
+    moves_names = iter(["9", "3", "x"]) # out of board (asked again), legal, not a name of an action (game stopped)
+    monkeypatch.setattr("builtins.input", lambda prompt: next(moves_names))
+    white_ai = MCTS(search_time_limit=np.inf, search_steps_limit=100, vanilla=False, seed=0)
+    runner = GameRunner(C4, None, white_ai, 1, 1, ponder=True)
+    outcome, game_info = runner.run()
+    assert outcome is None and game_info["outcome"] is None
+    assert len(game_info["moves_rounds"]) == 1 and white_ai.ponder_thread is None # pondering started after the AI's move stopped with the game
+    white_move_index = game_info["moves_rounds"]["1"]["white_best_action_info"]["index"]
+    assert np.array_equal(white_ai.root.board, C4().take_action(3).take_action(white_move_index).board) # human move played
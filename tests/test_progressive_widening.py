@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from gomoku import Gomoku
+from conftest import tree_states
+
+
+@pytest.mark.parametrize("widening_c, widening_alpha", [(1.0, 0.5), (0.5, 0.6)])
+def test_widening_admits_children_as_visits_grow(widening_c, widening_alpha):
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=1000, progressive_widening=True, widening_c=widening_c, widening_alpha=widening_alpha, seed=0)
+    ai.run(Gomoku())
+    admitted = lambda n: max(int(np.ceil(widening_c * n**widening_alpha)), 1)
+    levels = {}
+    for state, depth in tree_states(ai.root):
+        assert len(state.children) <= admitted(state.n)
+        if len(state.children) > 0:
+            levels.setdefault(depth, []).append(len(state.children))
+    assert len(ai.root.children) >= admitted(ai.root.n - 1) # root visited at each step, a child admitted whenever allowed
+    branching = ai.performance_info["widening"]["branching_per_depth"]
+    assert branching == pytest.approx([np.mean(levels[depth]) for depth in range(len(levels))])
+    assert len(branching) == ai.performance_info["tree"]["max_depth"]
+
+
+def test_gomoku_widening_order_admits_cells_next_to_stones_first():
+    state = Gomoku()
+    for action in [112, 0]:
+        state = state.take_action(action)
+    order = state.widening_order()
+    assert sorted(order) == state.legal_actions().tolist()
+    first = {cell // Gomoku.N * 100 + cell % Gomoku.N for cell in order[:11]}
+    assert first == {i * 100 + j for i in range(6, 9) for j in range(6, 9) if (i, j) != (7, 7)} | {1, 100 * 1, 101} # neighbours of both stones
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=20, progressive_widening=True, seed=0, verbose_info=False)
+    ai.run(state)
+    assert set(ai.root.children_actions.tolist()) <= set(order[:11])
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+from conftest import tree_states
+
+
+def test_amaf_credits_each_child_once_per_update():
+    state = C4()
+    state.expand()
+    assert state._update_amaf([3, 3, 5], 1, 1) == 2
+    assert state._update_amaf([0], 2, 0) == 1
+    assert state.children_amaf_ns.tolist() == [2, 0, 0, 1, 0, 1, 0]
+    assert state.children_amaf_ns_wins.tolist() == [0, 0, 0, 1, 0, 1, 0]
+    state.take_action(0).expand()
+    state._clear_children()
+    assert state.children_amaf_ns is None
+
+
+@pytest.mark.parametrize("game_class, steps, mcts_kwargs", [(C4, 1000, {}), (Gomoku, 200, {}), (Reversi, 500, {"lazy_expansion": True}), (C4, 300, {"n_playouts": 8})])
+def test_amaf_statistics_bound_plain_statistics(game_class, steps, mcts_kwargs):
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=steps, rave=True, seed=0, **mcts_kwargs)
+    ai.run(game_class())
+    for state, _ in tree_states(ai.root, expanded_only=True):
+        assert state.children_amaf_ns.size == len(state.children)
+        assert np.all(state.children_amaf_ns >= state.children_ns) # action on the selected path always credited
+        assert np.all(state.children_amaf_ns <= state.n)
+        assert np.all(state.children_amaf_ns_wins <= state.children_amaf_ns)
+    assert ai.performance_info["rave"]["amaf_updates"] > 0
+    assert all(entry["n_amaf"] >= entry["n"] for key, entry in ai.root_actions_info.items() if key != "best")
+
+
+@pytest.mark.parametrize("rave_schedule, beta", [("equivalence", 0.5), ("mse", 100 / (100 + 100 + 4 * 0.1**2 * 100 * 100))])
+def test_rave_values_follow_schedule(rave_schedule, beta):
+    ai = MCTS(rave=True, rave_schedule=rave_schedule, rave_equivalence=100.0, rave_bias=0.1, verbose_info=False)
+    state = C4()
+    state.expand()
+    state.children_ns[:] = [100, 0, 0, 0, 0, 0, 0]
+    state.children_ns_wins[:] = [20, 0, 0, 0, 0, 0, 0]
+    state.children_amaf_ns = np.array([100, 10, 0, 0, 0, 0, 0], dtype=np.int32)
+    state.children_amaf_ns_wins = np.array([80, 7, 0, 0, 0, 0, 0], dtype=np.int32)
+    values = ai._rave_values(state)
+    assert values[0] == pytest.approx((1.0 - beta) * 0.2 + beta * 0.8)
+    assert values[1] == pytest.approx(0.7) # unvisited child valued by its AMAF estimate
+    assert values[2] == 0.0
+    state.n = 100
+    assert ai._best_child_index_ucb(state) == 2 # children with no statistics at all still tried first
+
+
+def test_rave_invalid_parameters_fall_back_to_defaults():
+    ai = MCTS(rave=True, rave_schedule="linear", rave_equivalence=0.0, rave_bias=-1.0)
+    assert (ai.rave_schedule, ai.rave_equivalence, ai.rave_bias) == (MCTS.DEFAULT_RAVE_SCHEDULE, MCTS.DEFAULT_RAVE_EQUIVALENCE, MCTS.DEFAULT_RAVE_BIAS)
+    assert "rave" not in str(MCTS()) and "rave=True" in str(ai)
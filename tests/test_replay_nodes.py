@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+from conftest import tree_states
+
+
+def _position(game_class, state):
+    """Returns the position of the given tree state rebuilt from scratch by taking actions along its path from the root."""
+    actions = []
+    while state.parent is not None:
+        actions.append(state.last_action_index)
+        state = state.parent
+    position = game_class()
+    for action in reversed(actions):
+        position = position.take_action(action)
+    return position
+
+
+@pytest.mark.parametrize("game_class, steps", [(C4, 1000), (Gomoku, 300), (Reversi, 500)])
+def test_board_free_states_expanded_on_replayed_boards(game_class, steps):
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=steps, replay_nodes=True, seed=0, verbose_info=False)
+    ai.run(game_class())
+    assert len(ai.replay_board_states) == 0 # boards rebuilt in steps dropped again
+    assert np.array_equal(ai.root.board, game_class().board) # root board not disturbed by replays
+    n_checked = 0
+    for state, depth in tree_states(ai.root):
+        assert state._has_board() == (depth <= 1) # only the root and its children keep boards
+        if depth > 1 and len(state.children) > 0:
+            position = _position(game_class, state)
+            position.expand()
+            assert sorted(state.children_actions.tolist()) == sorted(position.children_actions.tolist())
+            n_checked += 1
+    assert n_checked > 0
+
+
+def test_advanced_root_and_its_children_get_boards_back():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=1000, vanilla=False, replay_nodes=True, seed=0, verbose_info=False)
+    root = C4()
+    game = C4() # position followed outside of the tree
+    for _ in range(3):
+        action = ai.run(root)
+        game = game.take_action(action)
+        root = ai.advance(action)
+        assert root._has_board() and np.array_equal(root.board, game.board)
+        for key, child in zip(root.children_actions.tolist(), root.children):
+            assert child._has_board() and np.array_equal(child.board, game._detached_copy().take_action(key).board)
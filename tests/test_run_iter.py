@@ -0,0 +1,70 @@
+import time
+import numpy as np
+import pytest
+from mcts import MCTS
+from mcts_soa import MCTSSoA
+from mctsnj import MCTSNJ
+from c4 import C4
+from gomoku import Gomoku
+
+
+@pytest.mark.parametrize("mcts_class", [MCTS, MCTSSoA])
+def test_snapshots_every_n_steps_end_with_final_snapshot_matching_run(mcts_class):
+    ai = mcts_class(search_time_limit=np.inf, search_steps_limit=500, seed=0)
+    best_action = ai.run(C4())
+    root_ns = [entry["n"] for key, entry in ai.root_actions_info.items() if key != "best"]
+    ai_iter = mcts_class(search_time_limit=np.inf, search_steps_limit=500, seed=0)
+    snapshots = list(ai_iter.run_iter(C4(), snapshot_steps=100, top_k=3))
+    assert [snapshot["steps"] for snapshot in snapshots] == [100, 200, 300, 400, 500, 500]
+    assert [snapshot["final"] for snapshot in snapshots] == [False] * 5 + [True]
+    assert all(len(snapshot["top_actions"]) == 3 for snapshot in snapshots)
+    assert all(snapshot["playouts"] == snapshot["steps"] for snapshot in snapshots)
+    final = snapshots[-1]
+    assert final["best_action"] == best_action == ai_iter.best_action
+    assert [n for _, n, _ in final["top_actions"]] == sorted(root_ns, reverse=True)[:3]
+    assert ai_iter.performance_info["steps"] == 500
+
+
+def test_snapshot_top_actions_follow_root_statistics():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=300, seed=0)
+    search = ai.run_iter(Gomoku(), snapshot_steps=150, top_k=4)
+    snapshot = next(search)
+    children = {int(action): (int(n), int(n_wins)) for action, n, n_wins in zip(ai.root.children_actions, ai.root.children_ns, ai.root.children_ns_wins)}
+    for action, n, q in snapshot["top_actions"]:
+        assert children[action][0] == n and q == pytest.approx(children[action][1] / n)
+    assert snapshot["best_action"] == snapshot["top_actions"][0][0]
+    assert snapshot["top_actions"][0][1] == max(n for n, _ in children.values())
+    search.close()
+
+
+def test_close_stops_search_and_finalizes_it():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=10000, seed=0)
+    search = ai.run_iter(C4(), snapshot_steps=50)
+    for snapshot in search:
+        if snapshot["steps"] == 200:
+            break
+    search.close()
+    assert ai.steps == 200 and ai.root.n == 200
+    assert ai.best_action == ai.root_actions_info["best"]["index"]
+    assert ai.performance_info["steps"] == 200
+
+
+def test_snapshots_by_time_and_caller_time_counted_within_limit():
+    ai = MCTS(search_time_limit=0.3, search_steps_limit=np.inf, seed=0)
+    t1 = time.time()
+    snapshots = []
+    for snapshot in ai.run_iter(C4(), snapshot_ms=50.0):
+        snapshots.append(snapshot)
+        time.sleep(0.01)
+    assert time.time() - t1 < 1.0
+    assert len(snapshots) >= 3 and snapshots[-1]["final"]
+    times = [snapshot["time_[ms]"] for snapshot in snapshots[:-1]]
+    assert all(t2 - t1 >= 50.0 for t1, t2 in zip(times, times[1:]))
+
+
+def test_compiled_search_snapshots_taken_between_batches():
+    ai = MCTSNJ(search_time_limit=np.inf, search_steps_limit=2000, n_threads=1, seed=0)
+    snapshots = list(ai.run_iter(C4(), snapshot_steps=1))
+    assert len(snapshots) == ai.batches + 1
+    assert [snapshot["steps"] for snapshot in snapshots[:-1]] == sorted({snapshot["steps"] for snapshot in snapshots[:-1]})
+    assert snapshots[-1]["final"] and snapshots[-1]["steps"] == 2000 and snapshots[-1]["best_action"] == ai.best_action
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+
+
+def test_halving_schedule_within_steps_limit():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=700, sequential_halving=True, seed=0)
+    best_action = ai.run(C4())
+    # 699 steps after expanding the root: 3 rounds with 33, 58, 116 steps per survivor (7, 4, 2 survivors), the last survivor takes the remaining 4 steps
+    expected_ns = np.array([33, 33, 33, 91, 91, 207, 211])
+    assert np.all(np.abs(np.sort(ai.root.children_ns) - expected_ns) <= 1) # one root child also visited by the expansion step
+    assert ai.performance_info["sequential_halving"] == {"passes": 1, "rounds": 3, "survivors": 1, "round_steps_per_action": [33, 58, 116]}
+    assert best_action == int(ai.root.children_actions[ai.halving_survivors[0]]) == ai.root_actions_info["best"]["index"]
+
+
+@pytest.mark.parametrize("search_steps_limit", [500, np.inf])
+def test_halving_reproduced_by_forced_steps_limit(search_steps_limit):
+    ai = MCTS(search_time_limit=0.2, search_steps_limit=search_steps_limit, sequential_halving=True, seed=0)
+    best_action = ai.run(C4())
+    ai_forced = MCTS(search_time_limit=0.2, search_steps_limit=search_steps_limit, sequential_halving=True, seed=0)
+    assert ai_forced.run(C4(), forced_search_steps_limit=ai.steps) == best_action
+    assert ai_forced.root.children_ns.tolist() == ai.root.children_ns.tolist()
+    assert ai_forced.performance_info["sequential_halving"] == ai.performance_info["sequential_halving"]
+
+
+def test_halving_passes_doubled_without_steps_limit():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=np.inf, sequential_halving=True, seed=0)
+    ai.run(C4(), forced_search_steps_limit=1000)
+    halving_info = ai.performance_info["sequential_halving"]
+    assert halving_info["passes"] >= 4
+    assert halving_info["round_steps_per_action"][:6] == [1, 1, 3, 2, 3, 7] # budgets of passes: 21, 42, ...
+
+
+def test_halving_with_lazy_expansion_starts_once_root_materialized():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=1500, sequential_halving=True, lazy_expansion=True, seed=0)
+    ai.run(Gomoku())
+    assert len(ai.root.children) == 225 and not ai.root.untried_actions
+    halving_info = ai.performance_info["sequential_halving"]
+    assert halving_info["rounds"] == 8 and halving_info["survivors"] == 1
+    assert ai.best_n == ai.root.children_ns.max()
+
+
+def test_halving_excludes_progressive_widening():
+    ai = MCTS(sequential_halving=True, progressive_widening=True)
+    assert not ai.progressive_widening
+    assert "sequential_halving=True" in str(ai) and "sequential_halving" not in str(MCTS())
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+
+
+def _minimax(state):
+    outcome = state.compute_outcome()
+    if outcome is not None:
+        return outcome
+    values = [_minimax(state._new_child(action)) for action in state.legal_actions().tolist()]
+    return state.turn * max(state.turn * value for value in values)
+
+
+def _random_position(n_discs, seed):
+    rng = np.random.default_rng(seed)
+    while True:
+        state = C4()
+        for _ in range(n_discs):
+            actions = state.legal_actions()
+            state = state._new_child(int(rng.choice(actions)))
+            state.parent = None
+            if state.compute_outcome() is not None:
+                break
+        else:
+            state.last_action_index = None # position taken as a new game root
+            return state
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_solver_proves_endgame_root_and_stops_early(seed):
+    root = _random_position(C4.M * C4.N - 7, seed)
+    value = _minimax(root)
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=20000, solver=True, seed=0)
+    best_action = ai.run(root)
+    assert ai.performance_info["solver"]["root_proven"] == value
+    assert ai.steps < 20000
+    assert _minimax(root._new_child(best_action)) == value # best action attains the proven value
+    for action, entry in ai.root_actions_info.items():
+        if action != "best" and entry["proven"] is not None:
+            assert entry["proven"] == _minimax(root._new_child(action))
+
+
+def test_solver_avoids_proven_losses():
+    root = C4()
+    for action in [1, 0, 2, 0, 3]: # the maximizing player threatens to complete the bottom row at column 4
+        root = root.take_action(action)
+    root.parent = None
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=3000, solver=True, seed=0)
+    assert ai.run(root) == 4
+    assert not ai.root_actions_info["best"]["loss_flag"]
+    assert all(entry["loss_flag"] for action, entry in ai.root_actions_info.items() if action not in ("best", 4))
+
+
+def test_solver_finds_immediate_win():
+    root = C4()
+    for action in [0, 6, 0, 6, 0, 6]:
+        root = root.take_action(action)
+    root.parent = None
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=5000, solver=True, seed=0)
+    assert ai.run(root) == 0
+    assert ai.performance_info["solver"]["root_proven"] == 1
+    assert ai.steps < 5000
+
+
+def test_run_on_already_proven_root_reports_no_steps():
+    root = C4()
+    for action in [0, 6, 0, 6, 0, 6]:
+        root = root.take_action(action)
+    root.parent = None
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=5000, vanilla=False, solver=True, seed=0)
+    ai.run(root)
+    assert ai.root.proven == 1 and len(ai.root.children) > 0
+    assert ai.run(ai.root) == 0 # tree reused, root proven already
+    assert ai.steps == 0 and np.isnan(ai.performance_info["times_[ms]"]["mean_loop"])
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+from reversi import Reversi
+
+
+@pytest.mark.parametrize("game_class", [C4, Gomoku, Reversi])
+def test_incremental_zobrist_keys_equal_keys_computed_from_scratch(game_class):
+    np.random.seed(0)
+    for _ in range(10):
+        state = game_class()
+        assert state.zobrist_key == state.compute_zobrist_key()
+        while state.compute_outcome() is None:
+            actions = [action for action in range(state.get_max_actions()) if type(state)(state).take_action_job(action)]
+            state = state.take_action(int(np.random.choice(actions)))
+            assert state.zobrist_key == state.compute_zobrist_key()
+
+
+def test_transposition_table_shares_equal_states():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=300, vanilla=False, transposition_table_size=10**5, seed=0)
+    ai.run(Gomoku())
+    assert ai.performance_info["transpositions"]["hits"] > 0
+    parents_of = {}
+    stack, visited = [ai.root], set()
+    while stack:
+        state = stack.pop()
+        for child in state.children:
+            parents_of.setdefault(id(child), []).append(state)
+            if id(child) not in visited:
+                visited.add(id(child))
+                stack.append(child)
+    assert any(len(parents) > 1 for parents in parents_of.values()) # some states reached by different move orders
+    for key, state in ai.transposition_table.items():
+        assert key == state.compute_zobrist_key()
+
+
+def test_colliding_keys_of_different_states_not_linked():
+    ai = MCTS(vanilla=False, transposition_table_size=100, verbose_info=False)
+    ai.transposition_table = {}
+    ai.transposition_lookups = ai.transposition_hits = ai.transposition_evictions = 0
+    other = C4().take_action(1).take_action(2)
+    parent = C4().take_action(2)
+    parent.expand()
+    child = parent.get_child(1)
+    ai.transposition_table[child.zobrist_key] = other # forged collision: same key, same ply, different board
+    other.zobrist_key = child.zobrist_key
+    assert not ai._link_transposition(parent, child.child_index)
+    assert parent.get_child(1) is child and ai.transposition_hits == 0
+
+
+def test_transposition_table_size_bounded_by_evictions():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=500, transposition_table_size=200, seed=0)
+    ai.run(C4())
+    assert len(ai.transposition_table) <= 200
+    assert ai.performance_info["transpositions"]["evictions"] > 0
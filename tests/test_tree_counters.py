@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from mcts import MCTS
+from c4 import C4
+from gomoku import Gomoku
+from conftest import tree_states
+
+
+@pytest.mark.parametrize("params", [{}, {"vanilla": False}, {"lazy_expansion": True}])
+def test_incremental_counters_equal_tree_walk(params):
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=1500, seed=0, verbose_info=False, **params)
+    ai.run(C4())
+    size, mean_depth, max_depth = ai._tree_stats()
+    depths = [depth for _, depth in tree_states(ai.root)]
+    assert (size, max_depth) == (len(depths), max(depths))
+    assert mean_depth == pytest.approx(np.mean(depths))
+
+
+def test_counters_follow_advance_and_next_run():
+    ai = MCTS(search_time_limit=np.inf, search_steps_limit=200, vanilla=False, reuse_tree_size_limit=500, seed=0, verbose_info=False)
+    state = Gomoku()
+    for _ in range(3):
+        action = ai.run(state)
+        state = ai.advance(action)
+        ai.run(state)
+        depths = [depth for _, depth in tree_states(ai.root)]
+        assert ai._tree_stats()[0] == len(depths) and ai._tree_stats()[2] == max(depths)
+        state = ai.advance(ai.best_action)